@@ -0,0 +1,24 @@
+"""add audit job heartbeat
+
+Revision ID: add_audit_job_heartbeat
+Revises: add_idempotency_keys
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_audit_job_heartbeat'
+down_revision = 'add_idempotency_keys'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 运行中审核任务的最近进展时间，用于识别被工作进程重启中断的任务
+    op.add_column('audit_jobs', sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    op.drop_column('audit_jobs', 'heartbeat_at')
@@ -0,0 +1,67 @@
+"""add graduation audit job tables
+
+Revision ID: add_audit_jobs
+Revises: add_program_grading_scale
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_audit_jobs'
+down_revision = 'add_program_grading_scale'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 批量毕业资格审核任务
+    op.create_table(
+        'audit_jobs',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('training_program_id', sa.String(), nullable=False),
+        sa.Column('created_by', sa.String(), nullable=True),
+        sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', name='auditstatus'), nullable=False),
+        sa.Column('total_students', sa.Integer(), nullable=False),
+        sa.Column('processed_students', sa.Integer(), nullable=False),
+        sa.Column('eligible_students', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['training_program_id'], ['training_programs.id']),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_audit_jobs_id', 'audit_jobs', ['id'])
+    op.create_index('ix_audit_jobs_training_program_id', 'audit_jobs', ['training_program_id'])
+
+    # 每个学生的审核结果
+    op.create_table(
+        'audit_results',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('job_id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('eligible', sa.Boolean(), nullable=False),
+        sa.Column('earned_credits', sa.Float(), nullable=False),
+        sa.Column('required_credits', sa.Float(), nullable=False),
+        sa.Column('overall_gpa', sa.Float(), nullable=False),
+        sa.Column('incomplete_categories', sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(['job_id'], ['audit_jobs.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_audit_results_id', 'audit_results', ['id'])
+    op.create_index('ix_audit_results_job_id', 'audit_results', ['job_id'])
+
+
+def downgrade():
+    # 删除表
+    op.drop_index('ix_audit_results_job_id', table_name='audit_results')
+    op.drop_index('ix_audit_results_id', table_name='audit_results')
+    op.drop_table('audit_results')
+    op.drop_index('ix_audit_jobs_training_program_id', table_name='audit_jobs')
+    op.drop_index('ix_audit_jobs_id', table_name='audit_jobs')
+    op.drop_table('audit_jobs')
+    sa.Enum(name='auditstatus').drop(op.get_bind(), checkfirst=True)
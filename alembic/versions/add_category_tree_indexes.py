@@ -0,0 +1,27 @@
+"""add category tree indexes
+
+Revision ID: add_category_tree_indexes
+Revises: add_course_catalog
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+
+
+revision = 'add_category_tree_indexes'
+down_revision = 'add_course_catalog'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 按集合删除子树时按这些外键筛选：递归 CTE 按 parent_id 向下，课程按 category_id
+    op.create_index('ix_course_categories_training_program_id', 'course_categories', ['training_program_id'])
+    op.create_index('ix_course_categories_parent_id', 'course_categories', ['parent_id'])
+    op.create_index('ix_courses_category_id', 'courses', ['category_id'])
+
+
+def downgrade():
+    op.drop_index('ix_courses_category_id', table_name='courses')
+    op.drop_index('ix_course_categories_parent_id', table_name='course_categories')
+    op.drop_index('ix_course_categories_training_program_id', table_name='course_categories')
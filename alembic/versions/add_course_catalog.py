@@ -0,0 +1,124 @@
+"""add course catalog
+
+Revision ID: add_course_catalog
+Revises: add_audit_jobs
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+import re
+import unicodedata
+import uuid
+from collections import Counter, defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_course_catalog'
+down_revision = 'add_audit_jobs'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(name):
+    # 与 app.services.catalog.normalize_course_name 保持一致
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", name).casefold()).strip()
+
+
+def upgrade():
+    # 创建课程目录表
+    op.create_table(
+        'catalog_courses',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('training_program_id', sa.String(), nullable=False),
+        sa.Column('code', sa.String(), nullable=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('normalized_name', sa.String(), nullable=False),
+        sa.Column('credits', sa.Float(), nullable=False),
+        sa.Column('default_category_id', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['training_program_id'], ['training_programs.id']),
+        sa.ForeignKeyConstraint(['default_category_id'], ['course_categories.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('training_program_id', 'normalized_name', name='uq_catalog_courses_program_name'),
+    )
+    op.create_index('ix_catalog_courses_id', 'catalog_courses', ['id'])
+    op.create_index('ix_catalog_courses_training_program_id', 'catalog_courses', ['training_program_id'])
+    op.create_index('ix_catalog_courses_code', 'catalog_courses', ['code'])
+
+    # 课程引用目录条目
+    with op.batch_alter_table('courses') as batch_op:
+        batch_op.add_column(sa.Column('catalog_course_id', sa.String(), nullable=True))
+        batch_op.create_foreign_key('fk_courses_catalog_course_id', 'catalog_courses', ['catalog_course_id'], ['id'])
+        batch_op.create_index('ix_courses_catalog_course_id', ['catalog_course_id'])
+
+    # 按 (培养方案, 规范化名称) 去重已有课程：目录条目取该组最常见的名称、学分和类别
+    courses = sa.table(
+        'courses',
+        sa.column('id', sa.String),
+        sa.column('name', sa.String),
+        sa.column('credits', sa.Float),
+        sa.column('category_id', sa.String),
+        sa.column('catalog_course_id', sa.String),
+    )
+    categories = sa.table(
+        'course_categories',
+        sa.column('id', sa.String),
+        sa.column('training_program_id', sa.String),
+    )
+    catalog = sa.table(
+        'catalog_courses',
+        sa.column('id', sa.String),
+        sa.column('training_program_id', sa.String),
+        sa.column('name', sa.String),
+        sa.column('normalized_name', sa.String),
+        sa.column('credits', sa.Float),
+        sa.column('default_category_id', sa.String),
+    )
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(courses.c.id, courses.c.name, courses.c.credits, courses.c.category_id,
+                  categories.c.training_program_id)
+        .join(categories, courses.c.category_id == categories.c.id)
+    ).fetchall()
+
+    groups = defaultdict(list)
+    for course_id, name, credits, category_id, training_program_id in rows:
+        groups[(training_program_id, _normalize(name))].append((course_id, name, credits, category_id))
+
+    entries, links = [], []
+    for (training_program_id, normalized_name), members in groups.items():
+        catalog_id = str(uuid.uuid4())
+        entries.append({
+            'id': catalog_id,
+            'training_program_id': training_program_id,
+            'name': Counter(name.strip() for _, name, _, _ in members).most_common(1)[0][0],
+            'normalized_name': normalized_name,
+            'credits': Counter(credits for _, _, credits, _ in members).most_common(1)[0][0],
+            'default_category_id': Counter(category_id for _, _, _, category_id in members).most_common(1)[0][0],
+        })
+        links.extend({'course_id': course_id, 'catalog_id': catalog_id} for course_id, _, _, _ in members)
+
+    for start in range(0, len(entries), BATCH_SIZE):
+        connection.execute(catalog.insert(), entries[start:start + BATCH_SIZE])
+    update = courses.update().where(courses.c.id == sa.bindparam('course_id')) \
+        .values(catalog_course_id=sa.bindparam('catalog_id'))
+    for start in range(0, len(links), BATCH_SIZE):
+        connection.execute(update, links[start:start + BATCH_SIZE])
+
+
+def downgrade():
+    # 删除目录引用和目录表
+    with op.batch_alter_table('courses') as batch_op:
+        batch_op.drop_index('ix_courses_catalog_course_id')
+        batch_op.drop_constraint('fk_courses_catalog_course_id', type_='foreignkey')
+        batch_op.drop_column('catalog_course_id')
+    op.drop_index('ix_catalog_courses_code', table_name='catalog_courses')
+    op.drop_index('ix_catalog_courses_training_program_id', table_name='catalog_courses')
+    op.drop_index('ix_catalog_courses_id', table_name='catalog_courses')
+    op.drop_table('catalog_courses')
@@ -0,0 +1,49 @@
+"""add stored course gpa column
+
+Revision ID: add_course_gpa_column
+Revises: add_default_training_program
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_course_gpa_column'
+down_revision = 'add_default_training_program'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    # 添加gpa列到courses表
+    op.add_column('courses', sa.Column('gpa', sa.Float(), nullable=True))
+
+    # 回填已有百分制课程的GPA；在Python中计算以保持与接口相同的round(x, 3)语义
+    courses = sa.table(
+        'courses',
+        sa.column('id', sa.String),
+        sa.column('grading_system', sa.String),
+        sa.column('grade', sa.Float),
+        sa.column('gpa', sa.Float),
+    )
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(courses.c.id, courses.c.grade).where(
+            courses.c.grading_system == 'PERCENTAGE',
+            courses.c.grade.isnot(None),
+        )
+    ).fetchall()
+    update = courses.update().where(courses.c.id == sa.bindparam('course_id')).values(gpa=sa.bindparam('course_gpa'))
+    for start in range(0, len(rows), BATCH_SIZE):
+        connection.execute(update, [
+            {'course_id': course_id, 'course_gpa': round(4 - 3 * ((100 - grade) ** 2) / 1600, 3)}
+            for course_id, grade in rows[start:start + BATCH_SIZE]
+        ])
+
+
+def downgrade():
+    # 删除列
+    op.drop_column('courses', 'gpa')
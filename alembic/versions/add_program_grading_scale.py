@@ -0,0 +1,27 @@
+"""add training program grading scale
+
+Revision ID: add_program_grading_scale
+Revises: add_course_gpa_column
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_program_grading_scale'
+down_revision = 'add_course_gpa_column'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 添加成绩标尺列；已有培养方案使用原有的标准公式，存储的绩点无需重新计算
+    op.add_column('training_programs', sa.Column('grading_scale', sa.String(), nullable=False, server_default='standard'))
+    op.add_column('training_programs', sa.Column('grading_scale_breakpoints', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    # 删除列
+    op.drop_column('training_programs', 'grading_scale_breakpoints')
+    op.drop_column('training_programs', 'grading_scale')
@@ -0,0 +1,51 @@
+"""add sync tombstones and change-tracking indexes
+
+Revision ID: add_sync_tombstones
+Revises: add_category_tree_indexes
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_sync_tombstones'
+down_revision = 'add_category_tree_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 已删除记录的墓碑，供增量同步下发删除
+    op.create_table(
+        'tombstones',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('entity_type', sa.String(), nullable=False),
+        sa.Column('entity_id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=True),
+        sa.Column('is_public', sa.Boolean(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_tombstones_user_id', 'tombstones', ['user_id'])
+    op.create_index('ix_tombstones_deleted_at', 'tombstones', ['deleted_at'])
+
+    # 按创建/修改时间查找令牌之后的变化
+    op.create_index('ix_courses_user_id_created_at', 'courses', ['user_id', 'created_at'])
+    op.create_index('ix_courses_user_id_updated_at', 'courses', ['user_id', 'updated_at'])
+    op.create_index('ix_course_categories_created_at', 'course_categories', ['created_at'])
+    op.create_index('ix_course_categories_updated_at', 'course_categories', ['updated_at'])
+    op.create_index('ix_training_programs_created_at', 'training_programs', ['created_at'])
+    op.create_index('ix_training_programs_updated_at', 'training_programs', ['updated_at'])
+
+
+def downgrade():
+    op.drop_index('ix_training_programs_updated_at', table_name='training_programs')
+    op.drop_index('ix_training_programs_created_at', table_name='training_programs')
+    op.drop_index('ix_course_categories_updated_at', table_name='course_categories')
+    op.drop_index('ix_course_categories_created_at', table_name='course_categories')
+    op.drop_index('ix_courses_user_id_updated_at', table_name='courses')
+    op.drop_index('ix_courses_user_id_created_at', table_name='courses')
+    op.drop_index('ix_tombstones_deleted_at', table_name='tombstones')
+    op.drop_index('ix_tombstones_user_id', table_name='tombstones')
+    op.drop_table('tombstones')
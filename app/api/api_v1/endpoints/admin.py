@@ -0,0 +1,183 @@
+import io
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_active_admin, get_db
+from app.db import statements
+from app.db.instrumentation import compiled_cache_summary
+from app.db.projections import load_catalog_stats, load_cohort_gpa
+from app.db.slow_query import slow_query_log
+from app.models.audit import AuditJob as AuditJobModel, AuditStatus
+from app.models.user import User
+from app.schemas.admin import (
+    AuditJob,
+    AuditJobCreate,
+    CatalogCourseStat,
+    CohortGpa,
+    CompiledCacheStats,
+    ProgramAnalytics,
+    SlowQueryStat,
+)
+from app.services.analytics import DEFAULT_PERCENTILES, program_analytics
+from app.services.audit import start_audit_job, write_results_csv
+
+router = APIRouter()
+
+
+@router.get("/slow-queries", response_model=List[SlowQueryStat])
+def read_slow_queries(
+    limit: int = Query(20, ge=1, le=500),
+    _: User = Depends(get_current_active_admin),
+) -> Any:
+    """
+    获取慢查询统计（仅管理员）
+
+    返回进程启动以来最慢的 N 个语句指纹，按最大耗时降序排列，附带执行计划
+    """
+    return slow_query_log.top(limit)
+
+
+@router.get("/sql-cache-stats", response_model=CompiledCacheStats)
+def read_sql_cache_stats(
+    _: User = Depends(get_current_active_admin),
+) -> Any:
+    """
+    获取 SQL 编译缓存命中率（仅管理员）
+
+    统计进程启动以来语句编译缓存的命中/未命中次数，以及各引擎缓存的当前大小
+    """
+    return compiled_cache_summary()
+
+
+@router.get("/gpa-averages/{training_program_id}", response_model=CohortGpa)
+def read_cohort_gpa(
+    training_program_id: str,
+    _: User = Depends(get_current_active_admin),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    获取培养方案的全体学生 GPA 平均值（仅管理员）
+
+    按学分加权，分别给出整体和每个课程类别的平均 GPA，均在数据库中聚合
+    """
+    if not statements.get_training_program(db, training_program_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="培养方案不存在",
+        )
+    return load_cohort_gpa(db, training_program_id)
+
+
+@router.get("/analytics/{training_program_id}", response_model=ProgramAnalytics)
+def read_program_analytics(
+    training_program_id: str,
+    histogram_bins: int = Query(10, ge=1, le=100),
+    percentiles: List[float] = Query(list(DEFAULT_PERCENTILES)),
+    _: User = Depends(get_current_active_admin),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    获取培养方案的全体学生学分与 GPA 分析（仅管理员）
+
+    一次流式查询读取该方案下所有课程，向量化计算各类别完成率、GPA 直方图和分位数
+    """
+    training_program = statements.get_training_program(db, training_program_id)
+    if not training_program:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="培养方案不存在",
+        )
+    if any(p < 0 or p > 100 for p in percentiles):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="分位数必须在 0 到 100 之间",
+        )
+    return program_analytics(db, training_program, histogram_bins=histogram_bins, percentiles=percentiles)
+
+
+@router.get("/catalog-stats/{training_program_id}", response_model=List[CatalogCourseStat])
+def read_catalog_stats(
+    training_program_id: str,
+    _: User = Depends(get_current_active_admin),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    获取培养方案课程目录的选课统计（仅管理员）
+
+    按目录条目聚合全体学生的选课人数与平均 GPA，按选课人数降序排列
+    """
+    if not statements.get_training_program(db, training_program_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="培养方案不存在",
+        )
+    return load_catalog_stats(db, training_program_id)
+
+
+@router.post("/audits", response_model=AuditJob, status_code=status.HTTP_202_ACCEPTED)
+def create_audit(
+    audit_in: AuditJobCreate,
+    current_user: User = Depends(get_current_active_admin),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    启动培养方案的毕业资格批量审核（仅管理员）
+
+    任务在后台运行，立即返回任务信息；通过 GET /admin/audits/{job_id} 轮询进度
+    """
+    if not statements.get_training_program(db, audit_in.training_program_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="培养方案不存在",
+        )
+    return start_audit_job(db, audit_in.training_program_id, created_by=current_user.id)
+
+
+@router.get("/audits/{job_id}", response_model=AuditJob)
+def read_audit(
+    job_id: str,
+    _: User = Depends(get_current_active_admin),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    获取审核任务状态与进度（仅管理员）
+    """
+    job = db.get(AuditJobModel, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="审核任务不存在",
+        )
+    return job
+
+
+@router.get("/audits/{job_id}/results.csv")
+def download_audit_results(
+    job_id: str,
+    _: User = Depends(get_current_active_admin),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    下载审核结果 CSV（仅管理员）
+    """
+    job = db.get(AuditJobModel, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="审核任务不存在",
+        )
+    if job.status != AuditStatus.COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="审核任务尚未完成",
+        )
+    output = io.StringIO()
+    write_results_csv(db, job.id, output)
+    return StreamingResponse(
+        iter([output.getvalue()]),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="audit-{job.id}.csv"'},
+    )
@@ -0,0 +1,211 @@
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.orm import Session
+
+from app.api.conditional import ConditionalGet, load_versions
+from app.api.deps import get_current_user, get_db, mark_read_only
+from app.db import statements
+from app.models.catalog import CatalogCourse
+from app.models.user import User
+from app.schemas.catalog import (
+    CatalogCourse as CatalogCourseSchema,
+    CatalogCourseCreate,
+    CatalogCourseUpdate,
+    CatalogMatch,
+    CatalogMatchRequest,
+    CatalogNameMatch,
+)
+from app.services.catalog import get_catalog_course_by_name, normalize_course_code, normalize_course_name
+from app.services.matching import FUZZY_THRESHOLD, Match, get_matching_index
+
+router = APIRouter()
+
+
+def _match_dict(match: Match) -> dict:
+    entry = match.entry
+    return {
+        "catalog_course_id": entry.id,
+        "name": entry.name,
+        "code": entry.code,
+        "credits": entry.credits,
+        "default_category_id": entry.default_category_id,
+        "score": match.score,
+        "method": match.method,
+    }
+
+
+def _readable_training_program(db: Session, training_program_id: str, current_user: User):
+    training_program = statements.get_training_program(db, training_program_id)
+    if not training_program:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Training program not found",
+        )
+
+    if not current_user.is_admin and training_program.user_id != current_user.id and not training_program.is_public:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+    return training_program
+
+
+@router.post("/", response_model=CatalogCourseSchema)
+def create_catalog_course(
+    catalog_course_in: CatalogCourseCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Create a catalog course for a training program
+    """
+    training_program = statements.get_training_program(db, catalog_course_in.training_program_id)
+    if not training_program:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Training program not found",
+        )
+
+    if not current_user.is_admin and training_program.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+
+    if get_catalog_course_by_name(db, training_program.id, catalog_course_in.name):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A catalog course with this name already exists in the training program",
+        )
+
+    if catalog_course_in.default_category_id:
+        category = statements.get_category(db, catalog_course_in.default_category_id)
+        if not category or category.training_program_id != training_program.id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Category not found or does not belong to the specified training program",
+            )
+
+    catalog_course = CatalogCourse(
+        **catalog_course_in.model_dump(exclude={"code"}),
+        code=normalize_course_code(catalog_course_in.code),
+        normalized_name=normalize_course_name(catalog_course_in.name),
+    )
+    db.add(catalog_course)
+    db.commit()
+    db.refresh(catalog_course)
+    return catalog_course
+
+
+@router.get("/training-program/{training_program_id}", response_model=List[CatalogCourseSchema])
+def read_catalog_courses(
+    training_program_id: str,
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Get the course catalog of a training program
+    """
+    _readable_training_program(db, training_program_id, current_user)
+
+    conditional = ConditionalGet(request, current_user, *load_versions(
+        db, (CatalogCourse, CatalogCourse.training_program_id == training_program_id),
+    ))
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    conditional.apply(response)
+
+    return db.query(CatalogCourse).filter(
+        CatalogCourse.training_program_id == training_program_id
+    ).order_by(CatalogCourse.normalized_name).all()
+
+
+@router.get("/training-program/{training_program_id}/autocomplete", response_model=List[CatalogMatch])
+def autocomplete_catalog_courses(
+    training_program_id: str,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Suggest catalog courses for a partially typed name: prefix matches first, then fuzzy ones
+    """
+    _readable_training_program(db, training_program_id, current_user)
+    index = get_matching_index(db, training_program_id)
+    return [_match_dict(match) for match in index.autocomplete(q, limit)]
+
+
+@router.post("/training-program/{training_program_id}/match", response_model=List[CatalogNameMatch],
+             dependencies=[Depends(mark_read_only)])
+def match_catalog_courses(
+    training_program_id: str,
+    match_in: CatalogMatchRequest,
+    threshold: float = Query(FUZZY_THRESHOLD, ge=0, le=1),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Map pasted transcript course names to catalog courses (exact name or code, else best fuzzy hit)
+    """
+    _readable_training_program(db, training_program_id, current_user)
+    index = get_matching_index(db, training_program_id)
+    results = []
+    for name in match_in.names:
+        match = index.match(name, threshold=threshold)
+        results.append({"query": name, "match": _match_dict(match) if match else None})
+    return results
+
+
+@router.put("/{catalog_course_id}", response_model=CatalogCourseSchema)
+def update_catalog_course(
+    catalog_course_id: str,
+    catalog_course_in: CatalogCourseUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Update a catalog course
+    """
+    catalog_course = statements.get_catalog_course(db, catalog_course_id)
+    if not catalog_course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Catalog course not found",
+        )
+
+    training_program = statements.get_training_program(db, catalog_course.training_program_id)
+    if not current_user.is_admin and training_program.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+
+    update_data = catalog_course_in.model_dump(exclude_unset=True)
+    if update_data.get("name"):
+        existing = get_catalog_course_by_name(db, training_program.id, update_data["name"])
+        if existing and existing.id != catalog_course.id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A catalog course with this name already exists in the training program",
+            )
+        update_data["normalized_name"] = normalize_course_name(update_data["name"])
+    if "code" in update_data:
+        update_data["code"] = normalize_course_code(update_data["code"])
+    if update_data.get("default_category_id"):
+        category = statements.get_category(db, update_data["default_category_id"])
+        if not category or category.training_program_id != training_program.id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Category not found or does not belong to the specified training program",
+            )
+
+    for field, value in update_data.items():
+        setattr(catalog_course, field, value)
+
+    db.commit()
+    db.refresh(catalog_course)
+    return catalog_course
@@ -1,9 +1,14 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.orm import Session
 
+from app.api.conditional import ConditionalGet, load_versions, row_version
 from app.api.deps import get_current_user, get_db
+from app.api.fieldsets import parse_fields, selectable_fields
+from app.api.responses import ORJSONResponse
+from app.db import statements
+from app.db.projections import load_category_rows, load_field_rows
 from app.models.user import User
 from app.models.training_program import TrainingProgram
 from app.models.course_category import CourseCategory
@@ -13,9 +18,18 @@ from app.schemas.course_category import (
     CourseCategoryUpdate,
     CourseCategoryWithChildren,
 )
+from app.services.program_tree import (
+    build_category_tree,
+    category_subtree,
+    count_foreign_courses,
+    delete_category_subtree,
+)
 
 router = APIRouter()
 
+# Fields the category tree can be trimmed to with `fields=`; subcategories are always returned
+CATEGORY_FIELDS = selectable_fields(CourseCategoryWithChildren, CourseCategory)
+
 
 @router.post("/", response_model=CourseCategorySchema)
 def create_course_category(
@@ -27,7 +41,7 @@ def create_course_category(
     Create new course category
     """
     # Check if training program exists and user has access
-    training_program = db.query(TrainingProgram).filter(TrainingProgram.id == category_in.training_program_id).first()
+    training_program = statements.get_training_program(db, category_in.training_program_id)
     if not training_program:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -54,7 +68,7 @@ def create_course_category(
             )
     
     # Create the category
-    category = CourseCategory(**category_in.dict())
+    category = CourseCategory(**category_in.model_dump())
     db.add(category)
     db.commit()
     db.refresh(category)
@@ -64,14 +78,27 @@ def create_course_category(
 @router.get("/training-program/{training_program_id}", response_model=List[CourseCategoryWithChildren])
 def read_categories_by_training_program(
     training_program_id: str,
+    request: Request,
+    fields: Optional[str] = Query(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> Any:
     """
     Get all categories for a training program, organized in a tree structure
+
+    `fields` is a comma-separated subset of the category fields to return in each node
+    (id and subcategories are always included)
     """
+    try:
+        selected = parse_fields(fields, CATEGORY_FIELDS)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
     # Check if training program exists and user has access
-    training_program = db.query(TrainingProgram).filter(TrainingProgram.id == training_program_id).first()
+    training_program = statements.get_training_program(db, training_program_id)
     if not training_program:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -85,35 +112,36 @@ def read_categories_by_training_program(
             detail="Not enough permissions",
         )
     
-    # Get all root categories (those without a parent)
-    root_categories = db.query(CourseCategory).filter(
-        CourseCategory.training_program_id == training_program_id,
-        CourseCategory.parent_id == None,
-    ).all()
-    
-    # Function to recursively build the category tree
-    def build_category_tree(category):
-        category_dict = CourseCategoryWithChildren.from_orm(category)
-        subcategories = db.query(CourseCategory).filter(
-            CourseCategory.parent_id == category.id
-        ).all()
-        category_dict.subcategories = [build_category_tree(subcat) for subcat in subcategories]
-        return category_dict
-    
-    # Build the tree for each root category
-    return [build_category_tree(category) for category in root_categories]
+    conditional = ConditionalGet(request, current_user, *load_versions(
+        db, (CourseCategory, CourseCategory.training_program_id == training_program_id),
+    ))
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+
+    if selected is not None:
+        # The tree is assembled from parent_id, which is loaded whether or not it was asked for
+        rows = load_field_rows(db, CourseCategory, list(dict.fromkeys([*selected, "parent_id"])),
+                               CourseCategory.training_program_id == training_program_id)
+        return ORJSONResponse(build_category_tree(rows, selected), headers=conditional.headers)
+
+    # Load every category of the program in one column-only query and assemble the tree in memory;
+    # the tree is built from rows with exactly the schema's fields, so it skips response validation
+    return ORJSONResponse(build_category_tree(load_category_rows(db, training_program_id)),
+                          headers=conditional.headers)
 
 
 @router.get("/{category_id}", response_model=CourseCategorySchema)
 def read_category(
     category_id: str,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> Any:
     """
     Get a specific category by ID
     """
-    category = db.query(CourseCategory).filter(CourseCategory.id == category_id).first()
+    category = statements.get_category(db, category_id)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -121,13 +149,17 @@ def read_category(
         )
     
     # Check if user has permission to view this category
-    training_program = db.query(TrainingProgram).filter(TrainingProgram.id == category.training_program_id).first()
+    training_program = statements.get_training_program(db, category.training_program_id)
     if not current_user.is_admin and training_program.user_id != current_user.id and not training_program.is_public:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions",
         )
     
+    conditional = ConditionalGet(request, current_user, row_version(category))
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    conditional.apply(response)
     return category
 
 
@@ -141,7 +173,7 @@ def update_category(
     """
     Update a category
     """
-    category = db.query(CourseCategory).filter(CourseCategory.id == category_id).first()
+    category = statements.get_category(db, category_id)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -149,7 +181,7 @@ def update_category(
         )
     
     # Check if user has permission to update this category
-    training_program = db.query(TrainingProgram).filter(TrainingProgram.id == category.training_program_id).first()
+    training_program = statements.get_training_program(db, category.training_program_id)
     if not current_user.is_admin and training_program.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -157,7 +189,7 @@ def update_category(
         )
     
     # Update fields
-    update_data = category_in.dict(exclude_unset=True)
+    update_data = category_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(category, field, value)
     
@@ -169,13 +201,18 @@ def update_category(
 @router.delete("/{category_id}", response_model=dict)
 def delete_category(
     category_id: str,
+    recursive: bool = Query(False),
+    force: bool = Query(False),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> Any:
     """
     Delete a category
+
+    With recursive=true the whole subtree goes too. Courses are deleted set-based; other users'
+    courses block the delete unless an admin passes force=true.
     """
-    category = db.query(CourseCategory).filter(CourseCategory.id == category_id).first()
+    category = statements.get_category(db, category_id)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -183,7 +220,7 @@ def delete_category(
         )
     
     # Check if user has permission to delete this category
-    training_program = db.query(TrainingProgram).filter(TrainingProgram.id == category.training_program_id).first()
+    training_program = statements.get_training_program(db, category.training_program_id)
     if not current_user.is_admin and training_program.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -191,13 +228,21 @@ def delete_category(
         )
     
     # Check if category has subcategories
-    subcategories = db.query(CourseCategory).filter(CourseCategory.parent_id == category_id).count()
-    if subcategories > 0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cannot delete category with subcategories",
-        )
-    
-    db.delete(category)
-    db.commit()
-    return {"message": "Category deleted successfully"}
+    if not recursive:
+        subcategories = db.query(CourseCategory).filter(CourseCategory.parent_id == category_id).count()
+        if subcategories > 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cannot delete category with subcategories",
+            )
+
+    if not (force and current_user.is_admin):
+        foreign_courses = count_foreign_courses(db, category_subtree(category_id), training_program.user_id)
+        if foreign_courses:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Category still holds {foreign_courses} courses of other users",
+            )
+
+    counts = delete_category_subtree(db, category)
+    return {"message": "Category deleted successfully", **counts}
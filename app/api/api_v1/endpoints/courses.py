@@ -1,21 +1,34 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
+from app.api.conditional import ConditionalGet, load_versions, row_version
 from app.api.deps import get_current_user, get_db
+from app.api.fieldsets import parse_fields, selectable_fields
+from app.api.responses import ORJSONResponse
+from app.db import statements
+from app.db.projections import load_field_rows
 from app.models.user import User
 from app.models.training_program import TrainingProgram
 from app.models.course_category import CourseCategory
-from app.models.course import Course, GradingSystem
+from app.models.course import Course
 from app.schemas.course import (
     Course as CourseSchema,
     CourseCreate,
     CourseUpdate,
+    CourseBatchRequest,
+    CourseBatchResult,
 )
+from app.services.course_edits import apply_course_batch, course_update_data, new_course_data
 
 router = APIRouter()
 
+# Fields a course listing can be trimmed to with `fields=`
+COURSE_FIELDS = selectable_fields(CourseSchema, Course)
+
 
 @router.post("/", response_model=CourseSchema)
 def create_course(
@@ -27,7 +40,7 @@ def create_course(
     Create new course
     """
     # Check if category exists
-    category = db.query(CourseCategory).filter(CourseCategory.id == course_in.category_id).first()
+    category = statements.get_category(db, course_in.category_id)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -35,40 +48,30 @@ def create_course(
         )
     
     # Check if user has access to the training program
-    training_program = db.query(TrainingProgram).filter(TrainingProgram.id == category.training_program_id).first()
+    training_program = statements.get_training_program(db, category.training_program_id)
     if not current_user.is_admin and training_program.user_id != current_user.id and not training_program.is_public:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions",
         )
     
-    # Validate grade based on grading system
-    if course_in.grading_system == GradingSystem.PERCENTAGE:
-        if course_in.grade is None:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Grade is required for percentage grading system",
-            )
-        if course_in.passed is not None:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Passed status should not be provided for percentage grading system",
-            )
-    elif course_in.grading_system == GradingSystem.PASS_FAIL:
-        if course_in.passed is None:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Passed status is required for pass/fail grading system",
-            )
-        if course_in.grade is not None:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Grade should not be provided for pass/fail grading system",
-            )
-    
+    # Validate grading fields and link the course to the program's catalog entry
+    try:
+        course_data = new_course_data(db, course_in, category, current_user)
+    except LookupError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
     # Create the course
     course = Course(
-        **course_in.dict(),
+        **course_data,
         user_id=current_user.id,
     )
     db.add(course)
@@ -77,30 +80,76 @@ def create_course(
     return course
 
 
+@router.post("/batch", response_model=CourseBatchResult)
+def batch_courses(
+    batch_in: CourseBatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Apply several course edits in one request
+
+    Create, update, delete and move operations run in order with the same checks as the single-course
+    endpoints and are committed together. If any operation fails nothing is written, the response is
+    400 and each operation's result says why.
+    """
+    result = apply_course_batch(db, current_user, batch_in.operations)
+    if not result["committed"]:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content=jsonable_encoder(CourseBatchResult(**result)),
+        )
+    return result
+
+
 @router.get("/", response_model=List[CourseSchema])
 def read_courses(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> Any:
     """
     Retrieve user's courses
+
+    `fields` is a comma-separated subset of the course fields to return (id is always included)
     """
-    courses = db.query(Course).filter(Course.user_id == current_user.id).offset(skip).limit(limit).all()
+    try:
+        selected = parse_fields(fields, COURSE_FIELDS)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+    conditional = ConditionalGet(request, current_user, *load_versions(db, (Course, Course.user_id == current_user.id)))
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+
+    if selected is not None:
+        rows = load_field_rows(db, Course, selected, Course.user_id == current_user.id, skip=skip, limit=limit)
+        return ORJSONResponse([row._asdict() for row in rows], headers=conditional.headers)
+
+    conditional.apply(response)
+    courses = statements.get_courses_by_user(db, current_user.id, skip=skip, limit=limit)
     return courses
 
 
 @router.get("/{course_id}", response_model=CourseSchema)
 def read_course(
     course_id: str,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> Any:
     """
     Get a specific course by ID
     """
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = statements.get_course(db, course_id)
     if not course:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -114,6 +163,10 @@ def read_course(
             detail="Not enough permissions",
         )
     
+    conditional = ConditionalGet(request, current_user, row_version(course))
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    conditional.apply(response)
     return course
 
 
@@ -127,7 +180,7 @@ def update_course(
     """
     Update a course
     """
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = statements.get_course(db, course_id)
     if not course:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -142,38 +195,28 @@ def update_course(
         )
     
     # If category_id is being updated, check if it exists
+    category = None
     if course_in.category_id and course_in.category_id != course.category_id:
-        category = db.query(CourseCategory).filter(CourseCategory.id == course_in.category_id).first()
+        category = statements.get_category(db, course_in.category_id)
         if not category:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Category not found",
             )
     
-    # Update fields
-    update_data = course_in.dict(exclude_unset=True)
-    
-    # Handle grading system changes
-    if "grading_system" in update_data:
-        new_grading_system = update_data["grading_system"]
-        
-        if new_grading_system == GradingSystem.PERCENTAGE:
-            # If switching to percentage, ensure grade is provided and passed is removed
-            if "grade" not in update_data and course.grade is None:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Grade is required for percentage grading system",
-                )
-            update_data["passed"] = None
-        
-        elif new_grading_system == GradingSystem.PASS_FAIL:
-            # If switching to pass/fail, ensure passed is provided and grade is removed
-            if "passed" not in update_data and course.passed is None:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Passed status is required for pass/fail grading system",
-                )
-            update_data["grade"] = None
+    # Validate the changes, keeping the catalog link and grading fields consistent
+    try:
+        update_data = course_update_data(db, course, course_in, current_user, category)
+    except LookupError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     
     # Apply updates
     for field, value in update_data.items():
@@ -193,7 +236,7 @@ def delete_course(
     """
     Delete a course
     """
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = statements.get_course(db, course_id)
     if not course:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
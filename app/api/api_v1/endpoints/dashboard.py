@@ -1,18 +1,141 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_db
-from app.models.user import User
-from app.models.training_program import TrainingProgram
+from app.api.conditional import ConditionalGet, load_versions, row_version
+from app.api.deps import get_current_user, get_db, mark_read_only
+from app.api.responses import ORJSONResponse
+from app.core.grading import get_scale
+from app.db import statements
+from app.db.projections import (
+    load_category_records,
+    load_category_records_by_program,
+    load_category_rows,
+    load_course_records,
+)
+from app.models.course import Course
 from app.models.course_category import CourseCategory
-from app.models.course import Course, GradingSystem
-from app.schemas.dashboard import CreditSummary, CategoryProgress, CategoryProgressWithChildren
+from app.models.training_program import TrainingProgram
+from app.models.user import User
+from app.schemas.dashboard import (
+    BOOTSTRAP_SECTIONS,
+    AssignmentRequest,
+    AssignmentResult,
+    CreditSummary,
+    CreditSummaryRequest,
+    DashboardBootstrap,
+    ProgramCreditSummary,
+    SimulationRequest,
+    SimulationResult,
+)
+from app.services.assignment import eligible_categories, satisfied_credits, solve_assignment
+from app.services.credit_summary import calculate_credit_summary, is_earned
+from app.services.program_tree import build_category_tree
+from app.services.simulation import simulate_credit_summary
 
 router = APIRouter()
 
 
+@router.get("/bootstrap", response_model=DashboardBootstrap)
+def get_dashboard_bootstrap(
+    request: Request,
+    training_program_id: Optional[str] = Query(None),
+    include: Optional[str] = Query(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Everything the dashboard page loads, in one request
+
+    Returns the current user, the visible training programs, the category tree, the user's courses
+    and the credit summary, the same as /users/me, /training-programs/, /course-categories/training-program/{id},
+    /courses/ and /dashboard/credit-summary/{id}. The program is `training_program_id`, or else the user's
+    default training program. `include` is a comma-separated subset of the sections to return.
+    """
+    sections = set(BOOTSTRAP_SECTIONS)
+    if include is not None:
+        sections = {section.strip() for section in include.split(",") if section.strip()}
+        unknown = sections - set(BOOTSTRAP_SECTIONS)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown sections: {', '.join(sorted(unknown))}; choose from {', '.join(BOOTSTRAP_SECTIONS)}",
+            )
+
+    result = {"user": current_user if "user" in sections else None}
+
+    training_programs = []
+    collections = []
+    if "training_programs" in sections:
+        # Same listing as /training-programs/ with its default page size
+        visible = [] if current_user.is_admin else [
+            or_(TrainingProgram.user_id == current_user.id, TrainingProgram.is_public.is_(True)),
+        ]
+        training_programs = db.execute(select(TrainingProgram).where(*visible).limit(100)).scalars().all()
+        result["training_programs"] = training_programs
+        collections.append((TrainingProgram, *visible))
+
+    # The requested program must be accessible; a stale default (deleted or no longer public) is skipped
+    training_program = None
+    program_id = training_program_id or current_user.default_training_program_id
+    if program_id and sections & {"categories", "credit_summary"}:
+        training_program = next((program for program in training_programs if program.id == program_id), None) \
+            or statements.get_training_program(db, program_id)
+        if training_program is None:
+            if training_program_id:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Training program not found",
+                )
+        elif not current_user.is_admin and training_program.user_id != current_user.id \
+                and not training_program.is_public:
+            if training_program_id:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not enough permissions",
+                )
+            training_program = None
+    result["training_program_id"] = training_program.id if training_program else None
+
+    # The response is a function of these versions; a client holding it gets a 304 before anything else loads
+    versions = [row_version(current_user)]
+    if training_program is not None:
+        versions.append(row_version(training_program))
+        collections.append((CourseCategory, CourseCategory.training_program_id == training_program.id))
+    if "courses" in sections or training_program is not None and "credit_summary" in sections:
+        collections.append((Course, Course.user_id == current_user.id))
+    if collections:
+        versions.extend(load_versions(db, *collections))
+    conditional = ConditionalGet(request, current_user, *versions)
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+
+    courses = None
+    if "courses" in sections:
+        courses = statements.get_courses_by_user(db, current_user.id)
+        result["courses"] = courses
+
+    if training_program is not None:
+        # One category query feeds both the tree and the summary
+        categories = load_category_rows(db, training_program.id)
+        if "categories" in sections:
+            result["categories"] = build_category_tree(categories)
+        if "credit_summary" in sections:
+            # Loaded courses carry every field the summary reads; otherwise a column-only projection
+            user_courses = courses if courses is not None else load_course_records(db, current_user.id)
+            result["credit_summary"] = calculate_credit_summary(training_program.total_credits, categories,
+                                                                user_courses)
+
+    # Only the ORM sections go through the schema; the category tree and the summary are built to it
+    # already and are rendered as they are
+    trusted = {key: result.pop(key) for key in ("categories", "credit_summary") if key in result}
+    content = DashboardBootstrap.model_validate(result, from_attributes=True).model_dump(mode="json")
+    content.update(trusted)
+    return ORJSONResponse(content, headers=conditional.headers)
+
+
 @router.get("/credit-summary/{training_program_id}", response_model=CreditSummary)
 def get_credit_summary(
     training_program_id: str,
@@ -23,7 +146,7 @@ def get_credit_summary(
     Get credit summary for a training program
     """
     # Check if training program exists
-    training_program = db.query(TrainingProgram).filter(TrainingProgram.id == training_program_id).first()
+    training_program = statements.get_training_program(db, training_program_id)
     if not training_program:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -37,84 +160,168 @@ def get_credit_summary(
             detail="Not enough permissions",
         )
 
-    # Get all courses for this user
-    user_courses = db.query(Course).filter(Course.user_id == current_user.id).all()
-
-    # Calculate total earned credits and GPA
-    total_earned_credits = 0.0
-    weighted_gpa_sum = 0.0
-    gpa_credits = 0.0
-
-    for course in user_courses:
-        # Only count courses that are passed or have a grade
-        if (course.grading_system == GradingSystem.PASS_FAIL and course.passed) or \
-           (course.grading_system == GradingSystem.PERCENTAGE and course.grade is not None):
-            total_earned_credits += course.credits
-
-            # Add to GPA calculation if it's a percentage-based course
-            if course.grading_system == GradingSystem.PERCENTAGE and course.grade is not None:
-                weighted_gpa_sum += course.gpa * course.credits
-                gpa_credits += course.credits
-
-    # Calculate overall GPA
-    overall_gpa = round(weighted_gpa_sum / gpa_credits, 3) if gpa_credits > 0 else 0.0
-
-    # Get all categories for this training program
-    root_categories = db.query(CourseCategory).filter(
-        CourseCategory.training_program_id == training_program_id,
-        CourseCategory.parent_id == None,
-    ).all()
-
-    # Function to recursively calculate category progress
-    def calculate_category_progress(category, user_courses):
-        # Get all courses in this category
-        category_courses = [c for c in user_courses if c.category_id == category.id]
-
-        # Calculate earned credits for this category
-        earned_credits = sum([
-            c.credits for c in category_courses
-            if (c.grading_system == GradingSystem.PASS_FAIL and c.passed) or
-               (c.grading_system == GradingSystem.PERCENTAGE and c.grade is not None)
-        ])
-
-        # Get subcategories
-        subcategories = db.query(CourseCategory).filter(
-            CourseCategory.parent_id == category.id
-        ).all()
-
-        # Create progress object
-        progress = CategoryProgressWithChildren(
-            category_id=category.id,
-            category_name=category.name,
-            required_credits=category.required_credits,
-            earned_credits=earned_credits,
-            remaining_credits=max(0, category.required_credits - earned_credits),
-            is_complete=earned_credits >= category.required_credits,
-            has_subcategories=len(subcategories) > 0,
-            parent_id=category.parent_id,
-            subcategories=[]
+    # Column-only projections: the user's courses and the whole category tree, one query each
+    user_courses = load_course_records(db, current_user.id)
+    categories = load_category_records(db, training_program_id)
+
+    # Built field by field to the CreditSummary schema: rendered directly, without response validation
+    return ORJSONResponse(calculate_credit_summary(training_program.total_credits, categories, user_courses))
+
+
+@router.post("/credit-summaries", response_model=List[ProgramCreditSummary], dependencies=[Depends(mark_read_only)])
+def get_credit_summaries(
+    summary_in: CreditSummaryRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Get credit summaries for several training programs at once
+
+    The user's courses are loaded once and every requested category tree in a single query
+    """
+    training_program_ids = list(dict.fromkeys(summary_in.training_program_ids))
+    training_programs = {program.id: program for program in statements.get_training_programs(db, training_program_ids)}
+
+    for training_program_id in training_program_ids:
+        training_program = training_programs.get(training_program_id)
+        if not training_program:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Training program {training_program_id} not found",
+            )
+        if not current_user.is_admin and training_program.user_id != current_user.id and not training_program.is_public:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions",
+            )
+
+    user_courses = load_course_records(db, current_user.id)
+    categories_by_program = load_category_records_by_program(db, training_program_ids)
+
+    summaries = []
+    for training_program_id in training_program_ids:
+        training_program = training_programs[training_program_id]
+        summary = calculate_credit_summary(
+            training_program.total_credits, categories_by_program[training_program_id], user_courses,
+        )
+        summary["training_program_id"] = training_program.id
+        summary["training_program_name"] = training_program.name
+        summaries.append(summary)
+    return ORJSONResponse(summaries)
+
+
+@router.post("/simulate/{training_program_id}", response_model=SimulationResult,
+             dependencies=[Depends(mark_read_only)])
+def simulate_credit_summary_endpoint(
+    training_program_id: str,
+    simulation_in: SimulationRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Simulate the credit summary with hypothetical added, removed or modified courses
+
+    Changes are applied in memory on top of the user's real courses; nothing is written
+    """
+    training_program = statements.get_training_program(db, training_program_id)
+    if not training_program:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Training program not found",
+        )
+
+    if not current_user.is_admin and training_program.user_id != current_user.id and not training_program.is_public:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+
+    user_courses = load_course_records(db, current_user.id)
+    categories = load_category_records(db, training_program_id)
+    scale = get_scale(training_program.grading_scale, training_program.grading_scale_breakpoints)
+    try:
+        return simulate_credit_summary(
+            training_program.total_credits, categories, user_courses, scale,
+            added=simulation_in.add, removed=simulation_in.remove, modified=simulation_in.modify,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
+@router.post("/assign/{training_program_id}", response_model=AssignmentResult,
+             dependencies=[Depends(mark_read_only)])
+def solve_course_assignment(
+    training_program_id: str,
+    assignment_in: AssignmentRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Suggest the course-to-category assignment that satisfies the most required credits
+
+    Each earned course may stay in its category or move to any category its rule allows;
+    the result lists the moves, nothing is written
+    """
+    training_program = statements.get_training_program(db, training_program_id)
+    if not training_program:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Training program not found",
+        )
+
+    if not current_user.is_admin and training_program.user_id != current_user.id and not training_program.is_public:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
         )
 
-        # Calculate progress for subcategories
-        for subcat in subcategories:
-            subcat_progress = calculate_category_progress(subcat, user_courses)
-            progress.subcategories.append(subcat_progress)
+    user_courses = {course.id: course for course in load_course_records(db, current_user.id)}
+    categories = load_category_records(db, training_program_id)
+    required = {category.id: category.required_credits for category in categories}
 
-            # Add subcategory earned credits to parent category
-            # earned_credits += subcat_progress.earned_credits
+    rules = {}
+    for rule in assignment_in.rules:
+        if rule.course_id not in user_courses:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Course {rule.course_id} not found",
+            )
+        rules[rule.course_id] = rule.category_ids
 
-        return progress
+    credits, eligible, current = {}, {}, {}
+    for course in user_courses.values():
+        candidates = eligible_categories(course.category_id, rules.get(course.id, []), required.keys())
+        if is_earned(course) and candidates:
+            credits[course.id] = course.credits
+            eligible[course.id] = candidates
+            current[course.id] = candidates[0]
 
-    # Calculate progress for each root category
-    categories_progress = [calculate_category_progress(cat, user_courses) for cat in root_categories]
+    current_loads = {}
+    for course_id, category_id in current.items():
+        if category_id == user_courses[course_id].category_id:
+            current_loads[category_id] = current_loads.get(category_id, 0.0) + credits[course_id]
 
-    # Create credit summary
-    credit_summary = CreditSummary(
-        total_required_credits=training_program.total_credits,
-        total_earned_credits=total_earned_credits,
-        remaining_credits=max(0, training_program.total_credits - total_earned_credits),
-        overall_gpa=overall_gpa,
-        categories=categories_progress
-    )
+    result = solve_assignment(credits, eligible, required, current=current)
+    assigned = {category_id: 0.0 for category_id in required}
+    for course_id, category_id in result["assignment"].items():
+        assigned[category_id] += credits[course_id]
 
-    return credit_summary
+    return {
+        "moves": [
+            {"course_id": course_id, "from_category_id": user_courses[course_id].category_id, "to_category_id": category_id}
+            for course_id, category_id in result["assignment"].items()
+            if category_id != user_courses[course_id].category_id
+        ],
+        "categories": [
+            {"category_id": category.id, "required_credits": category.required_credits,
+             "assigned_credits": assigned[category.id]}
+            for category in categories
+        ],
+        "satisfied_credits": result["satisfied_credits"],
+        "current_satisfied_credits": round(satisfied_credits(required, current_loads), 6),
+        "upper_bound": result["upper_bound"],
+        "method": result["method"],
+    }
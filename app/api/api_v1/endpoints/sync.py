@@ -0,0 +1,33 @@
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_user, get_db, require_primary
+from app.models.user import User
+from app.schemas.sync import SyncResponse
+from app.services.sync import InvalidSyncToken, sync_changes
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SyncResponse, dependencies=[Depends(require_primary)])
+def sync(
+    token: Optional[str] = Query(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Delta sync for offline-capable clients
+
+    Without a token: every visible training program, category and course, plus a sync token.
+    With the previous token: only what was created, updated or deleted since, plus a new token.
+    Served from the primary, since a lagging replica could hide writes older than the new token.
+    """
+    try:
+        return sync_changes(db, current_user, token)
+    except InvalidSyncToken as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
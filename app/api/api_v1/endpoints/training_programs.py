@@ -1,20 +1,48 @@
+import json
 from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import yaml
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, Response
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
+from app.api.conditional import ConditionalGet, load_versions, row_version
 from app.api.deps import get_current_user, get_current_active_admin, get_db
+from app.api.fieldsets import parse_fields, selectable_fields
+from app.api.responses import ORJSONResponse
+from app.core.grading import validate_scale
+from app.db import statements
+from app.db.projections import load_category_records, load_field_rows
 from app.models.user import User
 from app.models.training_program import TrainingProgram
+from app.models.course_category import CourseCategory
 from app.schemas.training_program import (
     TrainingProgram as TrainingProgramSchema,
     TrainingProgramCreate,
     TrainingProgramUpdate,
     TrainingProgramPublish,
+    TrainingProgramClone,
+    TrainingProgramDefinition,
+    TrainingProgramImportResult,
 )
+from app.services.grading import recalculate_program_gpa
+from app.services.program_tree import (
+    TreeValidationError,
+    clone_training_program,
+    count_foreign_courses,
+    delete_training_program_tree,
+    export_training_program,
+    import_training_program,
+    program_categories,
+)
+from app.services.sync import record_unpublish
 
 router = APIRouter()
 
+# 列表接口可以用 fields= 只返回这些字段中的一部分
+TRAINING_PROGRAM_FIELDS = selectable_fields(TrainingProgramSchema, TrainingProgram)
+
 
 @router.post("/", response_model=TrainingProgramSchema)
 def create_training_program(
@@ -37,11 +65,63 @@ def create_training_program(
     return training_program
 
 
+async def read_request_body(request: Request) -> bytes:
+    """原始请求体；只有读取是异步的，解析和数据库操作留在同步端点的线程池中，不阻塞事件循环"""
+    return await request.body()
+
+
+@router.post("/import", response_model=TrainingProgramImportResult, status_code=status.HTTP_201_CREATED)
+def import_training_program_endpoint(
+    request: Request,
+    body: bytes = Depends(read_request_body),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    导入培养方案
+
+    请求体为完整的培养方案定义（JSON，或 Content-Type 为 YAML 时的 YAML），类别可以嵌套
+    （subcategories），也可以是用 key/parent 关联的平铺列表。整棵树先在内存中校验，
+    全部通过后培养方案和所有类别在同一事务中写入；任何错误都不会留下部分数据
+    """
+    content_type = request.headers.get("content-type", "")
+    try:
+        if "yaml" in content_type:
+            raw = yaml.safe_load(body)
+        else:
+            raw = json.loads(body)
+    except (ValueError, yaml.YAMLError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"无法解析培养方案定义: {e}",
+        )
+
+    try:
+        definition = TrainingProgramDefinition.model_validate(raw)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=[f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()],
+        )
+
+    try:
+        training_program, category_count, warnings = import_training_program(db, definition, current_user.id)
+    except TreeValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=e.errors,
+        )
+    return {"training_program": training_program, "category_count": category_count, "warnings": warnings}
+
+
 @router.get("/", response_model=List[TrainingProgramSchema])
 def read_training_programs(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     public_only: Optional[bool] = Query(None),
+    fields: Optional[str] = Query(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> Any:
@@ -50,25 +130,44 @@ def read_training_programs(
 
     普通用户：只能看到自己的培养方案和公开的培养方案
     管理员用户：可以看到所有培养方案
+    fields：逗号分隔的字段名，只返回这些字段（总会包含 id）
     """
-    query = db.query(TrainingProgram)
+    try:
+        selected = parse_fields(fields, TRAINING_PROGRAM_FIELDS)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"字段无效: {e}",
+        )
+
+    criteria = []
 
     if not current_user.is_admin:
         # Regular users can only see their own programs and public programs
-        query = query.filter(
-            (TrainingProgram.user_id == current_user.id) | (TrainingProgram.is_public == True)
-        )
+        criteria.append((TrainingProgram.user_id == current_user.id) | (TrainingProgram.is_public == True))
 
     if public_only is not None:
-        query = query.filter(TrainingProgram.is_public == public_only)
+        criteria.append(TrainingProgram.is_public == public_only)
+
+    # 版本取自整个可见集合（而不只是当前页），任何变化都会使所有分页的缓存失效
+    conditional = ConditionalGet(request, current_user, *load_versions(db, (TrainingProgram, *criteria)))
+    if conditional.not_modified:
+        return conditional.not_modified_response()
 
-    training_programs = query.offset(skip).limit(limit).all()
+    if selected is not None:
+        rows = load_field_rows(db, TrainingProgram, selected, *criteria, skip=skip, limit=limit)
+        return ORJSONResponse([row._asdict() for row in rows], headers=conditional.headers)
+
+    conditional.apply(response)
+    training_programs = db.query(TrainingProgram).filter(*criteria).offset(skip).limit(limit).all()
     return training_programs
 
 
 @router.get("/{training_program_id}", response_model=TrainingProgramSchema)
 def read_training_program(
     training_program_id: str,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> Any:
@@ -77,7 +176,7 @@ def read_training_program(
 
     获取指定培养方案的详细信息
     """
-    training_program = db.query(TrainingProgram).filter(TrainingProgram.id == training_program_id).first()
+    training_program = statements.get_training_program(db, training_program_id)
     if not training_program:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -91,6 +190,10 @@ def read_training_program(
             detail="权限不足",
         )
 
+    conditional = ConditionalGet(request, current_user, row_version(training_program))
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+    conditional.apply(response)
     return training_program
 
 
@@ -108,7 +211,7 @@ def update_training_program(
     要想修改只能删除原有的并重新创建新的培养方案
     管理员可以更新任何培养方案
     """
-    training_program = db.query(TrainingProgram).filter(TrainingProgram.id == training_program_id).first()
+    training_program = statements.get_training_program(db, training_program_id)
     if not training_program:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -127,6 +230,17 @@ def update_training_program(
     for field, value in update_data.items():
         setattr(training_program, field, value)
 
+    # 成绩标尺变化后，重新计算该培养方案下所有课程存储的绩点
+    if "grading_scale" in update_data or "grading_scale_breakpoints" in update_data:
+        try:
+            validate_scale(training_program.grading_scale, training_program.grading_scale_breakpoints)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+        recalculate_program_gpa(db, training_program)
+
     db.commit()
     db.refresh(training_program)
     return training_program
@@ -135,6 +249,7 @@ def update_training_program(
 @router.delete("/{training_program_id}", response_model=dict)
 def delete_training_program(
     training_program_id: str,
+    force: bool = Query(False),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> Any:
@@ -143,8 +258,10 @@ def delete_training_program(
 
     普通用户只能删除自己的培养方案
     管理员可以删除任何培养方案
+    类别、课程、课程目录和审核记录按集合一次删除；培养方案下还有其他用户的课程时拒绝删除，
+    管理员可以用 force=true 强制删除
     """
-    training_program = db.query(TrainingProgram).filter(TrainingProgram.id == training_program_id).first()
+    training_program = statements.get_training_program(db, training_program_id)
     if not training_program:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -158,9 +275,17 @@ def delete_training_program(
             detail="权限不足",
         )
 
-    db.delete(training_program)
-    db.commit()
-    return {"message": "培养方案删除成功"}
+    # 公开培养方案下可能有其他用户的课程，不能随培养方案一起被悄悄删除
+    if not (force and current_user.is_admin):
+        foreign_courses = count_foreign_courses(db, program_categories(training_program.id), training_program.user_id)
+        if foreign_courses:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"该培养方案下还有 {foreign_courses} 门其他用户的课程，不能删除",
+            )
+
+    counts = delete_training_program_tree(db, training_program)
+    return {"message": "培养方案删除成功", **counts}
 
 
 @router.post("/{training_program_id}/publish", response_model=TrainingProgramSchema)
@@ -176,14 +301,88 @@ def publish_training_program(
 
     管理员可以将培养方案设置为公开或非公开
     """
-    training_program = db.query(TrainingProgram).filter(TrainingProgram.id == training_program_id).first()
+    training_program = statements.get_training_program(db, training_program_id)
     if not training_program:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="培养方案不存在",
         )
 
+    if training_program.is_public and not publish_data.is_public:
+        # 其他用户的同步客户端需要删除它和它的类别树
+        record_unpublish(db, training_program)
     training_program.is_public = publish_data.is_public
     db.commit()
     db.refresh(training_program)
     return training_program
+
+
+@router.post("/{training_program_id}/clone", response_model=TrainingProgramSchema)
+def clone_training_program_endpoint(
+    training_program_id: str,
+    clone_in: Optional[TrainingProgramClone] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    复制培养方案
+
+    将公开的（或自己的）培养方案连同完整的类别树和课程目录复制为自己的私有培养方案，
+    所有新记录在同一事务中批量写入
+    """
+    training_program = statements.get_training_program(db, training_program_id)
+    if not training_program:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="培养方案不存在",
+        )
+
+    if not current_user.is_admin and training_program.user_id != current_user.id and not training_program.is_public:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="权限不足",
+        )
+
+    return clone_training_program(db, training_program, current_user.id, name=clone_in.name if clone_in else None)
+
+
+@router.get("/{training_program_id}/export")
+def export_training_program_endpoint(
+    training_program_id: str,
+    request: Request,
+    format: str = Query("json", pattern="^(json|yaml)$"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    导出培养方案
+
+    以导入所用的嵌套格式导出培养方案及其完整类别树（JSON 或 YAML），类别一次查询取出
+    """
+    training_program = statements.get_training_program(db, training_program_id)
+    if not training_program:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="培养方案不存在",
+        )
+
+    if not current_user.is_admin and training_program.user_id != current_user.id and not training_program.is_public:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="权限不足",
+        )
+
+    conditional = ConditionalGet(request, current_user, row_version(training_program), *load_versions(
+        db, (CourseCategory, CourseCategory.training_program_id == training_program.id),
+    ))
+    if conditional.not_modified:
+        return conditional.not_modified_response()
+
+    definition = export_training_program(training_program, load_category_records(db, training_program.id))
+    if format == "yaml":
+        return Response(
+            yaml.safe_dump(definition, allow_unicode=True, sort_keys=False),
+            media_type="application/x-yaml",
+            headers=conditional.headers,
+        )
+    return JSONResponse(definition, headers=conditional.headers)
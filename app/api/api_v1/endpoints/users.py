@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user, get_current_active_admin, get_db
+from app.db import statements
 from app.core.security import get_password_hash
 from app.models.user import User
 from app.schemas.user import User as UserSchema, UserUpdate
@@ -32,11 +33,28 @@ def update_current_user(
     """
     更新当前用户信息
 
-    更新当前登录用户的信息，如密码
+    更新当前登录用户的信息，如密码、默认培养方案
     """
     if user_update.password:
         current_user.hashed_password = get_password_hash(user_update.password)
 
+    if "default_training_program_id" in user_update.model_fields_set:
+        training_program_id = user_update.default_training_program_id
+        if training_program_id is not None:
+            training_program = statements.get_training_program(db, training_program_id)
+            if not training_program:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="培养方案不存在",
+                )
+            if not current_user.is_admin and training_program.user_id != current_user.id \
+                    and not training_program.is_public:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="权限不足",
+                )
+        current_user.default_training_program_id = training_program_id
+
     db.commit()
     db.refresh(current_user)
     return current_user
@@ -53,7 +71,7 @@ def read_user_by_id(
 
     管理员可以根据用户ID查询用户信息
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = statements.get_user(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
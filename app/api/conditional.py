@@ -0,0 +1,101 @@
+"""
+条件 GET
+
+培养方案、类别和课程接口的 ETag / Last-Modified 不从响应体计算，而由数据的版本得出：集合的版本是
+一条语句取得的行数和 max(updated_at)（从未修改的行取 created_at），新增、修改、删除都会改变其中之一；
+单行的版本直接取已载入行的时间戳。客户端的 If-None-Match / If-Modified-Since 仍然有效时返回 304，
+省去加载数据和序列化。
+
+ETag 还包含请求路径、查询参数和当前用户：同一 URL 对不同用户的响应不同。响应带 Cache-Control: private, no-cache，
+浏览器每次使用缓存前都会重新验证。SQLite 的时间戳精度为秒，同一秒内对同一集合的第二次修改可能不会改变版本。
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from fastapi import Request, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+
+
+class Version(NamedTuple):
+    count: int
+    last_modified: Optional[datetime]
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite returns naive timestamps, which CURRENT_TIMESTAMP writes in UTC
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def load_versions(db: Session, *collections: Sequence) -> List[Version]:
+    """
+    Versions of several collections in one statement; each collection is (model, *criteria)
+    """
+    columns = []
+    for model, *criteria in collections:
+        changed_at = func.coalesce(model.updated_at, model.created_at)
+        columns.append(select(func.count(model.id)).where(*criteria).scalar_subquery())
+        columns.append(select(func.max(changed_at)).where(*criteria).scalar_subquery())
+    row = db.execute(select(*columns)).one()
+    return [Version(row[i], _as_utc(row[i + 1])) for i in range(0, len(row), 2)]
+
+
+def row_version(obj) -> Version:
+    return Version(1, _as_utc(obj.updated_at or obj.created_at))
+
+
+def _etag_values(header: str) -> List[str]:
+    """Opaque tags of an If-None-Match header, without W/ and the encoding suffix CompressionMiddleware adds"""
+    values = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        values.append(tag.strip('"').split("-", 1)[0])
+    return values
+
+
+class ConditionalGet:
+    """ETag / Last-Modified of a response and whether the client's cached copy is still current"""
+
+    def __init__(self, request: Request, current_user: User, *versions: Version):
+        fingerprint = hashlib.blake2b(digest_size=16)
+        for part in (request.url.path, request.url.query, current_user.id, current_user.is_admin, *versions):
+            fingerprint.update(repr(part).encode())
+            fingerprint.update(b"\0")
+        self.etag = f'"{fingerprint.hexdigest()}"'
+        timestamps = [version.last_modified for version in versions if version.last_modified is not None]
+        self.last_modified = max(timestamps) if timestamps else None
+
+        self.headers: Dict[str, str] = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if self.last_modified is not None:
+            self.headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        self.not_modified = self._not_modified(request)
+
+    def _not_modified(self, request: Request) -> bool:
+        # If-None-Match takes precedence; If-Modified-Since is only looked at without it
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            return if_none_match.strip() == "*" or self.etag.strip('"') in _etag_values(if_none_match)
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and self.last_modified is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return self.last_modified.replace(microsecond=0) <= since
+        return False
+
+    def apply(self, response: Response) -> None:
+        response.headers.update(self.headers)
+
+    def not_modified_response(self) -> Response:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers)
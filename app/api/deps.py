@@ -18,6 +18,7 @@ from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.security import verify_password
+from app.db import statements
 from app.db.base import get_db
 from app.models.user import User
 from app.schemas.user import TokenPayload
@@ -40,6 +41,24 @@ def verify_api_key(api_key: str = Security(api_key_header)) -> None:
         )
 
 
+def mark_read_only(db: Session = Depends(get_db)) -> None:
+    """
+    将非 GET 的只读端点（如计算类 POST 请求）标记为只读，使其查询可以路由到只读副本
+
+    需作为路由的 dependencies 使用，以便在任何查询之前生效
+    """
+    db.info["read_only"] = True
+
+
+def require_primary(db: Session = Depends(get_db)) -> None:
+    """
+    让 GET 端点的查询全部走主库，用于不能容忍副本延迟的读取（如增量同步的令牌时间）
+
+    需作为路由的 dependencies 使用，以便在任何查询之前生效
+    """
+    db.info["read_only"] = False
+
+
 def get_current_user(
     db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
 ) -> User:
@@ -58,7 +77,9 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(User).filter(User.id == token_data.sub).first()
+    # Lets the routing session apply the read-your-writes window for this user
+    db.info["user_id"] = token_data.sub
+    user = statements.get_user(db, token_data.sub)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,34 @@
+"""
+稀疏字段集
+
+列表接口的 fields= 参数是逗号分隔的字段名，可选的是响应模型中对应数据库列的字段，id 总会返回。
+所选字段下推为 SQL 的列投影（app.db.projections.load_field_rows），结果行直接渲染为 JSON，
+不构造 ORM 实体，也不经过完整响应模型的校验。
+"""
+from typing import List, Optional, Type
+
+from pydantic import BaseModel
+
+ALWAYS_INCLUDED = ("id",)
+
+
+def selectable_fields(schema: Type[BaseModel], model) -> List[str]:
+    """Fields of the response schema that are columns of the model, in schema order"""
+    columns = model.__table__.columns
+    return [name for name in schema.model_fields if name in columns]
+
+
+def parse_fields(fields: Optional[str], allowed: List[str]) -> Optional[List[str]]:
+    """
+    Requested fields in schema order, or None for the full representation.
+
+    Raises ValueError naming the fields that are not in `allowed`.
+    """
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}; choose from {', '.join(allowed)}")
+    requested.update(ALWAYS_INCLUDED)
+    return [name for name in allowed if name in requested]
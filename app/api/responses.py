@@ -0,0 +1,23 @@
+"""
+orjson 响应
+
+FastAPI 对声明了 response_model 的路由先按模型校验返回值再序列化；
+credit-summary、类别树这类由服务层从数据库行直接构造出的字典，结构已经和响应模型一致，
+校验整棵树只是重复工作，这些接口直接返回 ORJSONResponse，跳过校验，response_model 仍用于 OpenAPI 文档。
+它不是应用的默认响应类：自定义的默认响应类会让 FastAPI 放弃其余路由按响应模型直接 dump_json 的快速路径。
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+# UTC datetimes end in "Z", the same as Pydantic's own serializer, so a trusted response
+# renders exactly like the validated one
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+class ORJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
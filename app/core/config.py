@@ -9,6 +9,40 @@ class Settings(BaseSettings):
 
     # Database settings
     DATABASE_URL: str
+    # Read replicas (comma-separated URLs); empty means every query goes to the primary
+    DATABASE_REPLICA_URLS: str = ""
+    # Seconds a user's reads stay on the primary after their own write (read-your-writes; the window
+    # is carried by the client in a signed cookie / X-Last-Write header, so it holds across workers)
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    # Interval for refreshing SQLite replicas through the backup API, 0 disables it
+    SQLITE_REPLICA_SYNC_SECONDS: float = 0
+
+    # SQL instrumentation: N+1 detection mode ("off", "warn" or "raise") and the number of
+    # times one statement shape may run in a single request before it is reported
+    SQL_N_PLUS_ONE_MODE: str = "warn"
+    SQL_N_PLUS_ONE_THRESHOLD: int = 10
+    # Statements slower than this are written to logs/slow_query.log with their plan, 0 disables it
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+
+    # Graduation audit jobs: students per process-pool task, and pool size (0 = one per CPU); a
+    # pending or running job without progress for AUDIT_HEARTBEAT_TIMEOUT_SECONDS was interrupted
+    # (its worker restarted or stopped) and is marked failed
+    AUDIT_CHUNK_SIZE: int = 500
+    AUDIT_MAX_WORKERS: int = 0
+    AUDIT_HEARTBEAT_TIMEOUT_SECONDS: int = 300
+
+    # Delta sync: seconds each sync re-reads before its token (writes committed after the token was
+    # issued but timestamped before it), and days deletions are kept; older tokens get a full sync
+    SYNC_TOKEN_OVERLAP_SECONDS: float = 5
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 90
+
+    # Idempotency-Key: hours a stored response is replayed, seconds a duplicate waits for the first
+    # request before getting 409, seconds after which an unfinished claim is abandoned (its worker was
+    # killed; 0 = SERVER_TIMEOUT_SECONDS + 30, never less than that), and the largest response body kept
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+    IDEMPOTENCY_WAIT_SECONDS: float = 30
+    IDEMPOTENCY_LEASE_SECONDS: float = 0
+    IDEMPOTENCY_MAX_BODY_BYTES: int = 1048576
 
     # JWT settings
     SECRET_KEY: str
@@ -30,6 +64,27 @@ class Settings(BaseSettings):
 
     # Frontend origins for CORS
     FRONTEND_ORIGINS: str = "http://localhost:3000"
+    # Seconds browsers may cache a CORS preflight (Chromium caps it at 7200)
+    CORS_MAX_AGE: int = 86400
+
+    # Responses smaller than this many bytes are sent uncompressed
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+
+    # Production server (gunicorn_conf.py): worker count (0 = 2 * CPUs + 1, capped by memory at
+    # SERVER_WORKER_MEMORY_MB per worker), whether to import the app once in the master so workers
+    # share its pages copy-on-write, requests before a worker is recycled (plus random jitter so they
+    # do not all restart together), keep-alive and listen backlog, and seconds a silent worker is
+    # killed after / in-flight requests get to finish on shutdown or reload
+    SERVER_BIND: str = "0.0.0.0:8000"
+    SERVER_WORKERS: int = 0
+    SERVER_WORKER_MEMORY_MB: int = 256
+    SERVER_PRELOAD_APP: bool = True
+    SERVER_MAX_REQUESTS: int = 10000
+    SERVER_MAX_REQUESTS_JITTER: int = 1000
+    SERVER_KEEPALIVE_SECONDS: int = 5
+    SERVER_BACKLOG: int = 2048
+    SERVER_TIMEOUT_SECONDS: int = 60
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = 30
 
     @model_validator(mode='after')
     def parse_admin_emails(self) -> 'Settings':
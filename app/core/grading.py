@@ -0,0 +1,145 @@
+"""
+成绩-绩点换算标尺
+
+每个培养方案选择一个标尺（内置标尺名，或自定义分段表）。标尺在首次使用时编译成按 0.1 分步长的
+稠密查找表（0-100 分共 1001 项），并按进程缓存；整份成绩单的换算只需数组下标访问，不再逐行分支计算。
+"""
+from array import array
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is in requirements.txt, the pure-Python path is a fallback
+    np = None
+
+DEFAULT_SCALE = "standard"
+
+# Lookup resolution: one table entry per 0.1 point of a 0-100 grade
+STEPS_PER_POINT = 10
+MAX_GRADE = 100
+
+Breakpoints = Sequence[Tuple[float, float]]
+
+
+def calculate_gpa(grade: Optional[float]) -> Optional[float]:
+    """GPA formula: 4 - 3 * (100 - x)^2 / 1600, rounded to 3 decimals"""
+    if grade is None:
+        return None
+    return round(4 - 3 * ((100 - grade) ** 2) / 1600, 3)
+
+
+def _five_point(grade: float) -> float:
+    # 60 分及以上按 (x - 50) / 10 计，满分 5.0
+    return round((grade - 50) / 10, 3) if grade >= 60 else 0.0
+
+
+# Piecewise scales: (minimum grade, grade points), highest band first
+LETTER_4_3: Breakpoints = (
+    (97, 4.3), (93, 4.0), (90, 3.7), (87, 3.3), (83, 3.0), (80, 2.7), (77, 2.3),
+    (73, 2.0), (70, 1.7), (67, 1.3), (63, 1.0), (60, 0.7), (0, 0.0),
+)
+LETTER_4_0: Breakpoints = ((90, 4.0), (80, 3.0), (70, 2.0), (60, 1.0), (0, 0.0))
+
+BUILTIN_SCALES: Dict[str, Tuple[Optional[Callable[[float], float]], Optional[Breakpoints]]] = {
+    DEFAULT_SCALE: (calculate_gpa, None),
+    "five_point": (_five_point, None),
+    "letter_4_3": (None, LETTER_4_3),
+    "letter_4_0": (None, LETTER_4_0),
+    "custom": (None, None),
+}
+
+
+def validate_breakpoints(breakpoints: Iterable[Sequence[float]]) -> Tuple[Tuple[float, float], ...]:
+    """Normalize a custom piecewise table to ((min_grade, points), ...) sorted by grade, descending"""
+    normalized = []
+    for band in breakpoints:
+        if len(band) != 2:
+            raise ValueError("每个分段必须是 [最低分, 绩点]")
+        min_grade, points = float(band[0]), float(band[1])
+        if not 0 <= min_grade <= MAX_GRADE:
+            raise ValueError("分段最低分必须在 0 到 100 之间")
+        if points < 0:
+            raise ValueError("绩点不能为负数")
+        normalized.append((min_grade, points))
+    if not normalized:
+        raise ValueError("自定义标尺至少需要一个分段")
+    normalized.sort(reverse=True)
+    if len({min_grade for min_grade, _ in normalized}) != len(normalized):
+        raise ValueError("分段最低分不能重复")
+    return tuple(normalized)
+
+
+def validate_scale(name: str, breakpoints: Optional[Iterable[Sequence[float]]] = None) -> None:
+    if name not in BUILTIN_SCALES:
+        raise ValueError(f"未知的成绩标尺: {name}，可选: {', '.join(BUILTIN_SCALES)}")
+    if name == "custom":
+        if breakpoints is None:
+            raise ValueError("自定义标尺需要提供分段表")
+        validate_breakpoints(breakpoints)
+
+
+def _piecewise(breakpoints: Breakpoints) -> Callable[[float], float]:
+    def convert(grade: float) -> float:
+        for min_grade, points in breakpoints:
+            if grade >= min_grade:
+                return points
+        return 0.0
+    return convert
+
+
+class CompiledScale:
+    """A grading scale compiled to a dense lookup table"""
+
+    __slots__ = ("name", "exact", "table", "np_table")
+
+    def __init__(self, name: str, exact: Callable[[float], float]):
+        self.name = name
+        self.exact = exact
+        self.table = array("d", (exact(i / STEPS_PER_POINT) for i in range(MAX_GRADE * STEPS_PER_POINT + 1)))
+        self.np_table = np.frombuffer(self.table, dtype=np.float64) if np is not None else None
+
+    def convert(self, grade: Optional[float]) -> Optional[float]:
+        if grade is None:
+            return None
+        scaled = grade * STEPS_PER_POINT
+        index = int(scaled)
+        if index == scaled and 0 <= index < len(self.table):
+            return self.table[index]
+        # Grades finer than the table resolution are evaluated exactly
+        return self.exact(grade)
+
+    def convert_many(self, grades: Sequence[float]) -> List[float]:
+        """Convert a whole transcript of (non-null) grades at once"""
+        if np is None:
+            return [self.convert(grade) for grade in grades]
+        values = np.asarray(grades, dtype=np.float64)
+        scaled = values * STEPS_PER_POINT
+        indexes = np.rint(scaled)
+        result = self.np_table[np.clip(indexes, 0, len(self.table) - 1).astype(np.intp)]
+        inexact = np.nonzero(indexes != scaled)[0]
+        if len(inexact):
+            result = result.copy()
+            for position in inexact:
+                result[position] = self.exact(float(values[position]))
+        return result.tolist()
+
+
+@lru_cache(maxsize=256)
+def _compile(name: str, breakpoints: Optional[Tuple[Tuple[float, float], ...]]) -> CompiledScale:
+    formula, builtin_breakpoints = BUILTIN_SCALES[name]
+    if formula is None:
+        formula = _piecewise(breakpoints if name == "custom" else builtin_breakpoints)
+    return CompiledScale(name, formula)
+
+
+def get_scale(name: Optional[str] = None, breakpoints: Optional[Iterable[Sequence[float]]] = None) -> CompiledScale:
+    """Compiled scale for a training program's settings, cached per process"""
+    name = name or DEFAULT_SCALE
+    if name not in BUILTIN_SCALES:
+        name = DEFAULT_SCALE
+    if name == "custom":
+        if not breakpoints:
+            return _compile(DEFAULT_SCALE, None)
+        return _compile(name, validate_breakpoints(breakpoints))
+    return _compile(name, None)
@@ -76,6 +76,19 @@ def setup_logging():
         root_logger.addHandler(file_handler)
 
         print(f"成功配置日志文件: {log_file}")
+
+        # 慢查询日志写入独立的滚动文件，不再传播到 app.log
+        slow_query_logger = logging.getLogger("app.slow_query")
+        for handler in slow_query_logger.handlers[:]:
+            slow_query_logger.removeHandler(handler)
+        slow_query_handler = RotatingFileHandler(
+            f"{LOG_DIR}/slow_query.log",
+            maxBytes=10485760,  # 10MB
+            backupCount=5
+        )
+        slow_query_handler.setFormatter(logging.Formatter("%(message)s"))
+        slow_query_logger.addHandler(slow_query_handler)
+        slow_query_logger.propagate = False
     except (IOError, PermissionError) as e:
         # 如果无法创建文件处理器，记录错误但继续运行
         print(f"警告: 无法创建日志文件处理器: {str(e)}")
@@ -0,0 +1,316 @@
+"""
+ASGI 中间件
+"""
+import asyncio
+import gzip
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.security import get_token_subject
+from app.db.base import WriteWindow, current_write_window, replica_engines, sign_write
+from app.db.instrumentation import RequestQueryStats, current_query_stats
+from app.services.idempotency import IN_PROGRESS, MISMATCH, REPLAY, claim_key, release_key, request_hash, store_response
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is in requirements.txt, without it only gzip is offered
+    brotli = None
+
+logger = logging.getLogger("app.sql")
+
+
+class QueryStatsMiddleware:
+    """
+    为每个请求收集 SQL 统计信息
+
+    通过 Server-Timing 响应头返回查询次数和数据库耗时，并以结构化字段记录到日志
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope)
+        token = current_query_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing(time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            if stats.query_count:
+                fields = stats.log_fields()
+                fields["status_code"] = status_code
+                logger.info(
+                    f"{fields['endpoint']} status={status_code} queries={fields['query_count']} "
+                    f"db_ms={fields['db_time_ms']} routes={fields['routes']} "
+                    f"repeated={fields['repeated_statements']}",
+                    extra={"sql_stats": fields},
+                )
+
+
+COMPRESSIBLE_TYPES = {"application/json", "application/x-yaml", "application/javascript", "image/svg+xml"}
+
+
+READ_YOUR_WRITES_COOKIE = "last_write"
+READ_YOUR_WRITES_HEADER = "x-last-write"
+
+
+class ReadYourWritesMiddleware:
+    """
+    跨工作进程的读己之写（配置了只读副本时生效）
+
+    提交了写入的请求在响应中带上签名的写入时间（Cookie last_write 和 X-Last-Write 响应头），
+    客户端在 READ_YOUR_WRITES_SECONDS 内带回 Cookie 或 X-Last-Write 请求头时，读取走主库；
+    令牌绑定用户，校验见 app.db.base.has_recent_write
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not replica_engines:
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        token = request_headers.get(READ_YOUR_WRITES_HEADER)
+        if token is None:
+            cookies = request_headers.get("cookie", "")
+            for cookie in cookies.split(";"):
+                name, _, value = cookie.strip().partition("=")
+                if name == READ_YOUR_WRITES_COOKIE:
+                    token = value
+        window = WriteWindow(token)
+        context_token = current_write_window.set(window)
+
+        async def send_with_write_token(message: Message) -> None:
+            if message["type"] == "http.response.start" and window.committed is not None:
+                user_id, written_at = window.committed
+                signed = sign_write(user_id, written_at)
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Last-Write", signed)
+                secure = "; Secure" if scope.get("scheme") == "https" else ""
+                headers.append("Set-Cookie", f"{READ_YOUR_WRITES_COOKIE}={signed}; Path=/; "
+                                             f"Max-Age={int(settings.READ_YOUR_WRITES_SECONDS) + 1}; HttpOnly; "
+                                             f"SameSite=Lax{secure}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_write_token)
+        finally:
+            current_write_window.reset(context_token)
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type.startswith("text/") or media_type.endswith("+json") or media_type in COMPRESSIBLE_TYPES
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """The client's preferred encoding among br (when available) and gzip, by q-value; br wins ties"""
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip().lower()] = quality
+
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    # An explicitly listed coding overrides "*"
+    ranked = [(qualities.get(coding, qualities.get("*", 0.0)), coding) for coding in offered]
+    quality, coding = max(ranked, key=lambda item: (item[0], item[1] == "br"))
+    return coding if quality > 0 else None
+
+
+class CompressionMiddleware:
+    """
+    按 Accept-Encoding 协商 br / gzip 压缩响应
+
+    只压缩一次性发送、不小于 minimum_size 字节的文本和 JSON 响应；流式响应、已编码的响应和 304 原样转发。
+    压缩后的表示是另一个字节序列，强 ETag 加上编码后缀（"<tag>-gzip"），app/api/conditional.py 比较时会去掉后缀
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start_message: Optional[Message] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Held back until the body shows whether the response is compressed
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(scope=start)
+            body = message.get("body", b"")
+            if message.get("more_body", False) or "content-encoding" in headers \
+                    or not is_compressible(headers.get("content-type")):
+                await send(start)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is not None and len(body) >= self.minimum_size:
+                body = self.compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                etag = headers.get("etag")
+                if etag and etag.endswith('"'):
+                    headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+                message = {**message, "body": body}
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+
+class IdempotencyMiddleware:
+    """
+    POST 请求的 Idempotency-Key 处理（存储和重放见 app/services/idempotency.py）
+
+    只处理带该请求头和有效访问令牌的 POST 请求，键按令牌中的用户区分；重放的响应带 Idempotent-Replayed: true。
+    放在 CORS 中间件之内，重放的响应同样经过 CORS 处理
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get("idempotency-key")
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        user_id = get_token_subject(token) if key is not None and scheme.lower() == "bearer" else None
+        if user_id is None:
+            # Without a user the endpoint rejects the request anyway
+            await self.app(scope, receive, send)
+            return
+        key = key.strip()
+        if not key or len(key) > 255:
+            await JSONResponse({"detail": "Idempotency-Key 无效，长度应为 1 到 255 个字符"}, status_code=400)(
+                scope, receive, send)
+            return
+
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+
+        fingerprint = request_hash(scope["method"], scope["path"], scope.get("query_string", b""), body)
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        delay = 0.05
+        claim = await run_in_threadpool(claim_key, user_id, key, fingerprint)
+        while claim.outcome == IN_PROGRESS and time.monotonic() < deadline:
+            # A concurrent duplicate: wait for the first execution's response
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+            claim = await run_in_threadpool(claim_key, user_id, key, fingerprint)
+
+        if claim.outcome == IN_PROGRESS:
+            await JSONResponse({"detail": "使用相同 Idempotency-Key 的请求仍在处理中，请稍后重试"}, status_code=409)(
+                scope, receive, send)
+            return
+        if claim.outcome == MISMATCH:
+            await JSONResponse({"detail": "Idempotency-Key 已用于另一个请求"}, status_code=422)(scope, receive, send)
+            return
+        if claim.outcome == REPLAY:
+            replayed_headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in claim.headers]
+            replayed_headers += [(b"content-length", str(len(claim.body)).encode()), (b"idempotent-replayed", b"true")]
+            await send({"type": "http.response.start", "status": claim.status_code, "headers": replayed_headers})
+            await send({"type": "http.response.body", "body": claim.body})
+            return
+
+        body_sent = False
+
+        async def receive_body() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status_code = 500
+        response_headers: List[Tuple[str, str]] = []
+        response_chunks = []
+        response_size = 0
+
+        async def send_recorded(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers.extend(
+                    (name.decode("latin-1"), value.decode("latin-1")) for name, value in message.get("headers", [])
+                    if name.lower() != b"content-length"
+                )
+            elif message["type"] == "http.response.body":
+                # Past the size limit the response is not stored, so stop keeping it in memory
+                response_size += len(message.get("body", b""))
+                if response_size <= settings.IDEMPOTENCY_MAX_BODY_BYTES:
+                    response_chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, send_recorded)
+        except BaseException:
+            await run_in_threadpool(release_key, claim.record_id)
+            raise
+        if response_size > settings.IDEMPOTENCY_MAX_BODY_BYTES:
+            await run_in_threadpool(release_key, claim.record_id)
+        else:
+            await run_in_threadpool(store_response, claim.record_id, status_code, response_headers,
+                                    b"".join(response_chunks))
@@ -0,0 +1,92 @@
+"""
+生产服务器配置
+
+gunicorn_conf.py、start_production.py 和 main.py 共用这里的计算：工作进程数取 CPU 数与内存两者的约束，
+CPU 数和内存优先读取容器 cgroup 限额，其次是进程可用的 CPU 和物理内存。
+uvicorn 在安装了 uvloop / httptools 时自动使用它们（loop="auto"、http="auto"），这里只用于启动时报告。
+"""
+import os
+from importlib.util import find_spec
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+MIB = 1024 * 1024
+
+
+def _read_cgroup(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cpu_count() -> int:
+    """CPUs this process may use, honouring the container's CPU quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS / Windows
+        cpus = os.cpu_count() or 1
+    # cgroup v2 "cpu.max" is "<quota> <period>" or "max <period>"; v1 splits them into two files
+    quota, period = None, None
+    cpu_max = _read_cgroup("/sys/fs/cgroup/cpu.max")
+    if cpu_max:
+        parts = cpu_max.split()
+        if parts[0] != "max":
+            quota, period = int(parts[0]), int(parts[1])
+    else:
+        v1_quota = _read_cgroup("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+        v1_period = _read_cgroup("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+        if v1_quota and v1_period and int(v1_quota) > 0:
+            quota, period = int(v1_quota), int(v1_period)
+    if quota and period:
+        cpus = min(cpus, max(1, -(-quota // period)))
+    return max(1, cpus)
+
+
+def memory_bytes() -> Optional[int]:
+    """Memory available to this process, honouring the container's memory limit; None if unknown"""
+    try:
+        physical = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        physical = None
+    limit = _read_cgroup("/sys/fs/cgroup/memory.max") or _read_cgroup("/sys/fs/cgroup/memory/memory.limit_in_bytes")
+    # "max" (v2) or a huge sentinel (v1) means unlimited
+    if limit and limit.isdigit() and (physical is None or int(limit) < physical):
+        return int(limit)
+    return physical
+
+
+def worker_count() -> int:
+    """
+    SERVER_WORKERS if set, otherwise 2 * CPUs + 1, capped so each worker gets SERVER_WORKER_MEMORY_MB.
+    """
+    if settings.SERVER_WORKERS > 0:
+        return settings.SERVER_WORKERS
+    workers = 2 * cpu_count() + 1
+    memory = memory_bytes()
+    if memory is not None:
+        workers = min(workers, memory // (settings.SERVER_WORKER_MEMORY_MB * MIB))
+    return max(1, workers)
+
+
+def event_loop() -> str:
+    return "uvloop" if find_spec("uvloop") else "asyncio"
+
+
+def http_protocol() -> str:
+    return "httptools" if find_spec("httptools") else "h11"
+
+
+def profile() -> Dict[str, object]:
+    """What the server will start with, for the startup log"""
+    memory = memory_bytes()
+    return {
+        "cpus": cpu_count(),
+        "memory_mb": memory // MIB if memory is not None else None,
+        "workers": worker_count(),
+        "preload": settings.SERVER_PRELOAD_APP,
+        "loop": event_loop(),
+        "http": http_protocol(),
+    }
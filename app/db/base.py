@@ -8,26 +8,212 @@ Description:
 
 Copyright (c) 2025 by Ethan, All Rights Reserved.
 '''
-from sqlalchemy import create_engine
+import hashlib
+import hmac
+import itertools
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
 
-# Enable foreign key constraints for SQLite
-connect_args = {}
-if settings.DATABASE_URL.startswith("sqlite"):
-    connect_args["check_same_thread"] = False
+logger = logging.getLogger(__name__)
+
+
+def _connect_args(url: str) -> dict:
+    # Enable foreign key constraints for SQLite
+    connect_args = {}
+    if url.startswith("sqlite"):
+        connect_args["check_same_thread"] = False
+    return connect_args
+
+
+# The "db_route" execution option tags every connection with the engine it came from,
+# so query instrumentation can report where each statement was routed.
+engine = create_engine(
+    settings.DATABASE_URL,
+    connect_args=_connect_args(settings.DATABASE_URL),
+    execution_options={"db_route": "primary"},
+)
+
+replica_urls = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+replica_engines = [
+    create_engine(url, connect_args=_connect_args(url), execution_options={"db_route": f"replica-{index}"})
+    for index, url in enumerate(replica_urls)
+]
+_replica_cycle = itertools.cycle(replica_engines) if replica_engines else None
+_replica_lock = threading.Lock()
+
+class WriteWindow:
+    """
+    Read-your-writes state of one request.
+
+    The window travels with the client rather than living in a worker: a request that commits a
+    write gets a signed "<timestamp>.<signature>" token (cookie and header, see
+    app/core/middleware.ReadYourWritesMiddleware), and while the client sends it back its reads go to
+    the primary, whichever worker or host serves them. Clients that drop the cookie and do not echo
+    the header only get the window within the request that wrote.
+    """
+
+    def __init__(self, token: Optional[str] = None) -> None:
+        self.token = token
+        # (user_id, wall-clock time) of the last write committed by this request
+        self.committed: Optional[Tuple[str, float]] = None
+
+
+current_write_window: ContextVar[Optional[WriteWindow]] = ContextVar("current_write_window", default=None)
+
+
+def _write_signature(user_id: str, written_at: str) -> str:
+    message = f"{user_id}:{written_at}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()[:32]
+
+
+def sign_write(user_id: str, written_at: float) -> str:
+    timestamp = f"{written_at:.3f}"
+    return f"{timestamp}.{_write_signature(user_id, timestamp)}"
+
+
+def _token_write_time(token: Optional[str], user_id: str) -> Optional[float]:
+    timestamp, _, signature = (token or "").rpartition(".")
+    if not signature or not hmac.compare_digest(signature, _write_signature(user_id, timestamp)):
+        return None
+    try:
+        return float(timestamp)
+    except ValueError:
+        return None
+
+
+def record_user_write(user_id: str) -> None:
+    """Start the read-your-writes window for a user"""
+    window = current_write_window.get()
+    if window is not None:
+        window.committed = (user_id, time.time())
+
+
+def has_recent_write(user_id: Optional[str]) -> bool:
+    """Whether a user is still inside the read-your-writes window"""
+    window = current_write_window.get()
+    if not user_id or window is None:
+        return False
+    if window.committed is not None and window.committed[0] == user_id:
+        return True
+    written_at = _token_write_time(window.token, user_id)
+    return written_at is not None and time.time() - written_at < settings.READ_YOUR_WRITES_SECONDS
+
+
+def _next_replica():
+    with _replica_lock:
+        return next(_replica_cycle)
 
-engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+class RoutingSession(Session):
+    """
+    Session that sends reads of read-only requests to a replica and everything else to the primary.
+
+    The replica is chosen once per session (round-robin over the configured replicas) so that
+    all reads of a request see one consistent snapshot. A session falls back to the primary when
+    it flushes or executes DML, and when its user committed a write within READ_YOUR_WRITES_SECONDS.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if not replica_engines or not self.info.get("read_only"):
+            return engine
+        if self._flushing or self.info.get("wrote") or getattr(clause, "is_dml", False):
+            return engine
+
+        route = self.info.get("route")
+        if route is None:
+            if has_recent_write(self.info.get("user_id")):
+                route = engine
+                logger.debug("read-your-writes: routing user %s to primary", self.info.get("user_id"))
+            else:
+                route = _next_replica()
+            self.info["route"] = route
+        return route
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_flush_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _mark_dml_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _record_commit_write(session):
+    if session.info.pop("wrote", False) and session.info.get("user_id"):
+        record_user_write(session.info["user_id"])
+    # A new transaction may pick a different replica (or the primary after a write)
+    session.info.pop("route", None)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _reset_route(session):
+    session.info.pop("wrote", None)
+    session.info.pop("route", None)
+
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
+def sync_sqlite_replicas() -> None:
+    """
+    Copy the primary SQLite database into every SQLite replica through the backup API.
+
+    Intended for development and testing, where a local file copy stands in for a real replica.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    source = engine.raw_connection()
+    try:
+        for replica in replica_engines:
+            if replica.dialect.name != "sqlite":
+                continue
+            target = replica.raw_connection()
+            try:
+                source.driver_connection.backup(target.driver_connection)
+            finally:
+                target.close()
+    finally:
+        source.close()
+
+
+def start_sqlite_replica_sync(interval: float) -> Optional[threading.Thread]:
+    """Refresh SQLite replicas every `interval` seconds in a daemon thread"""
+    if interval <= 0 or not replica_engines:
+        return None
+
+    def _run():
+        while True:
+            try:
+                sync_sqlite_replicas()
+            except Exception as e:
+                logger.error(f"同步SQLite副本失败: {str(e)}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=_run, name="sqlite-replica-sync", daemon=True)
+    thread.start()
+    return thread
+
+
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
+def get_db(request: Request):
+    # GET/HEAD requests are read-only and may be served by a replica
+    db = SessionLocal(info={"read_only": request.method in ("GET", "HEAD")})
     try:
         yield db
     finally:
@@ -0,0 +1,168 @@
+"""
+按请求统计 SQL 执行情况（查询次数、数据库耗时、重复语句指纹、路由去向）并检测 N+1 查询
+"""
+import hashlib
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.db.slow_query import slow_query_log
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class NPlusOneError(RuntimeError):
+    """Raised in SQL_N_PLUS_ONE_MODE=raise when one statement shape repeats too often in a request"""
+
+
+@lru_cache(maxsize=4096)
+def fingerprint_statement(statement: str) -> Tuple[str, str]:
+    """
+    Normalize a SQL statement to its shape and return (fingerprint, normalized_sql).
+
+    Literals become `?` and expanded IN lists collapse to `(?)`, so the same query issued
+    with different parameters or list lengths shares one fingerprint.
+    """
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _STRING_LITERAL.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(?)", normalized)
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12], normalized
+
+
+class RequestQueryStats:
+    """SQL statistics collected for a single HTTP request"""
+
+    __slots__ = ("scope", "query_count", "db_time", "fingerprints", "statements", "routes", "route_time", "_flagged")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope
+        self.query_count = 0
+        self.db_time = 0.0
+        self.fingerprints: Counter = Counter()
+        self.statements = {}
+        self.routes: Counter = Counter()
+        self.route_time: Counter = Counter()
+        self._flagged = set()
+
+    @property
+    def endpoint(self) -> str:
+        """Request path with path parameters replaced by their names, e.g. GET /api/v1/courses/{course_id}"""
+        if not self.scope:
+            return "-"
+        path = self.scope.get("path", "-")
+        for name, value in (self.scope.get("path_params") or {}).items():
+            path = path.replace(f"/{value}", f"/{{{name}}}", 1)
+        return f"{self.scope.get('method', '-')} {path}"
+
+    def record(self, statement: str, elapsed: float, route: str) -> None:
+        fingerprint, normalized = fingerprint_statement(statement)
+        self.query_count += 1
+        self.db_time += elapsed
+        self.routes[route] += 1
+        self.route_time[route] += elapsed
+        self.fingerprints[fingerprint] += 1
+        self.statements.setdefault(fingerprint, normalized)
+
+        mode = settings.SQL_N_PLUS_ONE_MODE
+        if mode == "off" or fingerprint in self._flagged:
+            return
+        repeats = self.fingerprints[fingerprint]
+        if repeats > settings.SQL_N_PLUS_ONE_THRESHOLD:
+            self._flagged.add(fingerprint)
+            message = (
+                f"N+1 query detected on {self.endpoint}: statement {fingerprint} ran more than "
+                f"{settings.SQL_N_PLUS_ONE_THRESHOLD} times: {normalized}"
+            )
+            if mode == "raise":
+                raise NPlusOneError(message)
+            logger.warning(message)
+
+    def repeated(self, minimum: int = 2) -> dict:
+        """Fingerprints that ran at least `minimum` times in this request"""
+        return {fp: count for fp, count in self.fingerprints.most_common() if count >= minimum}
+
+    def server_timing(self, total_time: Optional[float] = None) -> str:
+        """Render the statistics as a Server-Timing header value"""
+        metrics = [f'db;dur={self.db_time * 1000:.3f};desc="{self.query_count} queries"']
+        for route, count in sorted(self.routes.items()):
+            metrics.append(f'db-{route};dur={self.route_time[route] * 1000:.3f};desc="{count} queries"')
+        if total_time is not None:
+            metrics.append(f"app;dur={total_time * 1000:.3f}")
+        return ", ".join(metrics)
+
+    def log_fields(self) -> dict:
+        return {
+            "endpoint": self.endpoint,
+            "query_count": self.query_count,
+            "db_time_ms": round(self.db_time * 1000, 3),
+            "routes": dict(self.routes),
+            "repeated_statements": self.repeated(),
+        }
+
+
+# Process-wide SQLAlchemy compiled-cache outcomes (CACHE_HIT, CACHE_MISS, ...) since startup
+compiled_cache_stats: Counter = Counter()
+
+
+def compiled_cache_summary() -> dict:
+    """Compiled-statement cache hit rate since startup plus the current size of each engine's cache"""
+    from app.db.base import engine, replica_engines
+
+    hits = compiled_cache_stats.get("CACHE_HIT", 0)
+    misses = compiled_cache_stats.get("CACHE_MISS", 0)
+    caches = {}
+    for db_engine in [engine, *replica_engines]:
+        cache = db_engine._compiled_cache
+        route = db_engine.get_execution_options().get("db_route", "primary")
+        caches[route] = {"size": len(cache) if cache is not None else 0,
+                         "capacity": cache.capacity if cache is not None else 0}
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        "outcomes": dict(compiled_cache_stats),
+        "caches": caches,
+    }
+
+
+current_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_start_time"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("query_start_time", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats = current_query_stats.get()
+    cache_hit = getattr(context, "cache_hit", None)
+    if cache_hit is not None:
+        compiled_cache_stats[cache_hit.name] += 1
+
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS
+    if threshold > 0 and elapsed * 1000 >= threshold:
+        fingerprint, normalized = fingerprint_statement(statement)
+        slow_query_log.submit(conn.engine, fingerprint, normalized, statement, parameters, executemany,
+                              elapsed, stats.endpoint if stats is not None else "-")
+
+    if stats is not None:
+        stats.record(statement, elapsed, conn.get_execution_options().get("db_route", "primary"))
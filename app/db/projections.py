@@ -0,0 +1,172 @@
+"""
+读路径使用的轻量行投影
+
+仪表盘和类别树只需要少数几列。这里直接用列查询得到紧凑的只读记录（NamedTuple），
+不经过 ORM 实体的身份映射、关系代理和属性插桩；ORM 实体只在写操作中使用。
+"""
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import Row, bindparam, func, select
+from sqlalchemy.orm import Session
+
+from app.models.catalog import CatalogCourse
+from app.models.course import Course, GradingSystem
+from app.models.course_category import CourseCategory
+
+
+class CourseRecord(NamedTuple):
+    id: str
+    category_id: str
+    credits: float
+    grading_system: GradingSystem
+    grade: Optional[float]
+    passed: Optional[bool]
+    gpa: Optional[float]
+
+
+class CategoryRecord(NamedTuple):
+    id: str
+    name: str
+    required_credits: float
+    parent_id: Optional[str]
+
+
+class CategoryRow(NamedTuple):
+    id: str
+    name: str
+    required_credits: float
+    parent_id: Optional[str]
+    training_program_id: str
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+
+COURSE_RECORDS_BY_USER = select(
+    Course.id, Course.category_id, Course.credits, Course.grading_system, Course.grade, Course.passed, Course.gpa,
+).where(Course.user_id == bindparam("user_id"))
+
+COURSE_RECORDS_BY_USERS = select(
+    Course.user_id, Course.id, Course.category_id, Course.credits, Course.grading_system, Course.grade, Course.passed,
+    Course.gpa,
+).where(Course.user_id.in_(bindparam("user_ids", expanding=True)))
+
+CATEGORY_RECORDS_BY_PROGRAM = select(
+    CourseCategory.id, CourseCategory.name, CourseCategory.required_credits, CourseCategory.parent_id,
+).where(CourseCategory.training_program_id == bindparam("training_program_id"))
+
+CATEGORY_RECORDS_BY_PROGRAMS = select(
+    CourseCategory.training_program_id,
+    CourseCategory.id, CourseCategory.name, CourseCategory.required_credits, CourseCategory.parent_id,
+).where(CourseCategory.training_program_id.in_(bindparam("training_program_ids", expanding=True)))
+
+CATEGORY_ROWS_BY_PROGRAM = select(
+    CourseCategory.id, CourseCategory.name, CourseCategory.required_credits, CourseCategory.parent_id,
+    CourseCategory.training_program_id, CourseCategory.created_at, CourseCategory.updated_at,
+).where(CourseCategory.training_program_id == bindparam("training_program_id"))
+
+
+def load_course_records(db: Session, user_id: str) -> List[CourseRecord]:
+    """All of a user's courses as compact records (GPA comes from the stored column)"""
+    rows = db.execute(COURSE_RECORDS_BY_USER, {"user_id": user_id}).all()
+    return [CourseRecord(*row) for row in rows]
+
+
+def load_course_records_by_user(db: Session, user_ids: Sequence[str]) -> Dict[str, List[CourseRecord]]:
+    """Course records for a batch of users in one query, grouped by user (every requested user is a key)"""
+    courses: Dict[str, List[CourseRecord]] = {user_id: [] for user_id in user_ids}
+    for user_id, *row in db.execute(COURSE_RECORDS_BY_USERS, {"user_ids": list(user_ids)}):
+        courses[user_id].append(CourseRecord(*row))
+    return courses
+
+
+def load_category_records(db: Session, training_program_id: str) -> List[CategoryRecord]:
+    """Every category of a training program in one query (the caller assembles the tree)"""
+    rows = db.execute(CATEGORY_RECORDS_BY_PROGRAM, {"training_program_id": training_program_id}).all()
+    return [CategoryRecord(*row) for row in rows]
+
+
+def load_category_records_by_program(db: Session,
+                                     training_program_ids: Sequence[str]) -> Dict[str, List[CategoryRecord]]:
+    """Category records of several programs in one query, grouped by program (every requested id is a key)"""
+    categories: Dict[str, List[CategoryRecord]] = {program_id: [] for program_id in training_program_ids}
+    rows = db.execute(CATEGORY_RECORDS_BY_PROGRAMS, {"training_program_ids": list(training_program_ids)})
+    for training_program_id, *row in rows:
+        categories[training_program_id].append(CategoryRecord(*row))
+    return categories
+
+
+def load_category_rows(db: Session, training_program_id: str) -> List[CategoryRow]:
+    """Like load_category_records, with every column the category schema returns"""
+    rows = db.execute(CATEGORY_ROWS_BY_PROGRAM, {"training_program_id": training_program_id}).all()
+    return [CategoryRow(*row) for row in rows]
+
+
+def load_field_rows(db: Session, model, fields: Sequence[str], *criteria,
+                    skip: int = 0, limit: Optional[int] = None) -> List[Row]:
+    """Only the named columns of the matching rows (sparse fieldsets), in the same order as the full listing"""
+    query = select(*(model.__table__.columns[name] for name in fields)).where(*criteria).offset(skip)
+    if limit is not None:
+        query = query.limit(limit)
+    return db.execute(query).all()
+
+
+# Credit-weighted GPA aggregates over the stored gpa column: SUM(gpa * credits) / SUM(credits)
+_WEIGHTED_GPA_SUM = func.sum(Course.gpa * Course.credits)
+_GPA_CREDITS = func.sum(Course.credits)
+
+COHORT_GPA_BY_PROGRAM = select(
+    _WEIGHTED_GPA_SUM, _GPA_CREDITS, func.count(func.distinct(Course.user_id)),
+).join(CourseCategory, Course.category_id == CourseCategory.id).where(
+    CourseCategory.training_program_id == bindparam("training_program_id"),
+    Course.gpa.isnot(None),
+)
+
+COHORT_CATEGORY_GPA_BY_PROGRAM = select(
+    Course.category_id, _WEIGHTED_GPA_SUM, _GPA_CREDITS, func.count(func.distinct(Course.user_id)),
+).join(CourseCategory, Course.category_id == CourseCategory.id).where(
+    CourseCategory.training_program_id == bindparam("training_program_id"),
+    Course.gpa.isnot(None),
+).group_by(Course.category_id)
+
+
+def weighted_gpa(weighted_sum: Optional[float], credits: Optional[float]) -> Optional[float]:
+    """Same rounding as the dashboard's overall GPA"""
+    return round(weighted_sum / credits, 3) if credits else None
+
+
+def load_cohort_gpa(db: Session, training_program_id: str) -> Dict:
+    """Cohort-wide and per-category GPA averages for a program, each a single aggregate query"""
+    params = {"training_program_id": training_program_id}
+    weighted_sum, credits, student_count = db.execute(COHORT_GPA_BY_PROGRAM, params).one()
+    categories = [
+        {"category_id": category_id, "gpa": weighted_gpa(category_sum, category_credits), "student_count": count}
+        for category_id, category_sum, category_credits, count in db.execute(COHORT_CATEGORY_GPA_BY_PROGRAM, params)
+    ]
+    return {
+        "training_program_id": training_program_id,
+        "overall_gpa": weighted_gpa(weighted_sum, credits),
+        "student_count": student_count,
+        "categories": categories,
+    }
+
+
+# Per catalog course: how many students took it and their average GPA, one join over the catalog
+CATALOG_STATS_BY_PROGRAM = select(
+    CatalogCourse.id, CatalogCourse.code, CatalogCourse.name, CatalogCourse.credits,
+    func.count(func.distinct(Course.user_id)), func.avg(Course.gpa),
+).join(Course, Course.catalog_course_id == CatalogCourse.id).where(
+    CatalogCourse.training_program_id == bindparam("training_program_id"),
+).group_by(CatalogCourse.id, CatalogCourse.code, CatalogCourse.name, CatalogCourse.credits) \
+    .order_by(func.count(func.distinct(Course.user_id)).desc())
+
+
+def load_catalog_stats(db: Session, training_program_id: str) -> List[Dict]:
+    rows = db.execute(CATALOG_STATS_BY_PROGRAM, {"training_program_id": training_program_id})
+    return [
+        {
+            "catalog_course_id": catalog_course_id, "code": code, "name": name, "credits": credits,
+            "student_count": student_count, "average_gpa": round(average_gpa, 3) if average_gpa is not None else None,
+        }
+        for catalog_course_id, code, name, credits, student_count, average_gpa in rows
+    ]
@@ -0,0 +1,156 @@
+"""
+慢查询日志：记录超过阈值的 SQL（参数脱敏）及其执行计划，并按语句指纹汇总
+"""
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("app.slow_query")
+# Failures of the log itself go to the application log, not to slow_query.log
+error_logger = logging.getLogger(__name__)
+
+_EXPLAINABLE = ("select", "with", "insert", "update", "delete")
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Replace every bound value with its type name so no user data reaches the log"""
+    if isinstance(parameters, dict):
+        return {key: f"<{type(value).__name__}>" for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_parameters(value) if isinstance(value, (list, tuple, dict)) else f"<{type(value).__name__}>"
+                for value in parameters]
+    return f"<{type(parameters).__name__}>"
+
+
+class SlowQueryStat:
+    __slots__ = ("fingerprint", "statement", "count", "total_ms", "max_ms", "last_endpoint", "plan")
+
+    def __init__(self, fingerprint: str, statement: str):
+        self.fingerprint = fingerprint
+        self.statement = statement
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_endpoint = "-"
+        self.plan: Optional[List[str]] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "statement": self.statement,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "last_endpoint": self.last_endpoint,
+            "plan": self.plan,
+        }
+
+
+class SlowQueryLog:
+    """
+    Collects slow statements since process start.
+
+    `submit` runs on the request thread and only updates the in-memory summary and enqueues
+    the entry; the EXPLAIN and the file write happen on a background thread so logging a slow
+    query never adds latency to the request that issued it.
+    """
+
+    def __init__(self, max_pending: int = 1000):
+        self._stats: Dict[str, SlowQueryStat] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._worker: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    def submit(self, engine, fingerprint: str, normalized: str, statement: str, parameters: Any,
+               executemany: bool, duration: float, endpoint: str) -> None:
+        duration_ms = duration * 1000
+        with self._lock:
+            stat = self._stats.get(fingerprint)
+            if stat is None:
+                stat = self._stats[fingerprint] = SlowQueryStat(fingerprint, normalized)
+            stat.count += 1
+            stat.total_ms += duration_ms
+            stat.max_ms = max(stat.max_ms, duration_ms)
+            stat.last_endpoint = endpoint
+            needs_plan = stat.plan is None
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((engine, fingerprint, statement, parameters, executemany,
+                                    duration_ms, endpoint, needs_plan))
+        except queue.Full:
+            self.dropped += 1
+
+    def top(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """The `limit` slowest statement fingerprints, by worst observed duration"""
+        with self._lock:
+            stats = sorted(self._stats.values(), key=lambda s: s.max_ms, reverse=True)[:limit]
+            return [stat.as_dict() for stat in stats]
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="slow-query-log", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            engine, fingerprint, statement, parameters, executemany, duration_ms, endpoint, needs_plan = self._queue.get()
+            # One bad entry must not end the only worker: it is never restarted
+            try:
+                plan = None
+                if needs_plan and not executemany:
+                    plan = self._explain(engine, statement, parameters)
+                    with self._lock:
+                        self._stats[fingerprint].plan = plan
+                logger.warning(json.dumps({
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "fingerprint": fingerprint,
+                    "duration_ms": round(duration_ms, 3),
+                    "endpoint": endpoint,
+                    "statement": statement,
+                    "parameters": redact_parameters(parameters),
+                    "plan": plan,
+                }, ensure_ascii=False))
+            except Exception as e:
+                error_logger.error(f"记录慢查询失败: {str(e)}")
+
+    @staticmethod
+    def _explain(engine, statement: str, parameters: Any) -> Optional[List[str]]:
+        if not statement.lstrip().lower().startswith(_EXPLAINABLE):
+            return None
+        if engine.dialect.name == "sqlite":
+            prefix, detail_column = "EXPLAIN QUERY PLAN ", -1
+        elif engine.dialect.name == "postgresql":
+            prefix, detail_column = "EXPLAIN ", 0
+        else:
+            return None
+        # A raw DBAPI connection bypasses the engine events, so the EXPLAIN itself is never recorded
+        connection = None
+        try:
+            connection = engine.raw_connection()
+            cursor = connection.cursor()
+            try:
+                cursor.execute(prefix + statement, parameters)
+                return [str(row[detail_column]) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        except Exception as e:
+            return [f"EXPLAIN failed: {e}"]
+        finally:
+            if connection is not None:
+                try:
+                    connection.rollback()
+                except Exception:
+                    pass  # a broken connection is discarded by close()
+                connection.close()
+
+
+slow_query_log = SlowQueryLog()
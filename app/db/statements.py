@@ -0,0 +1,58 @@
+"""
+热点查询的预构造语句
+
+几乎每个请求都会执行的按主键/按用户查询在模块加载时构造一次，参数通过 bindparam 传入。
+语句对象及其缓存键只生成一次，之后每次执行直接命中引擎的编译缓存，不再重新构造 ORM Query。
+（lambda_stmt 在 ORM 执行路径上的分析开销比直接构造 select 更高，见 benchmarks/bench_statement_cache.py）
+"""
+from typing import List, Optional
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
+
+from app.models.catalog import CatalogCourse
+from app.models.course import Course
+from app.models.course_category import CourseCategory
+from app.models.training_program import TrainingProgram
+from app.models.user import User
+
+USER_BY_ID = select(User).where(User.id == bindparam("id"))
+TRAINING_PROGRAM_BY_ID = select(TrainingProgram).where(TrainingProgram.id == bindparam("id"))
+TRAINING_PROGRAMS_BY_IDS = select(TrainingProgram).where(
+    TrainingProgram.id.in_(bindparam("ids", expanding=True))
+)
+CATEGORY_BY_ID = select(CourseCategory).where(CourseCategory.id == bindparam("id"))
+CATALOG_COURSE_BY_ID = select(CatalogCourse).where(CatalogCourse.id == bindparam("id"))
+COURSE_BY_ID = select(Course).where(Course.id == bindparam("id"))
+COURSES_BY_USER = select(Course).where(Course.user_id == bindparam("user_id"))
+COURSES_BY_USER_PAGE = COURSES_BY_USER.offset(bindparam("skip")).limit(bindparam("limit"))
+
+
+def get_user(db: Session, user_id: str) -> Optional[User]:
+    return db.execute(USER_BY_ID, {"id": user_id}).scalars().first()
+
+
+def get_training_program(db: Session, training_program_id: str) -> Optional[TrainingProgram]:
+    return db.execute(TRAINING_PROGRAM_BY_ID, {"id": training_program_id}).scalars().first()
+
+
+def get_training_programs(db: Session, training_program_ids: List[str]) -> List[TrainingProgram]:
+    return db.execute(TRAINING_PROGRAMS_BY_IDS, {"ids": training_program_ids}).scalars().all()
+
+
+def get_category(db: Session, category_id: str) -> Optional[CourseCategory]:
+    return db.execute(CATEGORY_BY_ID, {"id": category_id}).scalars().first()
+
+
+def get_catalog_course(db: Session, catalog_course_id: str) -> Optional[CatalogCourse]:
+    return db.execute(CATALOG_COURSE_BY_ID, {"id": catalog_course_id}).scalars().first()
+
+
+def get_course(db: Session, course_id: str) -> Optional[Course]:
+    return db.execute(COURSE_BY_ID, {"id": course_id}).scalars().first()
+
+
+def get_courses_by_user(db: Session, user_id: str, skip: int = 0, limit: Optional[int] = None) -> List[Course]:
+    if limit is None:
+        return db.execute(COURSES_BY_USER, {"user_id": user_id}).scalars().all()
+    return db.execute(COURSES_BY_USER_PAGE, {"user_id": user_id, "skip": skip, "limit": limit}).scalars().all()
@@ -2,4 +2,8 @@ from app.models.user import User
 from app.models.verification import VerificationCode
 from app.models.training_program import TrainingProgram
 from app.models.course_category import CourseCategory
+from app.models.catalog import CatalogCourse
 from app.models.course import Course, GradingSystem
+from app.models.audit import AuditJob, AuditResult, AuditStatus
+from app.models.sync import Tombstone
+from app.models.idempotency import IdempotencyKey
@@ -0,0 +1,61 @@
+from sqlalchemy import Column, String, Float, Boolean, Integer, Enum, DateTime, ForeignKey, JSON, Text
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+import uuid
+import enum
+
+from app.db.base import Base
+
+
+class AuditStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class AuditJob(Base):
+    """A graduation-eligibility audit of every student on a training program"""
+    __tablename__ = "audit_jobs"
+
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    training_program_id = Column(String, ForeignKey("training_programs.id"), nullable=False, index=True)
+    created_by = Column(String, ForeignKey("users.id"), nullable=True)  # None when started from the CLI
+    status = Column(Enum(AuditStatus), nullable=False, default=AuditStatus.PENDING)
+    total_students = Column(Integer, nullable=False, default=0)
+    processed_students = Column(Integer, nullable=False, default=0)
+    eligible_students = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    # Last progress of a running job; the job runs in an API worker and dies with it
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    training_program = relationship("TrainingProgram")
+    results = relationship("AuditResult", back_populates="job", cascade="all, delete-orphan")
+
+    @property
+    def progress(self) -> float:
+        if not self.total_students:
+            return 1.0 if self.status == AuditStatus.COMPLETED else 0.0
+        return round(self.processed_students / self.total_students, 4)
+
+
+class AuditResult(Base):
+    """One student's eligibility verdict within an audit job"""
+    __tablename__ = "audit_results"
+
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    job_id = Column(String, ForeignKey("audit_jobs.id"), nullable=False, index=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    eligible = Column(Boolean, nullable=False)
+    earned_credits = Column(Float, nullable=False)
+    required_credits = Column(Float, nullable=False)
+    overall_gpa = Column(Float, nullable=False)
+    # Names of the categories whose required credits are not yet met
+    incomplete_categories = Column(JSON, nullable=False, default=list)
+
+    # Relationships
+    job = relationship("AuditJob", back_populates="results")
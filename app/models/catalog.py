@@ -0,0 +1,29 @@
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+import uuid
+
+from app.db.base import Base
+
+
+class CatalogCourse(Base):
+    """A course definition shared by every student of a training program"""
+    __tablename__ = "catalog_courses"
+    __table_args__ = (
+        UniqueConstraint("training_program_id", "normalized_name", name="uq_catalog_courses_program_name"),
+    )
+
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    training_program_id = Column(String, ForeignKey("training_programs.id"), nullable=False, index=True)
+    code = Column(String, nullable=True, index=True)  # Normalized course code, e.g. "MATH1010"
+    name = Column(String, nullable=False)
+    # Lookup key, see app.services.catalog.normalize_course_name
+    normalized_name = Column(String, nullable=False)
+    credits = Column(Float, nullable=False)
+    default_category_id = Column(String, ForeignKey("course_categories.id"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relationships
+    training_program = relationship("TrainingProgram")
+    default_category = relationship("CourseCategory")
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, String, Float, Boolean, Enum, DateTime, ForeignKey
+from sqlalchemy import Column, String, Float, Boolean, Enum, DateTime, ForeignKey, Index, bindparam, event, inspect, select
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Session, object_session, relationship
+import itertools
 import uuid
 import enum
 
+from app.core.grading import get_scale
 from app.db.base import Base
+from app.models.course_category import CourseCategory
+from app.models.training_program import TrainingProgram
 
 
 class GradingSystem(str, enum.Enum):
@@ -14,6 +18,11 @@ class GradingSystem(str, enum.Enum):
 
 class Course(Base):
     __tablename__ = "courses"
+    __table_args__ = (
+        # A user's courses changed since a sync token (see app.services.sync)
+        Index("ix_courses_user_id_created_at", "user_id", "created_at"),
+        Index("ix_courses_user_id_updated_at", "user_id", "updated_at"),
+    )
 
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, nullable=False)
@@ -21,19 +30,78 @@ class Course(Base):
     grading_system = Column(Enum(GradingSystem), nullable=False)
     grade = Column(Float, nullable=True)  # For percentage system
     passed = Column(Boolean, nullable=True)  # For pass/fail system
+    # Stored GPA on the training program's grading scale, maintained on every ORM write so it can be
+    # aggregated in SQL. Core bulk writes must set it themselves via the program's compiled scale.
+    gpa = Column(Float, nullable=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
-    category_id = Column(String, ForeignKey("course_categories.id"), nullable=False)
+    category_id = Column(String, ForeignKey("course_categories.id"), nullable=False, index=True)
+    # Shared definition in the program's catalog; name and credits above stay as the user's override
+    catalog_course_id = Column(String, ForeignKey("catalog_courses.id"), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
     user = relationship("User")
     category = relationship("CourseCategory", back_populates="courses")
-    
-    @property
-    def gpa(self):
-        """Calculate GPA for this course based on the grade"""
-        if self.grading_system == GradingSystem.PERCENTAGE and self.grade is not None:
-            # GPA formula: 4 - 3 * (100 - x)^2 / 1600
-            return round(4 - 3 * ((100 - self.grade) ** 2) / 1600, 3)
-        return None
+    catalog_course = relationship("CatalogCourse")
+
+
+SCALE_BY_CATEGORY = select(
+    TrainingProgram.grading_scale, TrainingProgram.grading_scale_breakpoints,
+).join(CourseCategory, CourseCategory.training_program_id == TrainingProgram.id).where(
+    CourseCategory.id == bindparam("category_id")
+)
+
+SCALES_BY_CATEGORIES = select(
+    CourseCategory.id, TrainingProgram.grading_scale, TrainingProgram.grading_scale_breakpoints,
+).join(CourseCategory, CourseCategory.training_program_id == TrainingProgram.id).where(
+    CourseCategory.id.in_(bindparam("category_ids", expanding=True))
+)
+
+# Attributes the stored GPA depends on; updates that touch none of them keep it as is
+GPA_INPUTS = ("grade", "grading_system", "category_id")
+# session.info key of the scales resolved for the current flush, by category id
+_FLUSH_SCALES = "course_scales"
+
+
+def _needs_gpa(course: Course) -> bool:
+    state = inspect(course)
+    return state.pending or any(state.attrs[name].history.has_changes() for name in GPA_INPUTS)
+
+
+@event.listens_for(Session, "before_flush")
+def _load_flush_scales(session, flush_context, instances):
+    """Resolve the grading scales of every course written in this flush with one query"""
+    category_ids = {
+        obj.category_id for obj in itertools.chain(session.new, session.dirty)
+        if isinstance(obj, Course) and obj.category_id is not None and obj.grading_system == GradingSystem.PERCENTAGE
+        and obj.grade is not None and _needs_gpa(obj)
+    }
+    if not category_ids:
+        session.info.pop(_FLUSH_SCALES, None)
+        return
+    rows = session.execute(SCALES_BY_CATEGORIES, {"category_ids": list(category_ids)}).all()
+    session.info[_FLUSH_SCALES] = {category_id: (scale, breakpoints) for category_id, scale, breakpoints in rows}
+
+
+@event.listens_for(Session, "after_flush")
+def _clear_flush_scales(session, flush_context):
+    session.info.pop(_FLUSH_SCALES, None)
+
+
+@event.listens_for(Course, "before_insert")
+@event.listens_for(Course, "before_update")
+def _store_gpa(mapper, connection, target):
+    """Keep the stored GPA in step with grade, grading system and the program's grading scale"""
+    if not _needs_gpa(target):
+        return
+    if target.grading_system != GradingSystem.PERCENTAGE or target.grade is None:
+        target.gpa = None
+        return
+    session = object_session(target)
+    scales = session.info.get(_FLUSH_SCALES, {}) if session is not None else {}
+    program_scale = scales.get(target.category_id)
+    if program_scale is None:
+        # Category assigned through the relationship only, so its id was unknown before the flush
+        program_scale = connection.execute(SCALE_BY_CATEGORY, {"category_id": target.category_id}).first()
+    target.gpa = get_scale(*program_scale).convert(target.grade) if program_scale else get_scale().convert(target.grade)
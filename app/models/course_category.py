@@ -12,10 +12,10 @@ class CourseCategory(Base):
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, nullable=False)
     required_credits = Column(Float, nullable=False)
-    training_program_id = Column(String, ForeignKey("training_programs.id"), nullable=False)
-    parent_id = Column(String, ForeignKey("course_categories.id"), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    training_program_id = Column(String, ForeignKey("training_programs.id"), nullable=False, index=True)
+    parent_id = Column(String, ForeignKey("course_categories.id"), nullable=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
 
     # Relationships
     training_program = relationship("TrainingProgram", back_populates="categories")
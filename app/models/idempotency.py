@@ -0,0 +1,25 @@
+from sqlalchemy import Column, DateTime, Integer, JSON, LargeBinary, String, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class IdempotencyKey(Base):
+    """The first response to a request sent with an Idempotency-Key header, replayed for its retries"""
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # Concurrent duplicates race on this constraint; the losers wait for the winner's response
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_id_key"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # Subject of the access token; no foreign key, keys expire on their own
+    user_id = Column(String, nullable=False)
+    key = Column(String(255), nullable=False)
+    # Hash of method, path, query and body: a key may not be reused for a different request
+    request_hash = Column(String(64), nullable=False)
+    # Null while the first request is still running
+    status_code = Column(Integer, nullable=True)
+    headers = Column(JSON, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
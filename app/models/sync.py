@@ -0,0 +1,85 @@
+from typing import Optional
+
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, event, insert, select
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+from app.models.course import Course
+from app.models.course_category import CourseCategory
+from app.models.training_program import TrainingProgram
+
+
+class Tombstone(Base):
+    """
+    A deleted course, category or training program, kept so sync clients can drop it.
+
+    Unpublishing a program writes public tombstones for it and its categories as well: other users'
+    clients must drop them, while sync skips tombstones of rows the user can still see.
+    """
+    __tablename__ = "tombstones"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity_type = Column(String, nullable=False)  # "course", "category" or "training_program"
+    entity_id = Column(String, nullable=False)
+    # Owner of the course, or of the category's / program's training program; no foreign key,
+    # the tombstone outlives the rows it describes
+    user_id = Column(String, nullable=True, index=True)
+    # Whether the program was public when deleted or unpublished: every client may then hold a copy
+    is_public = Column(Boolean, nullable=False, default=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+
+
+PROGRAM_VISIBILITY = select(TrainingProgram.user_id, TrainingProgram.is_public)
+
+# session.info keys: tombstones of the rows deleted by the current flush, written together after it,
+# and the owner and visibility of their programs, looked up once per program
+_FLUSH_TOMBSTONES = "tombstones"
+_FLUSH_PROGRAM_VISIBILITY = "program_visibility"
+
+
+def _add_tombstone(connection, target, entity_type: str, user_id: Optional[str], is_public: bool) -> None:
+    values = {"entity_type": entity_type, "entity_id": target.id, "user_id": user_id, "is_public": is_public}
+    session = object_session(target)
+    if session is None:
+        connection.execute(insert(Tombstone).values(**values))
+        return
+    session.info.setdefault(_FLUSH_TOMBSTONES, []).append(values)
+
+
+@event.listens_for(Course, "after_delete")
+def _course_tombstone(mapper, connection, target):
+    _add_tombstone(connection, target, "course", target.user_id, False)
+
+
+@event.listens_for(CourseCategory, "after_delete")
+def _category_tombstone(mapper, connection, target):
+    session = object_session(target)
+    visibility = session.info.setdefault(_FLUSH_PROGRAM_VISIBILITY, {}) if session is not None else {}
+    if target.training_program_id not in visibility:
+        owner = connection.execute(
+            PROGRAM_VISIBILITY.where(TrainingProgram.id == target.training_program_id)
+        ).first()
+        visibility[target.training_program_id] = (owner.user_id, bool(owner.is_public)) if owner else (None, False)
+    _add_tombstone(connection, target, "category", *visibility[target.training_program_id])
+
+
+@event.listens_for(TrainingProgram, "after_delete")
+def _training_program_tombstone(mapper, connection, target):
+    _add_tombstone(connection, target, "training_program", target.user_id, bool(target.is_public))
+
+
+@event.listens_for(Session, "after_flush")
+def _write_tombstones(session, flush_context):
+    """One INSERT for every row the flush deleted"""
+    session.info.pop(_FLUSH_PROGRAM_VISIBILITY, None)
+    tombstones = session.info.pop(_FLUSH_TOMBSTONES, None)
+    if tombstones:
+        session.connection().execute(insert(Tombstone.__table__), tombstones)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_tombstones(session, previous_transaction):
+    # A failed flush never reaches after_flush; its deletes were rolled back
+    session.info.pop(_FLUSH_PROGRAM_VISIBILITY, None)
+    session.info.pop(_FLUSH_TOMBSTONES, None)
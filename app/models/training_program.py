@@ -1,8 +1,9 @@
-from sqlalchemy import Column, String, Float, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Float, Boolean, DateTime, ForeignKey, JSON
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import uuid
 
+from app.core.grading import DEFAULT_SCALE
 from app.db.base import Base
 
 
@@ -14,9 +15,12 @@ class TrainingProgram(Base):
     total_credits = Column(Float, nullable=False)
     is_public = Column(Boolean, default=False)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Grade -> GPA conversion (see app.core.grading); breakpoints only for the "custom" scale
+    grading_scale = Column(String, nullable=False, default=DEFAULT_SCALE, server_default=DEFAULT_SCALE)
+    grading_scale_breakpoints = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
 
     # Relationships
     categories = relationship("CourseCategory", back_populates="training_program", cascade="all, delete-orphan")
-    user = relationship("User")
+    user = relationship("User", foreign_keys=[user_id])
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, String, DateTime
+from sqlalchemy import Boolean, Column, String, DateTime, ForeignKey
 from sqlalchemy.sql import func
 import uuid
 
@@ -13,5 +13,11 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
     is_admin = Column(Boolean, default=False)
+    # Program the dashboard opens by default; users and training_programs reference each other,
+    # so the constraint is added after both tables exist
+    default_training_program_id = Column(
+        String, ForeignKey("training_programs.id", use_alter=True, name="fk_users_default_training_program"),
+        nullable=True,
+    )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -1,6 +1,9 @@
 from app.schemas.user import User, UserCreate, UserUpdate, UserLogin, Token, TokenPayload, PasswordReset, PasswordResetConfirm
 from app.schemas.verification import VerificationRequest, VerificationConfirm
-from app.schemas.training_program import TrainingProgram, TrainingProgramCreate, TrainingProgramUpdate, TrainingProgramPublish
+from app.schemas.training_program import TrainingProgram, TrainingProgramCreate, TrainingProgramUpdate, TrainingProgramPublish, TrainingProgramClone, TrainingProgramDefinition, TrainingProgramImportResult, CategoryDefinition
 from app.schemas.course_category import CourseCategory, CourseCategoryCreate, CourseCategoryUpdate, CourseCategoryWithChildren
-from app.schemas.course import Course, CourseCreate, CourseUpdate
-from app.schemas.dashboard import CreditSummary, CategoryProgress, CategoryProgressWithChildren
+from app.schemas.course import Course, CourseCreate, CourseUpdate, CourseBatchRequest, CourseBatchResult, CourseOperationResult
+from app.schemas.catalog import CatalogCourse, CatalogCourseCreate, CatalogCourseUpdate, CatalogMatch, CatalogMatchRequest, CatalogNameMatch
+from app.schemas.dashboard import CreditSummary, CategoryProgress, CategoryProgressWithChildren, ProgramCreditSummary, CreditSummaryRequest, SimulatedCourseUpdate, SimulationRequest, SimulationResult, AssignmentRequest, AssignmentResult, CourseEligibility, CourseMove, CategoryAssignment, DashboardBootstrap
+from app.schemas.admin import SlowQueryStat, CompiledCacheStats, CohortGpa, CategoryGpa, ProgramAnalytics, AuditJob, AuditJobCreate, CatalogCourseStat
+from app.schemas.sync import SyncChanges, SyncDeletions, SyncResponse
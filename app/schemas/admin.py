@@ -0,0 +1,97 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from pydantic import BaseModel, ConfigDict
+
+from app.models.audit import AuditStatus
+
+
+class SlowQueryStat(BaseModel):
+    fingerprint: str
+    statement: str
+    count: int
+    total_ms: float
+    max_ms: float
+    avg_ms: float
+    last_endpoint: str
+    plan: Optional[List[str]] = None
+
+
+class CompiledCacheSize(BaseModel):
+    size: int
+    capacity: int
+
+
+class CompiledCacheStats(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+    outcomes: Dict[str, int]
+    caches: Dict[str, CompiledCacheSize]
+
+
+class CategoryGpa(BaseModel):
+    category_id: str
+    gpa: Optional[float] = None
+    student_count: int
+
+
+class CohortGpa(BaseModel):
+    training_program_id: str
+    overall_gpa: Optional[float] = None
+    student_count: int
+    categories: List[CategoryGpa]
+
+
+class CategoryCompletion(BaseModel):
+    category_id: str
+    required_credits: float
+    completion_rate: float
+    average_earned_credits: float
+
+
+class GpaHistogramBin(BaseModel):
+    lower: float
+    upper: float
+    count: int
+
+
+class ProgramAnalytics(BaseModel):
+    training_program_id: str
+    student_count: int
+    course_count: int
+    average_gpa: Optional[float] = None
+    median_earned_credits: float
+    graduation_ready_rate: float
+    categories: List[CategoryCompletion]
+    gpa_histogram: List[GpaHistogramBin]
+    gpa_percentiles: Dict[str, float]
+
+
+class CatalogCourseStat(BaseModel):
+    catalog_course_id: str
+    code: Optional[str] = None
+    name: str
+    credits: float
+    student_count: int
+    average_gpa: Optional[float] = None
+
+
+class AuditJobCreate(BaseModel):
+    training_program_id: str
+
+
+class AuditJob(BaseModel):
+    id: str
+    training_program_id: str
+    created_by: Optional[str] = None
+    status: AuditStatus
+    total_students: int
+    processed_students: int
+    eligible_students: int
+    progress: float
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
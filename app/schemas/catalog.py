@@ -0,0 +1,54 @@
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from datetime import datetime
+
+
+# Shared properties
+class CatalogCourseBase(BaseModel):
+    name: str
+    credits: float = Field(..., gt=0)
+    code: Optional[str] = None
+    default_category_id: Optional[str] = None
+
+
+# Properties to receive via API on creation
+class CatalogCourseCreate(CatalogCourseBase):
+    training_program_id: str
+
+
+# Properties to receive via API on update
+class CatalogCourseUpdate(BaseModel):
+    name: Optional[str] = None
+    credits: Optional[float] = Field(None, gt=0)
+    code: Optional[str] = None
+    default_category_id: Optional[str] = None
+
+
+# Properties to return via API
+class CatalogCourse(CatalogCourseBase):
+    id: str
+    training_program_id: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# A catalog entry found for a (partial) course name
+class CatalogMatch(BaseModel):
+    catalog_course_id: str
+    name: str
+    code: Optional[str] = None
+    credits: float
+    default_category_id: Optional[str] = None
+    score: float
+    method: str
+
+
+class CatalogMatchRequest(BaseModel):
+    names: List[str] = Field(..., min_length=1, max_length=1000)
+
+
+class CatalogNameMatch(BaseModel):
+    query: str
+    match: Optional[CatalogMatch] = None
@@ -1,5 +1,5 @@
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import Annotated, List, Literal, Optional, Union
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from datetime import datetime
 from app.models.course import GradingSystem
 
@@ -13,10 +13,22 @@ class CourseBase(BaseModel):
 
 
 # Properties to receive via API on creation
-class CourseCreate(CourseBase):
+# With a catalog_course_id, name and credits default to the catalog entry's and act as overrides
+class CourseCreate(BaseModel):
+    name: Optional[str] = None
+    credits: Optional[float] = Field(None, gt=0)
+    grading_system: GradingSystem
+    category_id: str
+    catalog_course_id: Optional[str] = None
     grade: Optional[float] = Field(None, ge=0, le=100)
     passed: Optional[bool] = None
 
+    @model_validator(mode='after')
+    def check_name_and_credits(self) -> 'CourseCreate':
+        if self.catalog_course_id is None and (self.name is None or self.credits is None):
+            raise ValueError("name and credits are required unless catalog_course_id is given")
+        return self
+
 
 # Properties to receive via API on update
 class CourseUpdate(BaseModel):
@@ -26,6 +38,15 @@ class CourseUpdate(BaseModel):
     grade: Optional[float] = Field(None, ge=0, le=100)
     passed: Optional[bool] = None
     category_id: Optional[str] = None
+    catalog_course_id: Optional[str] = None
+
+    @model_validator(mode='after')
+    def check_required_fields_not_null(self) -> 'CourseUpdate':
+        # These may be left out but not cleared: every course has them
+        for field in ("name", "credits", "grading_system", "category_id"):
+            if field in self.model_fields_set and getattr(self, field) is None:
+                raise ValueError(f"{field} cannot be null")
+        return self
 
 
 # Properties to return via API
@@ -35,8 +56,56 @@ class Course(CourseBase):
     grade: Optional[float] = None
     passed: Optional[bool] = None
     gpa: Optional[float] = None
+    catalog_course_id: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Operations of a batch edit, applied in order; "move" is an update of the category only
+class CourseCreateOperation(BaseModel):
+    op: Literal["create"]
+    course: CourseCreate
+
+
+class CourseUpdateOperation(BaseModel):
+    op: Literal["update"]
+    id: str
+    changes: CourseUpdate
+
+
+class CourseDeleteOperation(BaseModel):
+    op: Literal["delete"]
+    id: str
+
+
+class CourseMoveOperation(BaseModel):
+    op: Literal["move"]
+    id: str
+    category_id: str
+
+
+CourseOperation = Annotated[
+    Union[CourseCreateOperation, CourseUpdateOperation, CourseDeleteOperation, CourseMoveOperation],
+    Field(discriminator="op"),
+]
+
+
+class CourseBatchRequest(BaseModel):
+    operations: List[CourseOperation] = Field(..., min_length=1, max_length=200)
+
+
+class CourseOperationResult(BaseModel):
+    index: int
+    op: str
+    id: Optional[str] = None
+    ok: bool
+    course: Optional[Course] = None  # The course after the batch; None for deletes and failures
+    error: Optional[str] = None
+
+
+# Committed only if every operation succeeded; otherwise nothing is written
+class CourseBatchResult(BaseModel):
+    committed: bool
+    results: List[CourseOperationResult]
@@ -1,5 +1,10 @@
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.schemas.course import Course, CourseCreate, CourseUpdate
+from app.schemas.course_category import CourseCategoryWithChildren
+from app.schemas.training_program import TrainingProgram
+from app.schemas.user import User
 
 
 class CategoryProgress(BaseModel):
@@ -11,6 +16,8 @@ class CategoryProgress(BaseModel):
     is_complete: bool
     has_subcategories: bool
     parent_id: Optional[str] = None
+    # Credit-weighted GPA of the percentage-graded courses directly in this category
+    gpa: Optional[float] = None
 
 
 class CategoryProgressWithChildren(CategoryProgress):
@@ -18,7 +25,7 @@ class CategoryProgressWithChildren(CategoryProgress):
 
 
 # Complete the recursive reference
-CategoryProgressWithChildren.update_forward_refs()
+CategoryProgressWithChildren.model_rebuild()
 
 
 class CreditSummary(BaseModel):
@@ -27,3 +34,77 @@ class CreditSummary(BaseModel):
     remaining_credits: float
     overall_gpa: float
     categories: List[CategoryProgressWithChildren]
+
+
+class ProgramCreditSummary(CreditSummary):
+    training_program_id: str
+    training_program_name: str
+
+
+class CreditSummaryRequest(BaseModel):
+    training_program_ids: List[str] = Field(..., min_length=1, max_length=20)
+
+
+# Hypothetical change to one of the user's existing courses
+class SimulatedCourseUpdate(CourseUpdate):
+    id: str
+
+
+class SimulationRequest(BaseModel):
+    add: List[CourseCreate] = Field([], max_length=200)
+    remove: List[str] = Field([], max_length=200)
+    modify: List[SimulatedCourseUpdate] = Field([], max_length=200)
+
+
+class SimulationResult(BaseModel):
+    summary: CreditSummary
+    baseline_gpa: float
+    gpa_delta: float
+    earned_credits_delta: float
+
+
+# Categories a course may count toward, besides its current one
+class CourseEligibility(BaseModel):
+    course_id: str
+    category_ids: List[str]
+
+
+class AssignmentRequest(BaseModel):
+    rules: List[CourseEligibility] = Field([], max_length=1000)
+
+
+class CourseMove(BaseModel):
+    course_id: str
+    from_category_id: str
+    to_category_id: str
+
+
+class CategoryAssignment(BaseModel):
+    category_id: str
+    required_credits: float
+    assigned_credits: float
+
+
+class AssignmentResult(BaseModel):
+    moves: List[CourseMove]
+    categories: List[CategoryAssignment]
+    satisfied_credits: float
+    current_satisfied_credits: float
+    # Best value if courses could be split between categories
+    upper_bound: float
+    method: str
+
+
+# Sections of the dashboard bootstrap; each is what its standalone endpoint returns
+BOOTSTRAP_SECTIONS = ("user", "training_programs", "categories", "courses", "credit_summary")
+
+
+# Everything the dashboard page loads, in one response. Sections left out via `include` are null,
+# as are categories and credit_summary when there is no program to show.
+class DashboardBootstrap(BaseModel):
+    training_program_id: Optional[str] = None
+    user: Optional[User] = None
+    training_programs: Optional[List[TrainingProgram]] = None
+    categories: Optional[List[CourseCategoryWithChildren]] = None
+    courses: Optional[List[Course]] = None
+    credit_summary: Optional[CreditSummary] = None
@@ -0,0 +1,30 @@
+from typing import List
+from pydantic import BaseModel
+
+from app.schemas.course import Course
+from app.schemas.course_category import CourseCategory
+from app.schemas.training_program import TrainingProgram
+
+
+# Records created or updated since the client's token
+class SyncChanges(BaseModel):
+    training_programs: List[TrainingProgram] = []
+    categories: List[CourseCategory] = []
+    courses: List[Course] = []
+
+
+# Ids of records deleted since the client's token
+class SyncDeletions(BaseModel):
+    training_programs: List[str] = []
+    categories: List[str] = []
+    courses: List[str] = []
+
+
+class SyncResponse(BaseModel):
+    # Pass back on the next sync
+    sync_token: str
+    # True when `changed` holds everything visible and the client should replace its local data:
+    # first sync, or a token older than the deletion history
+    full_sync: bool
+    changed: SyncChanges
+    deleted: SyncDeletions
@@ -1,7 +1,9 @@
-from typing import Optional, List
-from pydantic import BaseModel, Field
+from typing import Optional, List, Tuple
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from datetime import datetime
 
+from app.core.grading import DEFAULT_SCALE, validate_scale
+
 
 # Shared properties
 class TrainingProgramBase(BaseModel):
@@ -11,7 +13,14 @@ class TrainingProgramBase(BaseModel):
 
 # Properties to receive via API on creation
 class TrainingProgramCreate(TrainingProgramBase):
-    pass
+    # Grading scale name (see app.core.grading); breakpoints are [min_grade, points] for "custom"
+    grading_scale: str = DEFAULT_SCALE
+    grading_scale_breakpoints: Optional[List[Tuple[float, float]]] = None
+
+    @model_validator(mode='after')
+    def check_grading_scale(self) -> 'TrainingProgramCreate':
+        validate_scale(self.grading_scale, self.grading_scale_breakpoints)
+        return self
 
 
 # Properties to receive via API on update
@@ -19,6 +28,8 @@ class TrainingProgramUpdate(BaseModel):
     name: Optional[str] = None
     total_credits: Optional[float] = Field(None, gt=0)
     is_public: Optional[bool] = None
+    grading_scale: Optional[str] = None
+    grading_scale_breakpoints: Optional[List[Tuple[float, float]]] = None
 
 
 # Properties to return via API
@@ -26,13 +37,43 @@ class TrainingProgram(TrainingProgramBase):
     id: str
     is_public: bool
     user_id: str
+    grading_scale: str = DEFAULT_SCALE
+    grading_scale_breakpoints: Optional[List[Tuple[float, float]]] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Properties for publishing a training program
 class TrainingProgramPublish(BaseModel):
     is_public: bool = True
+
+
+# Properties for cloning a training program into a personal copy
+class TrainingProgramClone(BaseModel):
+    name: Optional[str] = None
+
+
+# One node of an imported/exported category tree. Nodes nest through `subcategories`; a flat list
+# can instead name each node with `key` and point at its parent's key with `parent`.
+class CategoryDefinition(BaseModel):
+    name: str = Field(..., min_length=1)
+    required_credits: float = Field(..., ge=0)
+    key: Optional[str] = None
+    parent: Optional[str] = None
+    subcategories: List['CategoryDefinition'] = []
+
+
+CategoryDefinition.model_rebuild()
+
+
+# A whole training program definition for import/export (JSON or YAML)
+class TrainingProgramDefinition(TrainingProgramCreate):
+    categories: List[CategoryDefinition] = []
+
+
+class TrainingProgramImportResult(BaseModel):
+    training_program: TrainingProgram
+    category_count: int
+    warnings: List[str] = []
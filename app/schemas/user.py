@@ -1,5 +1,5 @@
 from typing import Optional
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from datetime import datetime
 
 
@@ -16,6 +16,8 @@ class UserCreate(UserBase):
 # Properties to receive via API on update
 class UserUpdate(BaseModel):
     password: Optional[str] = Field(None, min_length=8)
+    # null clears the default
+    default_training_program_id: Optional[str] = None
 
 
 # Properties to return via API
@@ -23,10 +25,10 @@ class User(UserBase):
     id: str
     is_active: bool
     is_admin: bool
+    default_training_program_id: Optional[str] = None
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Properties for login
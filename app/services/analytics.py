@@ -0,0 +1,158 @@
+"""
+培养方案的全体学生学分与 GPA 分析
+
+课程数据通过一次流式查询按列读取，随后全部用 NumPy 向量化分组（bincount）计算：
+每个学生的 GPA 与各类别已获学分、各类别完成率、GPA 直方图与分位数，不逐行循环。
+"""
+from typing import Dict, List, Sequence
+
+import numpy as np
+from sqlalchemy import and_, case, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.course import Course, GradingSystem
+from app.models.course_category import CourseCategory
+from app.models.training_program import TrainingProgram
+
+STREAM_BATCH_SIZE = 50000
+
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+
+# Same rule as app.services.credit_summary.is_earned, evaluated by the database
+_EARNED = case(
+    (or_(
+        and_(Course.grading_system == GradingSystem.PASS_FAIL, Course.passed.is_(True)),
+        and_(Course.grading_system == GradingSystem.PERCENTAGE, Course.grade.isnot(None)),
+    ), 1),
+    else_=0,
+)
+
+
+def load_cohort_columns(db: Session, training_program_id: str, category_ids: Sequence[str]) -> dict:
+    """
+    Stream (user_id, category_id, credits, gpa, earned) for every course in the program's
+    categories and return them as column arrays.
+
+    Ids are encoded while streaming: `user_index` numbers students in first-seen order and
+    `category_index` is the position in `category_ids`, so the analysis works on integers only.
+    """
+    stmt = (
+        select(Course.user_id, Course.category_id, Course.credits, Course.gpa, _EARNED)
+        .join(CourseCategory, Course.category_id == CourseCategory.id)
+        .where(CourseCategory.training_program_id == training_program_id)
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    user_codes: Dict[str, int] = {}
+    category_codes = {category_id: position for position, category_id in enumerate(category_ids)}
+    chunks: Dict[str, List[np.ndarray]] = {
+        "user_index": [], "category_index": [], "credits": [], "gpa": [], "earned": [],
+    }
+    # Core execution on the session's connection: plain rows, no ORM result processing per row
+    for partition in db.connection().execute(stmt).partitions():
+        user_ids, categories, credits, gpas, earned = zip(*map(tuple, partition))
+        size = len(user_ids)
+        chunks["user_index"].append(np.fromiter(
+            (user_codes.setdefault(user_id, len(user_codes)) for user_id in user_ids), dtype=np.intp, count=size))
+        chunks["category_index"].append(np.fromiter(map(category_codes.__getitem__, categories), dtype=np.intp,
+                                                    count=size))
+        chunks["credits"].append(np.array(credits, dtype=np.float64))
+        chunks["gpa"].append(np.array(gpas, dtype=np.float64))  # NULL -> nan
+        chunks["earned"].append(np.array(earned, dtype=bool))
+
+    if not chunks["credits"]:
+        columns = {
+            "user_index": np.zeros(0, dtype=np.intp), "category_index": np.zeros(0, dtype=np.intp),
+            "credits": np.zeros(0), "gpa": np.zeros(0), "earned": np.zeros(0, dtype=bool),
+        }
+    else:
+        columns = {name: np.concatenate(parts) for name, parts in chunks.items()}
+    columns["user_count"] = len(user_codes)
+    return columns
+
+
+def analyze_cohort(
+    columns: dict,
+    category_ids: Sequence[str],
+    required_credits: Sequence[float],
+    total_credits: float,
+    histogram_bins: int = 10,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+) -> dict:
+    """
+    Vectorized group-by over the cohort's course columns (as returned by load_cohort_columns).
+
+    Only courses filed under the program's categories count, so earned credits here are the
+    credits each student has toward this program.
+    """
+    required = np.asarray(required_credits, dtype=np.float64)
+    n_categories = len(category_ids)
+    n_users = columns["user_count"]
+    user_index = columns["user_index"]
+    category_index = columns["category_index"]
+
+    credits = columns["credits"]
+    earned_credits = np.where(columns["earned"], credits, 0.0)
+
+    # Per user x category earned credits, then per user totals
+    cell = user_index * n_categories + category_index
+    earned_matrix = np.bincount(cell, weights=earned_credits, minlength=n_users * n_categories) \
+        .reshape(n_users, n_categories)
+    earned_total = np.bincount(user_index, weights=earned_credits, minlength=n_users)
+
+    # Credit-weighted GPA per user over graded courses
+    graded = ~np.isnan(columns["gpa"])
+    gpa_weight = np.bincount(user_index[graded], weights=credits[graded], minlength=n_users)
+    gpa_sum = np.bincount(user_index[graded], weights=columns["gpa"][graded] * credits[graded], minlength=n_users)
+    has_gpa = gpa_weight > 0
+    user_gpa = np.divide(gpa_sum, gpa_weight, out=np.zeros(n_users), where=has_gpa)[has_gpa]
+
+    complete = earned_matrix >= required if n_users else np.zeros((0, n_categories), dtype=bool)
+    completion_rate = complete.mean(axis=0) if n_users else np.zeros(n_categories)
+
+    if len(user_gpa):
+        counts, edges = np.histogram(user_gpa, bins=histogram_bins)
+        gpa_percentiles = np.percentile(user_gpa, percentiles)
+    else:
+        counts, edges, gpa_percentiles = [], [], []
+
+    return {
+        "student_count": int(n_users),
+        "course_count": int(len(credits)),
+        "average_gpa": round(float(gpa_sum.sum() / gpa_weight.sum()), 3) if gpa_weight.sum() > 0 else None,
+        "median_earned_credits": float(np.median(earned_total)) if n_users else 0.0,
+        "graduation_ready_rate": float(((earned_total >= total_credits) & complete.all(axis=1)).mean()) if n_users else 0.0,
+        "categories": [
+            {
+                "category_id": category_ids[i],
+                "required_credits": float(required[i]),
+                "completion_rate": round(float(completion_rate[i]), 4),
+                "average_earned_credits": round(float(earned_matrix[:, i].mean()), 3) if n_users else 0.0,
+            }
+            for i in range(n_categories)
+        ],
+        "gpa_histogram": [
+            {"lower": round(float(edges[i]), 3), "upper": round(float(edges[i + 1]), 3), "count": int(counts[i])}
+            for i in range(len(counts))
+        ],
+        "gpa_percentiles": {f"{p:g}": round(float(v), 3) for p, v in zip(percentiles, gpa_percentiles)},
+    }
+
+
+def program_analytics(db: Session, training_program: TrainingProgram, histogram_bins: int = 10,
+                      percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> dict:
+    categories = db.execute(
+        select(CourseCategory.id, CourseCategory.required_credits)
+        .where(CourseCategory.training_program_id == training_program.id)
+    ).all()
+    category_ids = [category_id for category_id, _ in categories]
+    columns = load_cohort_columns(db, training_program.id, category_ids)
+    result = analyze_cohort(
+        columns,
+        category_ids,
+        [required for _, required in categories],
+        training_program.total_credits,
+        histogram_bins=histogram_bins,
+        percentiles=percentiles,
+    )
+    result["training_program_id"] = training_program.id
+    return result
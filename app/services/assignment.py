@@ -0,0 +1,217 @@
+"""
+课程-类别最优分配
+
+每门已获学分的课程可以计入若干个候选类别（当前类别加上用户给出的可计入规则），求一个分配使
+各类别已满足的学分之和 sum(min(要求学分, 分配学分)) 最大。
+
+课程不可拆分，精确求解是装箱类问题。这里先在二部图上求最大流（课程 -> 类别 -> 汇点，容量为
+学分与要求学分），它给出允许拆分时的最优值（上界）；再把每门课程取整到流量最多的类别，并用局部
+搜索（单门课程改投）修补。实例过大时改用贪心初解，同样经过局部搜索。
+"""
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+EPSILON = 1e-9
+
+# Beyond this many course -> category edges the max-flow step is skipped for the greedy start
+MAX_FLOW_EDGES = 20000
+
+# Upper bound on local-search passes over all courses
+MAX_IMPROVEMENT_PASSES = 20
+
+
+class _FlowNetwork:
+    """Dinic's max-flow on an adjacency list with paired residual edges"""
+
+    def __init__(self, size: int):
+        self.graph: List[List[int]] = [[] for _ in range(size)]
+        self.to: List[int] = []
+        self.capacity: List[float] = []
+
+    def add_edge(self, source: int, target: int, capacity: float) -> int:
+        self.graph[source].append(len(self.to))
+        self.to.append(target)
+        self.capacity.append(capacity)
+        self.graph[target].append(len(self.to))
+        self.to.append(source)
+        self.capacity.append(0.0)
+        return len(self.to) - 2
+
+    def max_flow(self, source: int, sink: int) -> float:
+        total = 0.0
+        while True:
+            level = self._levels(source)
+            if level[sink] < 0:
+                return total
+            next_edge = [0] * len(self.graph)
+            while True:
+                pushed = self._push(source, sink, float("inf"), level, next_edge)
+                if pushed <= EPSILON:
+                    break
+                total += pushed
+
+    def _levels(self, source: int) -> List[int]:
+        level = [-1] * len(self.graph)
+        level[source] = 0
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            for edge in self.graph[node]:
+                if self.capacity[edge] > EPSILON and level[self.to[edge]] < 0:
+                    level[self.to[edge]] = level[node] + 1
+                    queue.append(self.to[edge])
+        return level
+
+    def _push(self, node: int, sink: int, limit: float, level: List[int], next_edge: List[int]) -> float:
+        # Paths are at most source -> course -> category -> sink, so recursion depth is 3
+        if node == sink:
+            return limit
+        edges = self.graph[node]
+        while next_edge[node] < len(edges):
+            edge = edges[next_edge[node]]
+            target = self.to[edge]
+            if self.capacity[edge] > EPSILON and level[target] == level[node] + 1:
+                pushed = self._push(target, sink, min(limit, self.capacity[edge]), level, next_edge)
+                if pushed > EPSILON:
+                    self.capacity[edge] -= pushed
+                    self.capacity[edge ^ 1] += pushed
+                    return pushed
+            next_edge[node] += 1
+        return 0.0
+
+
+def satisfied_credits(required: Dict[str, float], loads: Dict[str, float]) -> float:
+    return sum(min(credits, loads.get(category_id, 0.0)) for category_id, credits in required.items())
+
+
+def _flow_assignment(credits: Dict[str, float], eligible: Dict[str, Sequence[str]],
+                     required: Dict[str, float]) -> Tuple[Dict[str, str], float]:
+    """Assignment rounded from the max flow, and the flow value (the fractional optimum)"""
+    course_ids = list(credits)
+    category_ids = list(required)
+    category_node = {category_id: len(course_ids) + 1 + index for index, category_id in enumerate(category_ids)}
+    source, sink = 0, len(course_ids) + len(category_ids) + 1
+    network = _FlowNetwork(sink + 1)
+
+    course_edges: Dict[str, List[Tuple[str, int]]] = {}
+    for index, course_id in enumerate(course_ids):
+        network.add_edge(source, index + 1, credits[course_id])
+        course_edges[course_id] = [
+            (category_id, network.add_edge(index + 1, category_node[category_id], credits[course_id]))
+            for category_id in eligible[course_id]
+        ]
+    for category_id in category_ids:
+        network.add_edge(category_node[category_id], sink, required[category_id])
+
+    flow_value = network.max_flow(source, sink)
+
+    assignment = {}
+    for course_id, edges in course_edges.items():
+        # Flow on a forward edge is the capacity moved onto its paired reverse edge
+        best_category, best_flow = eligible[course_id][0], 0.0
+        for category_id, edge in edges:
+            if network.capacity[edge ^ 1] > best_flow + EPSILON:
+                best_category, best_flow = category_id, network.capacity[edge ^ 1]
+        assignment[course_id] = best_category
+    return assignment, flow_value
+
+
+def _greedy_assignment(credits: Dict[str, float], eligible: Dict[str, Sequence[str]],
+                       required: Dict[str, float]) -> Dict[str, str]:
+    """Largest course first, into the eligible category with the biggest remaining deficit"""
+    remaining = dict(required)
+    assignment = {}
+    for course_id in sorted(credits, key=lambda course_id: (len(eligible[course_id]), -credits[course_id])):
+        category_id = max(eligible[course_id], key=lambda category_id: remaining[category_id])
+        assignment[course_id] = category_id
+        remaining[category_id] -= credits[course_id]
+    return assignment
+
+
+def _improve(assignment: Dict[str, str], credits: Dict[str, float], eligible: Dict[str, Sequence[str]],
+             required: Dict[str, float]) -> Dict[str, str]:
+    """Local search: move single courses while that raises the satisfied credits"""
+    loads = {category_id: 0.0 for category_id in required}
+    for course_id, category_id in assignment.items():
+        loads[category_id] += credits[course_id]
+
+    def gain(category_id: str, delta: float) -> float:
+        before = min(required[category_id], loads[category_id])
+        return min(required[category_id], loads[category_id] + delta) - before
+
+    for _ in range(MAX_IMPROVEMENT_PASSES):
+        improved = False
+        for course_id, current in assignment.items():
+            course_credits = credits[course_id]
+            loss = gain(current, -course_credits)
+            best_category, best_gain = current, EPSILON
+            for category_id in eligible[course_id]:
+                if category_id != current:
+                    move_gain = gain(category_id, course_credits) + loss
+                    if move_gain > best_gain:
+                        best_category, best_gain = category_id, move_gain
+            if best_category != current:
+                loads[current] -= course_credits
+                loads[best_category] += course_credits
+                assignment[course_id] = best_category
+                improved = True
+        if not improved:
+            break
+    return assignment
+
+
+def solve_assignment(
+    credits: Dict[str, float],
+    eligible: Dict[str, Sequence[str]],
+    required: Dict[str, float],
+    current: Optional[Dict[str, str]] = None,
+) -> dict:
+    """
+    Best assignment of courses to categories.
+
+    `credits` maps each earned course to its credits, `eligible` each course to the categories it may
+    count toward (non-empty, all keys of `required`), `required` each category to its required credits.
+    `current` is the existing assignment; a course keeps its current category unless moving it helps.
+    """
+    if not credits:
+        return {"assignment": {}, "satisfied_credits": 0.0, "upper_bound": 0.0, "method": "empty"}
+
+    edge_count = sum(len(categories) for categories in eligible.values())
+    if edge_count <= MAX_FLOW_EDGES:
+        start, upper_bound = _flow_assignment(credits, eligible, required)
+        method = "max_flow"
+    else:
+        start, upper_bound = _greedy_assignment(credits, eligible, required), None
+        method = "greedy"
+
+    candidates = [_improve(start, credits, eligible, required)]
+    if current is not None:
+        candidates.append(_improve({course_id: current[course_id] for course_id in credits}, credits, eligible, required))
+
+    def score(assignment: Dict[str, str]) -> float:
+        loads: Dict[str, float] = {}
+        for course_id, category_id in assignment.items():
+            loads[category_id] = loads.get(category_id, 0.0) + credits[course_id]
+        return satisfied_credits(required, loads)
+
+    # Prefer the candidate that started from the current placement on ties: fewer moves
+    best = max(reversed(candidates), key=score)
+    best_score = score(best)
+    if upper_bound is None:
+        upper_bound = min(sum(credits.values()), sum(required.values()))
+    return {
+        "assignment": best,
+        "satisfied_credits": round(best_score, 6),
+        "upper_bound": round(upper_bound, 6),
+        "method": method,
+    }
+
+
+def eligible_categories(current_category_id: str, rule_category_ids: Sequence[str],
+                        program_category_ids: Set[str]) -> List[str]:
+    """Candidate categories of one course within the program, current category first"""
+    candidates = [current_category_id] if current_category_id in program_category_ids else []
+    for category_id in rule_category_ids:
+        if category_id in program_category_ids and category_id not in candidates:
+            candidates.append(category_id)
+    return candidates
@@ -0,0 +1,264 @@
+"""
+毕业资格批量审核
+
+管理员接口或命令行创建审核任务后，任务在后台线程中运行，不占用 API 工作线程：
+把培养方案的学生按块划分，每块的课程记录一次查询取出，交给进程池用与仪表盘相同的
+calculate_credit_summary 逻辑计算；结果写入 audit_results 表，并更新任务进度，可导出为 CSV。
+每提交一块结果刷新一次心跳，工作进程重启导致中断的任务由后台线程定期标记为失败。
+
+命令行：python -m app.services.audit <培养方案ID> [--output results.csv] [--chunk-size N] [--workers N]
+"""
+import argparse
+import csv
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Set, TextIO
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.core.config import settings
+from app.db import statements
+from app.db.base import SessionLocal
+from app.db.projections import CategoryRecord, CourseRecord, load_category_records, load_course_records_by_user
+from app.models.audit import AuditJob, AuditResult, AuditStatus
+from app.models.course import Course
+from app.models.course_category import CourseCategory
+from app.models.user import User
+from app.services.credit_summary import calculate_credit_summary
+
+logger = logging.getLogger(__name__)
+
+# Interrupted jobs are looked for this often by the background thread
+STALE_CHECK_INTERVAL_SECONDS = 60
+
+CSV_HEADER = ["user_id", "email", "eligible", "earned_credits", "required_credits", "overall_gpa",
+              "incomplete_categories"]
+
+# Students on a program: everyone with at least one course filed under its categories
+STUDENTS_BY_PROGRAM = (
+    select(Course.user_id)
+    .join(CourseCategory, Course.category_id == CourseCategory.id)
+    .where(CourseCategory.training_program_id == bindparam("training_program_id"))
+    .distinct()
+    .order_by(Course.user_id)
+)
+
+
+def _incomplete_categories(categories: Sequence[dict]) -> List[str]:
+    incomplete = []
+    for category in categories:
+        if not category["is_complete"]:
+            incomplete.append(category["category_name"])
+        incomplete.extend(_incomplete_categories(category["subcategories"]))
+    return incomplete
+
+
+def evaluate_chunk(total_credits: float, categories: Sequence[CategoryRecord],
+                   courses_by_user: Dict[str, List[CourseRecord]]) -> List[dict]:
+    """
+    Eligibility verdicts for one chunk of students; runs in a worker process.
+
+    A student is eligible when the dashboard summary shows the program's total credits earned
+    and every category (including subcategories) complete.
+    """
+    results = []
+    for user_id, courses in courses_by_user.items():
+        summary = calculate_credit_summary(total_credits, categories, courses)
+        incomplete = _incomplete_categories(summary["categories"])
+        results.append({
+            "user_id": user_id,
+            "eligible": summary["total_earned_credits"] >= total_credits and not incomplete,
+            "earned_credits": summary["total_earned_credits"],
+            "required_credits": total_credits,
+            "overall_gpa": summary["overall_gpa"],
+            "incomplete_categories": incomplete,
+        })
+    return results
+
+
+def _chunks(items: Sequence[str], size: int) -> Iterator[Sequence[str]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _store_results(db: Session, job: AuditJob, results: List[dict]) -> None:
+    if results:
+        db.execute(insert(AuditResult), [{"job_id": job.id, **result} for result in results])
+    job.processed_students += len(results)
+    job.eligible_students += sum(1 for result in results if result["eligible"])
+    job.heartbeat_at = func.now()
+    db.commit()
+
+
+def run_audit_job(job_id: str, chunk_size: Optional[int] = None, max_workers: Optional[int] = None) -> None:
+    """Evaluate every student of the job's program, committing results and progress chunk by chunk"""
+    chunk_size = chunk_size or settings.AUDIT_CHUNK_SIZE
+    max_workers = max_workers or settings.AUDIT_MAX_WORKERS or os.cpu_count() or 1
+    db = SessionLocal()
+    try:
+        job = db.get(AuditJob, job_id)
+        training_program = statements.get_training_program(db, job.training_program_id)
+        categories = load_category_records(db, training_program.id)
+        user_ids = db.execute(STUDENTS_BY_PROGRAM, {"training_program_id": training_program.id}).scalars().all()
+        job.status = AuditStatus.RUNNING
+        job.total_students = len(user_ids)
+        job.started_at = func.now()
+        job.heartbeat_at = func.now()
+        db.commit()
+
+        total_credits = training_program.total_credits
+        chunks = list(_chunks(user_ids, chunk_size))
+        if len(chunks) <= 1:
+            # Not worth starting worker processes for a single chunk
+            for chunk in chunks:
+                _store_results(db, job, evaluate_chunk(total_credits, categories,
+                                                       load_course_records_by_user(db, chunk)))
+        else:
+            # Spawned (not forked) workers: the API process has threads and open connections
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(chunks)), mp_context=context) as pool:
+                pending: Set[Future] = set()
+                for chunk in chunks:
+                    # Keep at most two chunks per worker loaded in memory
+                    if len(pending) >= 2 * max_workers:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            _store_results(db, job, future.result())
+                    pending.add(pool.submit(evaluate_chunk, total_credits, categories,
+                                            load_course_records_by_user(db, chunk)))
+                for future in pending:
+                    _store_results(db, job, future.result())
+
+        job.status = AuditStatus.COMPLETED
+        job.finished_at = func.now()
+        db.commit()
+    except Exception as exc:
+        logger.exception("Audit job %s failed", job_id)
+        db.rollback()
+        job = db.get(AuditJob, job_id)
+        if job is not None:
+            job.status = AuditStatus.FAILED
+            job.error = str(exc)
+            job.finished_at = func.now()
+            db.commit()
+    finally:
+        db.close()
+
+
+def create_audit_job(db: Session, training_program_id: str, created_by: Optional[str] = None) -> AuditJob:
+    job = AuditJob(training_program_id=training_program_id, created_by=created_by, status=AuditStatus.PENDING)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def fail_stale_audit_jobs(db: Session) -> int:
+    """
+    Mark pending or running jobs without progress for AUDIT_HEARTBEAT_TIMEOUT_SECONDS as failed.
+
+    Jobs run on a thread of the API worker that started them; a worker restart (max_requests
+    recycling, graceful timeout, deploy) ends them without a trace. The caller commits. Returns
+    the number of jobs marked.
+    """
+    now = db.execute(select(func.now())).scalar_one()
+    cutoff = now - timedelta(seconds=settings.AUDIT_HEARTBEAT_TIMEOUT_SECONDS)
+    stale = update(AuditJob).where(
+        AuditJob.status.in_([AuditStatus.PENDING, AuditStatus.RUNNING]),
+        func.coalesce(AuditJob.heartbeat_at, AuditJob.created_at) < cutoff,
+    )
+    result = db.execute(stale.values(
+        status=AuditStatus.FAILED,
+        error=f"Interrupted: no progress for {settings.AUDIT_HEARTBEAT_TIMEOUT_SECONDS} seconds "
+              "(the worker running it was restarted or stopped)",
+        finished_at=now,
+    ).execution_options(synchronize_session=False))
+    return result.rowcount
+
+
+def start_stale_audit_check(interval: float = STALE_CHECK_INTERVAL_SECONDS) -> threading.Thread:
+    """Fail interrupted audit jobs now and every `interval` seconds in a daemon thread"""
+
+    def _run():
+        while True:
+            db = SessionLocal()
+            try:
+                failed = fail_stale_audit_jobs(db)
+                db.commit()
+                if failed:
+                    logger.warning(f"{failed} 个中断的审核任务已标记为失败")
+            except Exception as e:
+                logger.error(f"检查中断的审核任务失败: {str(e)}")
+            finally:
+                db.close()
+            time.sleep(interval)
+
+    thread = threading.Thread(target=_run, name="audit-stale-check", daemon=True)
+    thread.start()
+    return thread
+
+
+def start_audit_job(db: Session, training_program_id: str, created_by: Optional[str] = None) -> AuditJob:
+    """Create a job and run it on a background thread; the caller returns immediately"""
+    job = create_audit_job(db, training_program_id, created_by)
+    threading.Thread(target=run_audit_job, args=(job.id,), name=f"audit-{job.id}", daemon=True).start()
+    return job
+
+
+def write_results_csv(db: Session, job_id: str, output: TextIO) -> None:
+    writer = csv.writer(output)
+    writer.writerow(CSV_HEADER)
+    rows = db.execute(
+        select(
+            AuditResult.user_id, User.email, AuditResult.eligible, AuditResult.earned_credits,
+            AuditResult.required_credits, AuditResult.overall_gpa, AuditResult.incomplete_categories,
+        )
+        .join(User, AuditResult.user_id == User.id)
+        .where(AuditResult.job_id == job_id)
+        .order_by(User.email)
+    )
+    for user_id, email, eligible, earned, required, gpa, incomplete in rows:
+        writer.writerow([user_id, email, "yes" if eligible else "no", earned, required, gpa, "; ".join(incomplete)])
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run a graduation-eligibility audit for a training program")
+    parser.add_argument("training_program_id")
+    parser.add_argument("--output", help="CSV file to write (default: stdout)")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        if not statements.get_training_program(db, args.training_program_id):
+            print("培养方案不存在", file=sys.stderr)
+            return 1
+        job = create_audit_job(db, args.training_program_id)
+        run_audit_job(job.id, chunk_size=args.chunk_size, max_workers=args.workers)
+        db.refresh(job)
+        print(f"audit {job.id}: {job.status.value}, {job.eligible_students}/{job.total_students} eligible",
+              file=sys.stderr)
+        if job.status != AuditStatus.COMPLETED:
+            print(job.error, file=sys.stderr)
+            return 1
+        if args.output:
+            with open(args.output, "w", newline="", encoding="utf-8") as output:
+                write_results_csv(db, job.id, output)
+        else:
+            write_results_csv(db, job.id, sys.stdout)
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
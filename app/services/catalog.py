@@ -0,0 +1,105 @@
+"""
+课程目录
+
+同一培养方案下名称规范化后相同的课程共享一个目录条目。规范化：NFKC（全角转半角）、
+大小写折叠、去掉首尾空白并把连续空白合并为一个空格。
+只有培养方案的所有者和管理员可以创建条目；其他用户的课程只关联已有的同名条目。
+"""
+import re
+import unicodedata
+import uuid
+from typing import Container, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import bindparam, insert, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.catalog import CatalogCourse
+
+_WHITESPACE = re.compile(r"\s+")
+
+CATALOG_COURSE_BY_NAME = select(CatalogCourse).where(
+    CatalogCourse.training_program_id == bindparam("training_program_id"),
+    CatalogCourse.normalized_name == bindparam("normalized_name"),
+)
+CATALOG_COURSE_IDS_BY_NAMES = select(
+    CatalogCourse.training_program_id, CatalogCourse.normalized_name, CatalogCourse.id,
+).where(
+    CatalogCourse.training_program_id.in_(bindparam("training_program_ids", expanding=True)),
+    CatalogCourse.normalized_name.in_(bindparam("normalized_names", expanding=True)),
+)
+
+# (training_program_id, normalized name)
+CatalogKey = Tuple[str, str]
+
+
+def normalize_course_name(name: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", name).casefold()).strip()
+
+
+def normalize_course_code(code: Optional[str]) -> Optional[str]:
+    if code is None:
+        return None
+    code = _WHITESPACE.sub("", unicodedata.normalize("NFKC", code)).upper()
+    return code or None
+
+
+def get_catalog_course_by_name(db: Session, training_program_id: str, name: str) -> Optional[CatalogCourse]:
+    params = {"training_program_id": training_program_id, "normalized_name": normalize_course_name(name)}
+    return db.execute(CATALOG_COURSE_BY_NAME, params).scalars().first()
+
+
+def catalog_key(training_program_id: str, name: str) -> CatalogKey:
+    return training_program_id, normalize_course_name(name)
+
+
+def resolve_catalog_course_ids(
+    db: Session, courses: Iterable[Tuple[str, str, float, Optional[str]]], creatable_program_ids: Container[str],
+) -> Dict[CatalogKey, str]:
+    """
+    Catalog entry ids for many (training_program_id, name, credits, category_id) courses at once.
+
+    Existing entries are found with one query. Missing entries are created with one bulk insert,
+    the first course of each name providing credits and default category, but only in the programs
+    of `creatable_program_ids`; names missing elsewhere are left out of the result. The entries are
+    not committed, so they land in the caller's transaction.
+    """
+    wanted: Dict[CatalogKey, dict] = {}
+    for training_program_id, name, credits, category_id in courses:
+        key = catalog_key(training_program_id, name)
+        if key not in wanted:
+            wanted[key] = {
+                "training_program_id": training_program_id, "name": name.strip(), "normalized_name": key[1],
+                "credits": credits, "default_category_id": category_id,
+            }
+    if not wanted:
+        return {}
+
+    def existing() -> Dict[CatalogKey, str]:
+        rows = db.execute(CATALOG_COURSE_IDS_BY_NAMES, {
+            "training_program_ids": list({key[0] for key in wanted}),
+            "normalized_names": list({key[1] for key in wanted}),
+        })
+        return {(program_id, name): catalog_id for program_id, name, catalog_id in rows if (program_id, name) in wanted}
+
+    ids = existing()
+    missing = [{"id": str(uuid.uuid4()), **row} for key, row in wanted.items()
+               if key not in ids and key[0] in creatable_program_ids]
+    if not missing:
+        return ids
+    db.execute(_insert_missing(db), missing)
+    # Entries another request created concurrently were skipped by the insert; read back the winners
+    return existing()
+
+
+def _insert_missing(db: Session):
+    """INSERT that skips names already in the program's catalog, where the database supports it"""
+    dialect = db.get_bind(CatalogCourse).dialect.name
+    if dialect == "postgresql":
+        return postgresql_insert(CatalogCourse).on_conflict_do_nothing(
+            index_elements=["training_program_id", "normalized_name"])
+    if dialect == "sqlite":
+        return sqlite_insert(CatalogCourse).on_conflict_do_nothing(
+            index_elements=["training_program_id", "normalized_name"])
+    return insert(CatalogCourse)
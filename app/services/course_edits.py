@@ -0,0 +1,325 @@
+"""
+课程写入的共享校验
+
+单门课程的创建/更新接口与批量接口 /courses/batch 共用同一套成绩制校验和课程目录关联逻辑。
+校验失败抛出 ValueError（对应 400），引用的目录条目不存在抛出 LookupError（对应 404），由调用方转换为 HTTP 响应。
+
+批量编辑先用两次查询载入所有引用到的课程和类别（连同培养方案），再一次查询找出所有操作涉及的目录条目、
+一次批量插入创建缺少的条目（仅限当前用户拥有的培养方案或管理员），然后按顺序应用每个操作，全部成功才一次提交，否则整体回滚，并返回每个操作的结果。
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import bindparam, inspect, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
+
+from app.db import statements
+from app.models.course import GPA_INPUTS, Course, GradingSystem
+from app.models.course_category import CourseCategory
+from app.models.training_program import TrainingProgram
+from app.models.user import User
+from app.schemas.course import CourseCreate, CourseUpdate
+from app.models.catalog import CatalogCourse
+from app.services.catalog import CatalogKey, catalog_key, resolve_catalog_course_ids
+
+COURSES_BY_IDS = select(Course).where(Course.id.in_(bindparam("ids", expanding=True)))
+CATEGORIES_WITH_PROGRAMS = select(CourseCategory, TrainingProgram).join(
+    TrainingProgram, CourseCategory.training_program_id == TrainingProgram.id,
+).where(CourseCategory.id.in_(bindparam("ids", expanding=True)))
+CATALOG_COURSES_BY_IDS = select(CatalogCourse).where(CatalogCourse.id.in_(bindparam("ids", expanding=True)))
+
+
+class CatalogLookup:
+    """
+    Catalog entries used by course writes.
+
+    Single writes look each entry up as needed; the batch preloads the explicitly referenced
+    entries and the ids of the entries for every course name it writes, so applying its
+    operations runs no catalog statements. Entries are only created in programs the user owns
+    (or any program for an admin), as with POST /catalog/; elsewhere a name without an entry
+    leaves the course unlinked.
+    """
+
+    def __init__(self, db: Session, current_user: User, programs: Optional[Dict[str, TrainingProgram]] = None):
+        self.db = db
+        self.current_user = current_user
+        self.programs: Dict[str, TrainingProgram] = programs if programs is not None else {}
+        self.entries: Dict[str, Optional[CatalogCourse]] = {}
+        self.ids: Dict[CatalogKey, Optional[str]] = {}
+
+    def _creatable(self, training_program_ids: Iterable[str]) -> Set[str]:
+        if self.current_user.is_admin:
+            return set(training_program_ids)
+        creatable = set()
+        for training_program_id in training_program_ids:
+            if training_program_id not in self.programs:
+                self.programs[training_program_id] = statements.get_training_program(self.db, training_program_id)
+            training_program = self.programs[training_program_id]
+            if training_program is not None and training_program.user_id == self.current_user.id:
+                creatable.add(training_program_id)
+        return creatable
+
+    def _resolve(self, names: Sequence[Tuple[str, str, float, Optional[str]]]) -> None:
+        if not names:
+            return
+        self.ids.update(resolve_catalog_course_ids(self.db, names, self._creatable({name[0] for name in names})))
+        for training_program_id, name, _, _ in names:
+            self.ids.setdefault(catalog_key(training_program_id, name), None)
+
+    def preload(self, catalog_course_ids: Sequence[str],
+                names: Sequence[Tuple[str, str, float, Optional[str]]]) -> None:
+        if catalog_course_ids:
+            found = {entry.id: entry for entry in
+                     self.db.execute(CATALOG_COURSES_BY_IDS, {"ids": list(catalog_course_ids)}).scalars()}
+            self.entries.update({catalog_id: found.get(catalog_id) for catalog_id in catalog_course_ids})
+        self._resolve(names)
+
+    def entry(self, catalog_course_id: str) -> Optional[CatalogCourse]:
+        if catalog_course_id in self.entries:
+            return self.entries[catalog_course_id]
+        return statements.get_catalog_course(self.db, catalog_course_id)
+
+    def id_for(self, training_program_id: str, name: str, credits: float, category_id: str) -> Optional[str]:
+        """The id of the program's entry for a course name, created if there is none yet and the user may"""
+        key = catalog_key(training_program_id, name)
+        if key not in self.ids:
+            self._resolve([(training_program_id, name, credits, category_id)])
+        return self.ids[key]
+
+
+def check_new_course_grading(course_in: CourseCreate) -> None:
+    if course_in.grading_system == GradingSystem.PERCENTAGE:
+        if course_in.grade is None:
+            raise ValueError("Grade is required for percentage grading system")
+        if course_in.passed is not None:
+            raise ValueError("Passed status should not be provided for percentage grading system")
+    elif course_in.grading_system == GradingSystem.PASS_FAIL:
+        if course_in.passed is None:
+            raise ValueError("Passed status is required for pass/fail grading system")
+        if course_in.grade is not None:
+            raise ValueError("Grade should not be provided for pass/fail grading system")
+
+
+def new_course_data(db: Session, course_in: CourseCreate, category: CourseCategory, current_user: User,
+                    catalog: Optional[CatalogLookup] = None) -> dict:
+    """
+    Column values of a new course, grading checked and linked to the program's catalog entry.
+
+    Name and credits default to the explicit catalog entry's; otherwise the entry is found by
+    name, or created when `current_user` may add entries to the program.
+    """
+    catalog = catalog or CatalogLookup(db, current_user)
+    check_new_course_grading(course_in)
+    course_data = course_in.model_dump()
+    if course_in.catalog_course_id:
+        catalog_course = catalog.entry(course_in.catalog_course_id)
+        if not catalog_course or catalog_course.training_program_id != category.training_program_id:
+            raise LookupError("Catalog course not found in this training program")
+        if course_data["name"] is None:
+            course_data["name"] = catalog_course.name
+        if course_data["credits"] is None:
+            course_data["credits"] = catalog_course.credits
+    else:
+        course_data["catalog_course_id"] = catalog.id_for(
+            category.training_program_id, course_in.name, course_in.credits, category.id,
+        )
+    return course_data
+
+
+def course_update_data(db: Session, course: Course, course_in: CourseUpdate, current_user: User,
+                       category: Optional[CourseCategory] = None, catalog: Optional[CatalogLookup] = None) -> dict:
+    """
+    Fields to set on an existing course; `category` is the new category when the course moves.
+
+    Keeps the catalog link in step (an explicit entry must belong to the course's program, and a
+    rename or a move to another program links the course by its new name) and clears the other
+    grading system's field when the grading system changes.
+    """
+    catalog = catalog or CatalogLookup(db, current_user)
+    update_data = course_in.model_dump(exclude_unset=True)
+
+    current_program_id = course.category.training_program_id
+    training_program_id = category.training_program_id if category else current_program_id
+    if update_data.get("catalog_course_id"):
+        catalog_course = catalog.entry(update_data["catalog_course_id"])
+        if not catalog_course or catalog_course.training_program_id != training_program_id:
+            raise LookupError("Catalog course not found in this training program")
+    elif "name" in update_data or training_program_id != current_program_id:
+        update_data["catalog_course_id"] = catalog.id_for(
+            training_program_id, update_data.get("name") or course.name,
+            update_data.get("credits") or course.credits, category.id if category else course.category_id,
+        )
+
+    if "grading_system" in update_data:
+        new_grading_system = update_data["grading_system"]
+        if new_grading_system == GradingSystem.PERCENTAGE:
+            # Switching to percentage: a grade must exist and passed is removed
+            if "grade" not in update_data and course.grade is None:
+                raise ValueError("Grade is required for percentage grading system")
+            update_data["passed"] = None
+        elif new_grading_system == GradingSystem.PASS_FAIL:
+            # Switching to pass/fail: passed must exist and grade is removed
+            if "passed" not in update_data and course.passed is None:
+                raise ValueError("Passed status is required for pass/fail grading system")
+            update_data["grade"] = None
+    return update_data
+
+
+class _Batch:
+    """Courses and categories referenced by a batch, loaded up front"""
+
+    def __init__(self, db: Session, current_user: User, operations: Sequence):
+        self.db = db
+        self.current_user = current_user
+        course_ids = [operation.id for operation in operations if operation.op != "create"]
+        self.courses: Dict[str, Course] = {
+            course.id: course for course in db.execute(COURSES_BY_IDS, {"ids": course_ids}).scalars()
+        } if course_ids else {}
+
+        category_ids = {course.category_id for course in self.courses.values()}
+        for operation in operations:
+            if operation.op == "create":
+                category_ids.add(operation.course.category_id)
+            elif operation.op == "update" and operation.changes.category_id:
+                category_ids.add(operation.changes.category_id)
+            elif operation.op == "move":
+                category_ids.add(operation.category_id)
+        self.categories: Dict[str, CourseCategory] = {}
+        self.programs: Dict[str, TrainingProgram] = {}
+        if category_ids:
+            for category, training_program in db.execute(CATEGORIES_WITH_PROGRAMS, {"ids": list(category_ids)}):
+                self.categories[category.id] = category
+                self.programs[training_program.id] = training_program
+        self.catalog = CatalogLookup(db, current_user, self.programs)
+        self._preload_catalog(operations)
+
+    def _preload_catalog(self, operations: Sequence) -> None:
+        """Catalog entries the operations will link to; operations that are going to fail are skipped"""
+        catalog_course_ids = set()
+        names = []
+        for operation in operations:
+            try:
+                if operation.op == "create":
+                    course_in = operation.course
+                    category = self.category(course_in.category_id)
+                    if course_in.catalog_course_id:
+                        catalog_course_ids.add(course_in.catalog_course_id)
+                    elif course_in.name:
+                        names.append((category.training_program_id, course_in.name, course_in.credits, category.id))
+                elif operation.op in ("update", "move"):
+                    course = self.course(operation.id)
+                    changes = operation.changes if operation.op == "update" \
+                        else CourseUpdate(category_id=operation.category_id)
+                    category = self.category(changes.category_id or course.category_id)
+                    moved = category.training_program_id != self.categories[course.category_id].training_program_id
+                    if changes.catalog_course_id:
+                        catalog_course_ids.add(changes.catalog_course_id)
+                    elif "name" in changes.model_fields_set or moved:
+                        names.append((category.training_program_id, changes.name or course.name,
+                                      changes.credits or course.credits, category.id))
+            except (LookupError, PermissionError):
+                continue
+        self.catalog.preload(list(catalog_course_ids), names)
+
+    def category(self, category_id: str) -> CourseCategory:
+        """A category the current user may file courses under"""
+        category = self.categories.get(category_id)
+        if category is None:
+            raise LookupError("Category not found")
+        training_program = self.programs[category.training_program_id]
+        if not self.current_user.is_admin and training_program.user_id != self.current_user.id \
+                and not training_program.is_public:
+            raise PermissionError("Not enough permissions")
+        return category
+
+    def course(self, course_id: str) -> Course:
+        course = self.courses.get(course_id)
+        if course is None:
+            raise LookupError("Course not found")
+        if not self.current_user.is_admin and course.user_id != self.current_user.id:
+            raise PermissionError("Not enough permissions")
+        return course
+
+    def create(self, course_in: CourseCreate) -> Course:
+        course = Course(**new_course_data(self.db, course_in, self.category(course_in.category_id), self.current_user,
+                                          self.catalog),
+                        user_id=self.current_user.id)
+        self.db.add(course)
+        return course
+
+    def update(self, course_id: str, course_in: CourseUpdate) -> Course:
+        course = self.course(course_id)
+        category = None
+        if course_in.category_id and course_in.category_id != course.category_id:
+            category = self.category(course_in.category_id)
+        update_data = course_update_data(self.db, course, course_in, self.current_user, category, self.catalog)
+        for field, value in update_data.items():
+            setattr(course, field, value)
+        return course
+
+    def delete(self, course_id: str) -> None:
+        self.db.delete(self.course(course_id))
+        del self.courses[course_id]
+
+
+def _align_updated_columns(courses: Sequence[Course]) -> None:
+    """
+    Make every updated course write the same columns.
+
+    The flush orders updated rows by primary key and sends only consecutive rows with the same SET
+    columns as one executemany, so a batch mixing grade edits, renames and moves would otherwise
+    issue an UPDATE for every run of alike rows.
+    """
+    states = [inspect(course) for course in courses if inspect(course).persistent]
+    columns = [attr.key for attr in Course.__mapper__.column_attrs]
+    changed = {key for state in states for key in columns if state.attrs[key].history.has_changes()}
+    if changed & set(GPA_INPUTS):
+        changed.add("gpa")  # recomputed for every row by the before_update hook
+    for state in states:
+        for key in changed:
+            flag_modified(state.obj(), key)
+
+
+def apply_course_batch(db: Session, current_user: User, operations: Sequence) -> dict:
+    """
+    Apply create/update/delete/move operations in order and commit them together.
+
+    Every operation is attempted so that all failures are reported at once; if any fails, the
+    whole batch is rolled back and `committed` is False.
+    """
+    batch = _Batch(db, current_user, operations)
+    results: List[dict] = []
+    touched: List[Optional[Course]] = []
+    for index, operation in enumerate(operations):
+        result = {"index": index, "op": operation.op, "id": getattr(operation, "id", None), "ok": True}
+        course = None
+        try:
+            if operation.op == "create":
+                course = batch.create(operation.course)
+            elif operation.op == "update":
+                course = batch.update(operation.id, operation.changes)
+            elif operation.op == "move":
+                course = batch.update(operation.id, CourseUpdate(category_id=operation.category_id))
+            else:
+                batch.delete(operation.id)
+        except (LookupError, PermissionError, ValueError) as e:
+            result.update(ok=False, error=str(e))
+        results.append(result)
+        touched.append(course)
+
+    if not all(result["ok"] for result in results):
+        db.rollback()
+        return {"committed": False, "results": results}
+
+    _align_updated_columns([course for course in touched if course is not None])
+    db.flush()
+    course_ids = [course.id for course in touched if course is not None]
+    db.commit()
+    # One query brings back every created or changed course with its server-side defaults
+    courses = {course.id: course for course in db.execute(COURSES_BY_IDS, {"ids": course_ids}).scalars()} \
+        if course_ids else {}
+    for result, course in zip(results, touched):
+        if course is not None:
+            result["id"] = course.id
+            result["course"] = courses.get(course.id)
+    return {"committed": True, "results": results}
@@ -0,0 +1,95 @@
+"""
+学分汇总计算
+
+纯函数实现：输入培养方案总学分、类别记录和课程记录，输出与 CreditSummary 结构一致的字典。
+不依赖数据库会话，可以在仪表盘、批量审核的进程池以及模拟计算中复用。
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.models.course import GradingSystem
+
+
+def is_earned(course) -> bool:
+    """A course earns credits once it is passed (pass/fail) or graded (percentage)"""
+    if course.grading_system == GradingSystem.PASS_FAIL:
+        return bool(course.passed)
+    return course.grading_system == GradingSystem.PERCENTAGE and course.grade is not None
+
+
+def children_index(categories: Iterable) -> Dict[Optional[str], List]:
+    """parent_id -> child categories (roots under None), preserving input order"""
+    children = defaultdict(list)
+    for category in categories:
+        children[category.parent_id].append(category)
+    return children
+
+
+def calculate_overall_gpa(courses: Iterable) -> float:
+    weighted_gpa_sum = 0.0
+    gpa_credits = 0.0
+    for course in courses:
+        if course.gpa is not None:
+            weighted_gpa_sum += course.gpa * course.credits
+            gpa_credits += course.credits
+    return round(weighted_gpa_sum / gpa_credits, 3) if gpa_credits > 0 else 0.0
+
+
+def calculate_category_progress(categories: Sequence, earned_by_category: Dict[str, float],
+                                gpa_by_category: Optional[Dict[str, Tuple[float, float]]] = None) -> List[dict]:
+    """
+    Category progress tree (CategoryProgressWithChildren dicts) for the root categories.
+
+    `gpa_by_category` maps category_id -> (sum of gpa * credits, graded credits).
+    """
+    children = children_index(categories)
+    gpa_by_category = gpa_by_category or {}
+
+    def build(category) -> dict:
+        earned_credits = earned_by_category.get(category.id, 0.0)
+        weighted_gpa_sum, gpa_credits = gpa_by_category.get(category.id, (0.0, 0.0))
+        subcategories = children.get(category.id, [])
+        return {
+            "category_id": category.id,
+            "category_name": category.name,
+            "required_credits": category.required_credits,
+            "earned_credits": earned_credits,
+            "remaining_credits": max(0.0, category.required_credits - earned_credits),
+            "is_complete": earned_credits >= category.required_credits,
+            "has_subcategories": len(subcategories) > 0,
+            "parent_id": category.parent_id,
+            "gpa": round(weighted_gpa_sum / gpa_credits, 3) if gpa_credits > 0 else None,
+            "subcategories": [build(subcategory) for subcategory in subcategories],
+        }
+
+    return [build(category) for category in children.get(None, [])]
+
+
+def calculate_credit_summary(total_credits: float, categories: Sequence, courses: Sequence) -> dict:
+    """
+    Credit summary for one training program.
+
+    `categories` are the program's category records (id, name, required_credits, parent_id) and
+    `courses` the user's course records (category_id, credits, grading_system, grade, passed, gpa).
+    Like the dashboard always has, totals count every course of the user and each category counts
+    only the courses assigned to it directly (subcategory credits are not rolled up).
+    """
+    total_earned_credits = 0.0
+    earned_by_category: Dict[str, float] = defaultdict(float)
+    gpa_by_category: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0.0])
+    for course in courses:
+        if is_earned(course):
+            total_earned_credits += course.credits
+            earned_by_category[course.category_id] += course.credits
+        if course.gpa is not None:
+            category_gpa = gpa_by_category[course.category_id]
+            category_gpa[0] += course.gpa * course.credits
+            category_gpa[1] += course.credits
+
+    return {
+        "total_required_credits": total_credits,
+        "total_earned_credits": total_earned_credits,
+        "remaining_credits": max(0.0, total_credits - total_earned_credits),
+        "overall_gpa": calculate_overall_gpa(courses),
+        "categories": calculate_category_progress(categories, earned_by_category, gpa_by_category),
+    }
@@ -0,0 +1,37 @@
+"""
+与数据库相关的绩点换算操作
+"""
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.grading import CompiledScale, get_scale
+from app.models.course import Course, GradingSystem
+from app.models.course_category import CourseCategory
+from app.models.training_program import TrainingProgram
+
+
+def scale_for_program(training_program: TrainingProgram) -> CompiledScale:
+    return get_scale(training_program.grading_scale, training_program.grading_scale_breakpoints)
+
+
+def recalculate_program_gpa(db: Session, training_program: TrainingProgram) -> int:
+    """
+    Recompute the stored GPA of every graded course in a program after its grading scale changed.
+
+    The whole transcript is converted through the compiled lookup table and written back with one
+    executemany UPDATE; the caller commits. Returns the number of courses updated.
+    """
+    rows = db.execute(
+        select(Course.id, Course.grade)
+        .join(CourseCategory, Course.category_id == CourseCategory.id)
+        .where(
+            CourseCategory.training_program_id == training_program.id,
+            Course.grading_system == GradingSystem.PERCENTAGE,
+            Course.grade.isnot(None),
+        )
+    ).all()
+    if not rows:
+        return 0
+    gpas = scale_for_program(training_program).convert_many([grade for _, grade in rows])
+    db.execute(update(Course), [{"id": course_id, "gpa": gpa} for (course_id, _), gpa in zip(rows, gpas)])
+    return len(rows)
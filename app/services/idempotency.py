@@ -0,0 +1,164 @@
+"""
+幂等键
+
+客户端给写请求带上 Idempotency-Key 头后，同一用户同一个键的第一次请求正常执行，响应（状态码、头、响应体）
+存入 idempotency_keys 表；此后的重试直接重放存下的响应，不再执行。并发的重复请求在 (user_id, key) 唯一约束上竞争，
+落败的一方轮询等待第一次执行完成后重放，等待超过 IDEMPOTENCY_WAIT_SECONDS 返回 409。
+认领是一份租约：只有超过 lease_seconds()（不短于 SERVER_TIMEOUT_SECONDS，工作进程最长的静默时间）仍未完成的认领
+才视为已中断（工作进程被杀死），可以重新认领；租约内的请求可能仍在执行，重新认领会让它执行两次。
+
+5xx 响应和 401/403 不保存，键被释放，重试会重新执行；超过 IDEMPOTENCY_MAX_BODY_BYTES 的响应同样不保存。
+键保存 IDEMPOTENCY_KEY_TTL_HOURS 小时，由后台线程定期清除。
+"""
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.models.idempotency import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+# Expired keys are purged this often by the background thread
+PURGE_INTERVAL_SECONDS = 600
+
+CLAIMED = "claimed"
+REPLAY = "replay"
+IN_PROGRESS = "in_progress"
+MISMATCH = "mismatch"
+
+# Seconds added to SERVER_TIMEOUT_SECONDS: a claim is only abandoned once its worker must have been killed
+LEASE_MARGIN_SECONDS = 30
+
+# Failures before the endpoint could act; a retry after fixing them should run
+UNSTORED_STATUS_CODES = {401, 403}
+
+
+class Claim(NamedTuple):
+    outcome: str
+    record_id: Optional[int] = None
+    status_code: Optional[int] = None
+    headers: Optional[List[Tuple[str, str]]] = None
+    body: Optional[bytes] = None
+
+
+def request_hash(method: str, path: str, query: bytes, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query, body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def lease_seconds() -> float:
+    """Seconds an unfinished claim holds its key before it counts as abandoned"""
+    minimum = settings.SERVER_TIMEOUT_SECONDS + LEASE_MARGIN_SECONDS
+    return max(settings.IDEMPOTENCY_LEASE_SECONDS, minimum)
+
+
+def _now(db: Session) -> datetime:
+    return db.execute(select(func.now())).scalar_one()
+
+
+def claim_key(user_id: str, key: str, fingerprint: str) -> Claim:
+    """
+    Claim `key` for a new execution, or report why the request must not run.
+
+    Returns CLAIMED with the record id, REPLAY with the stored response, IN_PROGRESS while another
+    request holds the key (until its lease runs out), or MISMATCH when the key was used for a different request.
+    """
+    db = SessionLocal()
+    try:
+        for _ in range(2):
+            record = IdempotencyKey(user_id=user_id, key=key, request_hash=fingerprint)
+            db.add(record)
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+            else:
+                return Claim(CLAIMED, record.id)
+
+            existing = db.execute(select(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id, IdempotencyKey.key == key,
+            )).scalar_one_or_none()
+            if existing is None:
+                continue  # released or purged in between
+            now = _now(db)
+            expired = existing.created_at < now - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+            abandoned = existing.status_code is None \
+                and existing.created_at < now - timedelta(seconds=lease_seconds())
+            if expired or abandoned:
+                db.execute(delete(IdempotencyKey).where(IdempotencyKey.id == existing.id))
+                db.commit()
+                continue
+            if existing.request_hash != fingerprint:
+                return Claim(MISMATCH)
+            if existing.status_code is None:
+                return Claim(IN_PROGRESS)
+            return Claim(REPLAY, existing.id, existing.status_code,
+                         [tuple(header) for header in existing.headers or []], existing.body)
+        return Claim(IN_PROGRESS)
+    finally:
+        db.close()
+
+
+def store_response(record_id: int, status_code: int, headers: List[Tuple[str, str]], body: bytes) -> None:
+    """Keep the first response for replay; responses that should not be replayed release the key instead"""
+    if status_code >= 500 or status_code in UNSTORED_STATUS_CODES or len(body) > settings.IDEMPOTENCY_MAX_BODY_BYTES:
+        release_key(record_id)
+        return
+    db = SessionLocal()
+    try:
+        db.execute(update(IdempotencyKey).where(IdempotencyKey.id == record_id).values(
+            status_code=status_code, headers=[list(header) for header in headers], body=body,
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def release_key(record_id: int) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(delete(IdempotencyKey).where(IdempotencyKey.id == record_id))
+        db.commit()
+    finally:
+        db.close()
+
+
+def purge_idempotency_keys() -> int:
+    db = SessionLocal()
+    try:
+        cutoff = _now(db) - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+        result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < cutoff))
+        db.commit()
+        return result.rowcount
+    finally:
+        db.close()
+
+
+def start_idempotency_purge(interval: float = PURGE_INTERVAL_SECONDS) -> threading.Thread:
+    """Purge expired idempotency keys every `interval` seconds in a daemon thread"""
+
+    def _run():
+        while True:
+            try:
+                purged = purge_idempotency_keys()
+                if purged:
+                    logger.info(f"清除过期幂等键 {purged} 个")
+            except Exception as e:
+                logger.error(f"清除过期幂等键失败: {str(e)}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=_run, name="idempotency-purge", daemon=True)
+    thread.start()
+    return thread
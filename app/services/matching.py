@@ -0,0 +1,162 @@
+"""
+课程名称匹配索引（成绩单导入）
+
+每个培养方案的课程目录在内存中建一份索引：
+- 规范化名称 / 课程代码的哈希表：精确命中；
+- 前缀字典树：条目按规范化名称排序，每个节点记录其子树对应的连续区间，自动补全直接切片；
+- 字符二元组（bigram）倒排表：模糊匹配，用 NumPy bincount 一次统计共享 n-gram 数，按 Dice 系数排序
+  （中文课程名较短，二元组比三元组更适合）。
+
+索引按进程缓存，以目录的 (条目数, 最近修改时间) 作为版本，目录变化后下一次查询时重建。
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.orm import Session
+
+from app.models.catalog import CatalogCourse
+from app.services.catalog import normalize_course_code, normalize_course_name
+
+NGRAM_SIZE = 2
+FUZZY_THRESHOLD = 0.4
+MAX_CACHED_PROGRAMS = 64
+
+
+class CatalogEntry(NamedTuple):
+    id: str
+    name: str
+    normalized_name: str
+    code: Optional[str]
+    credits: float
+    default_category_id: Optional[str]
+
+
+class Match(NamedTuple):
+    entry: CatalogEntry
+    score: float
+    method: str  # "exact", "code", "prefix" or "fuzzy"
+
+
+def ngrams(text: str) -> List[str]:
+    padded = f" {text} "
+    return [padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)]
+
+
+class MatchingIndex:
+    """Exact, prefix and fuzzy lookups over one program's catalog"""
+
+    def __init__(self, entries: Sequence[CatalogEntry]):
+        # Sorted by normalized name, so every trie node covers a contiguous range of entries
+        self.entries = sorted(entries, key=lambda entry: entry.normalized_name)
+        self.by_name: Dict[str, int] = {}
+        self.by_code: Dict[str, int] = {}
+        # Trie node: [children by character, first entry index, end entry index]
+        self.trie: list = [{}, 0, len(self.entries)]
+        postings: Dict[str, List[int]] = {}
+        gram_counts = []
+        for index, entry in enumerate(self.entries):
+            self.by_name[entry.normalized_name] = index
+            if entry.code:
+                self.by_code[entry.code] = index
+            node = self.trie
+            for char in entry.normalized_name:
+                child = node[0].get(char)
+                if child is None:
+                    child = node[0][char] = [{}, index, index + 1]
+                else:
+                    child[2] = index + 1
+                node = child
+            grams = set(ngrams(entry.normalized_name))
+            gram_counts.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(index)
+        self.postings: Dict[str, np.ndarray] = {
+            gram: np.array(indexes, dtype=np.int32) for gram, indexes in postings.items()
+        }
+        self.gram_counts = np.array(gram_counts, dtype=np.float64)
+
+    def exact(self, name: str) -> Optional[Match]:
+        index = self.by_name.get(normalize_course_name(name))
+        if index is not None:
+            return Match(self.entries[index], 1.0, "exact")
+        code = normalize_course_code(name)
+        index = self.by_code.get(code) if code else None
+        if index is not None:
+            return Match(self.entries[index], 1.0, "code")
+        return None
+
+    def prefix(self, text: str, limit: int = 10) -> List[Match]:
+        """Entries whose normalized name starts with `text`, in name order"""
+        node = self.trie
+        for char in normalize_course_name(text):
+            node = node[0].get(char)
+            if node is None:
+                return []
+        first, end = node[1], node[2]
+        return [Match(entry, 1.0, "prefix") for entry in self.entries[first:min(end, first + limit)]]
+
+    def fuzzy(self, name: str, limit: int = 5, threshold: float = FUZZY_THRESHOLD) -> List[Match]:
+        """Best Dice-coefficient matches on character n-grams"""
+        grams = set(ngrams(normalize_course_name(name)))
+        hits = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not hits:
+            return []
+        # Shared n-gram count per entry in one vectorized pass over the posting lists
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.entries))
+        scores = 2 * shared / (len(grams) + self.gram_counts)
+        candidates = np.flatnonzero(scores >= threshold)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        ranked = sorted(candidates.tolist(), key=lambda index: (-scores[index], len(self.entries[index].name)))
+        return [Match(self.entries[index], round(float(scores[index]), 4), "fuzzy") for index in ranked]
+
+    def match(self, name: str, threshold: float = FUZZY_THRESHOLD) -> Optional[Match]:
+        """Exact name or code first, then the best fuzzy hit above the threshold"""
+        found = self.exact(name)
+        if found is not None:
+            return found
+        candidates = self.fuzzy(name, limit=1, threshold=threshold)
+        return candidates[0] if candidates else None
+
+    def autocomplete(self, text: str, limit: int = 10) -> List[Match]:
+        matches = self.prefix(text, limit)
+        if len(matches) < limit:
+            seen = {match.entry.id for match in matches}
+            matches.extend(match for match in self.fuzzy(text, limit=limit) if match.entry.id not in seen)
+        return matches[:limit]
+
+
+CATALOG_VERSION = select(
+    func.count(CatalogCourse.id), func.max(func.coalesce(CatalogCourse.updated_at, CatalogCourse.created_at)),
+).where(CatalogCourse.training_program_id == bindparam("training_program_id"))
+
+CATALOG_ENTRIES = select(
+    CatalogCourse.id, CatalogCourse.name, CatalogCourse.normalized_name, CatalogCourse.code,
+    CatalogCourse.credits, CatalogCourse.default_category_id,
+).where(CatalogCourse.training_program_id == bindparam("training_program_id"))
+
+# training_program_id -> (catalog version, index), least recently used first
+_indexes: "OrderedDict[str, tuple[tuple, MatchingIndex]]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_matching_index(db: Session, training_program_id: str) -> MatchingIndex:
+    """The program's index, rebuilt when the catalog has changed since it was built"""
+    params = {"training_program_id": training_program_id}
+    version = tuple(db.execute(CATALOG_VERSION, params).one())
+    with _indexes_lock:
+        cached = _indexes.get(training_program_id)
+        if cached and cached[0] == version:
+            _indexes.move_to_end(training_program_id)
+            return cached[1]
+
+    index = MatchingIndex([CatalogEntry(*row) for row in db.execute(CATALOG_ENTRIES, params)])
+    with _indexes_lock:
+        _indexes[training_program_id] = (version, index)
+        _indexes.move_to_end(training_program_id)
+        while len(_indexes) > MAX_CACHED_PROGRAMS:
+            _indexes.popitem(last=False)
+    return index
@@ -0,0 +1,313 @@
+"""
+培养方案类别树的批量写入、导入与导出
+
+复制和导入培养方案时，整棵类别树在内存中生成新 ID、重映射 parent_id，
+再按父节点在前的顺序用一条批量 INSERT 写入，不再每个节点一次请求、一次提交。
+导入的定义先在内存中整体校验（重复 key、父节点不存在、环、学分合计），全部通过才写库。
+删除培养方案或类别子树时用递归 CTE 选出子树，按集合执行 DELETE ... WHERE，不把课程和类别逐行载入会话。
+"""
+import uuid
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, delete, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from app.db.projections import load_category_records
+from app.models.audit import AuditJob, AuditResult
+from app.models.catalog import CatalogCourse
+from app.models.course import Course
+from app.models.course_category import CourseCategory
+from app.models.sync import Tombstone
+from app.models.training_program import TrainingProgram
+from app.models.user import User
+from app.schemas.training_program import CategoryDefinition, TrainingProgramDefinition
+from app.services.credit_summary import children_index
+
+
+class CategorySpec(NamedTuple):
+    """A category of an imported definition, with definition-local ids"""
+    id: str
+    name: str
+    required_credits: float
+    parent_id: Optional[str]
+
+
+class TreeValidationError(ValueError):
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def build_category_tree(categories: Sequence, fields: Optional[Sequence[str]] = None) -> List[dict]:
+    """
+    Nested CourseCategoryWithChildren dicts for the root categories, from flat category rows.
+
+    `fields` limits each node to those columns (subcategories are always there); the rows still need
+    id and parent_id to be assembled.
+    """
+    children = children_index(categories)
+
+    def build(category) -> dict:
+        node = category._asdict() if fields is None else {name: getattr(category, name) for name in fields}
+        node["subcategories"] = [build(subcategory) for subcategory in children.get(category.id, [])]
+        return node
+
+    return [build(category) for category in children.get(None, [])]
+
+
+def parents_first(categories: Sequence) -> List:
+    """Categories ordered so that every parent precedes its children (breadth-first)"""
+    children = children_index(categories)
+    ordered = list(children.get(None, []))
+    for category in ordered:
+        ordered.extend(children.get(category.id, []))
+    return ordered
+
+
+def insert_category_tree(db: Session, training_program_id: str, categories: Sequence) -> Dict[str, str]:
+    """
+    Bulk-insert copies of `categories` (id, name, required_credits, parent_id) under a program.
+
+    Returns old id -> new id. Categories whose parent is missing from `categories` are not reachable
+    from a root and are skipped.
+    """
+    id_map: Dict[str, str] = {}
+    rows = []
+    for category in parents_first(categories):
+        id_map[category.id] = str(uuid.uuid4())
+        rows.append({
+            "id": id_map[category.id],
+            "name": category.name,
+            "required_credits": category.required_credits,
+            "parent_id": id_map[category.parent_id] if category.parent_id else None,
+            "training_program_id": training_program_id,
+        })
+    if rows:
+        db.execute(insert(CourseCategory), rows)
+    return id_map
+
+
+def clone_training_program(db: Session, source: TrainingProgram, user_id: str,
+                           name: Optional[str] = None) -> TrainingProgram:
+    """Private copy of a program with its category tree and catalog, written in one transaction"""
+    training_program = TrainingProgram(
+        name=name or source.name,
+        total_credits=source.total_credits,
+        is_public=False,
+        user_id=user_id,
+        grading_scale=source.grading_scale,
+        grading_scale_breakpoints=source.grading_scale_breakpoints,
+    )
+    db.add(training_program)
+    db.flush()
+
+    id_map = insert_category_tree(db, training_program.id, load_category_records(db, source.id))
+
+    catalog_rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "training_program_id": training_program.id,
+            "code": code,
+            "name": catalog_name,
+            "normalized_name": normalized_name,
+            "credits": credits,
+            "default_category_id": id_map.get(default_category_id),
+        }
+        for code, catalog_name, normalized_name, credits, default_category_id in db.execute(
+            select(
+                CatalogCourse.code, CatalogCourse.name, CatalogCourse.normalized_name, CatalogCourse.credits,
+                CatalogCourse.default_category_id,
+            ).where(CatalogCourse.training_program_id == source.id)
+        )
+    ]
+    if catalog_rows:
+        db.execute(insert(CatalogCourse), catalog_rows)
+
+    db.commit()
+    db.refresh(training_program)
+    return training_program
+
+
+def flatten_definition(categories: Sequence[CategoryDefinition]) -> Tuple[List[CategorySpec], List[str]]:
+    """
+    Flatten nested and key/parent-linked definitions into specs, plus the structural errors found.
+
+    Nested nodes get generated ids; nodes that give a `key` use it, so flat nodes elsewhere can
+    name them as `parent`.
+    """
+    specs: List[CategorySpec] = []
+    errors: List[str] = []
+    keys = set()
+    counter = 0
+
+    def visit(node: CategoryDefinition, parent_id: Optional[str], path: str) -> None:
+        nonlocal counter
+        counter += 1
+        node_id = node.key if node.key is not None else f"#{counter}"
+        if node.key is not None:
+            if node.key in keys:
+                errors.append(f"类别 key 重复: {node.key}")
+            keys.add(node.key)
+        if parent_id is not None and node.parent is not None:
+            errors.append(f"嵌套的类别不能再指定 parent: {path}")
+        specs.append(CategorySpec(node_id, node.name, node.required_credits,
+                                  parent_id if parent_id is not None else node.parent))
+        for subcategory in node.subcategories:
+            visit(subcategory, node_id, f"{path}/{subcategory.name}")
+
+    for category in categories:
+        visit(category, None, category.name)
+    return specs, errors
+
+
+def validate_category_tree(total_credits: float, specs: Sequence[CategorySpec],
+                           errors: Sequence[str] = ()) -> List[str]:
+    """
+    Whole-tree checks: orphan parents, cycles and root credits exceeding the program total.
+
+    Returns warnings (subcategories requiring more than their parent); raises TreeValidationError
+    carrying every error found, including the structural `errors` from flatten_definition.
+    """
+    errors = list(errors)
+    by_id = {spec.id: spec for spec in specs}
+    for spec in specs:
+        if spec.parent_id is not None and spec.parent_id not in by_id:
+            errors.append(f"类别 {spec.name} 的父类别不存在: {spec.parent_id}")
+
+    # Anything not reachable from a root sits on (or under) a cycle
+    reachable = {spec.id for spec in parents_first(specs)}
+    for spec in specs:
+        if spec.id not in reachable and spec.parent_id in by_id:
+            errors.append(f"类别 {spec.name} 处于循环引用中")
+
+    root_credits = sum(spec.required_credits for spec in specs if spec.parent_id is None)
+    if root_credits > total_credits:
+        errors.append(f"顶级类别要求学分之和 {root_credits:g} 超过培养方案总学分 {total_credits:g}")
+    if errors:
+        raise TreeValidationError(errors)
+
+    warnings = []
+    child_credits: Dict[str, float] = defaultdict(float)
+    for spec in specs:
+        if spec.parent_id is not None:
+            child_credits[spec.parent_id] += spec.required_credits
+    for parent_id, credits in child_credits.items():
+        parent = by_id[parent_id]
+        if credits > parent.required_credits:
+            warnings.append(f"类别 {parent.name} 的子类别要求学分之和 {credits:g} 超过其要求学分 "
+                            f"{parent.required_credits:g}")
+    return warnings
+
+
+def import_training_program(db: Session, definition: TrainingProgramDefinition,
+                            user_id: str) -> Tuple[TrainingProgram, int, List[str]]:
+    """Validate a definition in memory, then write the program and its tree in one transaction"""
+    specs, errors = flatten_definition(definition.categories)
+    warnings = validate_category_tree(definition.total_credits, specs, errors)
+
+    training_program = TrainingProgram(**definition.model_dump(exclude={"categories"}), user_id=user_id)
+    db.add(training_program)
+    db.flush()
+    id_map = insert_category_tree(db, training_program.id, specs)
+    db.commit()
+    db.refresh(training_program)
+    return training_program, len(id_map), warnings
+
+
+def export_training_program(training_program: TrainingProgram, categories: Sequence) -> dict:
+    """Nested definition of a program in the import format"""
+    children = children_index(categories)
+
+    def build(category) -> dict:
+        node = {"name": category.name, "required_credits": category.required_credits}
+        subcategories = children.get(category.id, [])
+        if subcategories:
+            node["subcategories"] = [build(subcategory) for subcategory in subcategories]
+        return node
+
+    definition = {
+        "name": training_program.name,
+        "total_credits": training_program.total_credits,
+        "grading_scale": training_program.grading_scale,
+    }
+    if training_program.grading_scale_breakpoints:
+        definition["grading_scale_breakpoints"] = [list(band) for band in training_program.grading_scale_breakpoints]
+    definition["categories"] = [build(category) for category in children.get(None, [])]
+    return definition
+
+
+def category_subtree(category_id: str) -> Select:
+    """SELECT of the ids of a category and all its descendants (recursive CTE)"""
+    subtree = select(CourseCategory.id).where(CourseCategory.id == category_id).cte("subtree", recursive=True, nesting=True)
+    subtree = subtree.union_all(
+        select(CourseCategory.id).join(subtree, CourseCategory.parent_id == subtree.c.id)
+    )
+    return select(subtree.c.id)
+
+
+def program_categories(training_program_id: str) -> Select:
+    return select(CourseCategory.id).where(CourseCategory.training_program_id == training_program_id)
+
+
+def count_foreign_courses(db: Session, category_ids: Select, owner_id: str) -> int:
+    """Courses filed under `category_ids` that belong to someone other than the program owner"""
+    return db.execute(
+        select(func.count(Course.id)).where(Course.category_id.in_(category_ids), Course.user_id != owner_id)
+    ).scalar_one()
+
+
+def _delete_categories(db: Session, category_ids: Select, training_program: TrainingProgram) -> Dict[str, int]:
+    # Tombstones first (set-based deletes skip the mapper events that write them for ORM deletes),
+    # then courses, references to the categories and the categories themselves; one DELETE removes
+    # the whole set, so parent/child order within it does not matter
+    no_sync = {"synchronize_session": False}
+    tombstone_columns = ["entity_type", "entity_id", "user_id", "is_public"]
+    db.execute(insert(Tombstone).from_select(tombstone_columns, select(
+        literal("course"), Course.id, Course.user_id, literal(False),
+    ).where(Course.category_id.in_(category_ids))))
+    db.execute(insert(Tombstone).from_select(tombstone_columns, select(
+        literal("category"), CourseCategory.id, literal(training_program.user_id),
+        literal(bool(training_program.is_public)),
+    ).where(CourseCategory.id.in_(category_ids))))
+
+    courses = db.execute(delete(Course).where(Course.category_id.in_(category_ids)), execution_options=no_sync)
+    db.execute(
+        update(CatalogCourse).where(CatalogCourse.default_category_id.in_(category_ids)).values(default_category_id=None),
+        execution_options=no_sync,
+    )
+    categories = db.execute(delete(CourseCategory).where(CourseCategory.id.in_(category_ids)),
+                            execution_options=no_sync)
+    return {"deleted_categories": categories.rowcount, "deleted_courses": courses.rowcount}
+
+
+def delete_category_subtree(db: Session, category: CourseCategory) -> Dict[str, int]:
+    """Delete a category, its descendants and every course filed under them in one transaction"""
+    counts = _delete_categories(db, category_subtree(category.id), category.training_program)
+    db.commit()
+    return counts
+
+
+def delete_training_program_tree(db: Session, training_program: TrainingProgram) -> Dict[str, int]:
+    """Delete a program with its categories, courses, catalog and audits in one transaction"""
+    no_sync = {"synchronize_session": False}
+    counts = _delete_categories(db, program_categories(training_program.id), training_program)
+    catalog = select(CatalogCourse.id).where(CatalogCourse.training_program_id == training_program.id)
+    # Only a course mis-filed under another program can still point at this catalog; it keeps its override
+    db.execute(update(Course).where(Course.catalog_course_id.in_(catalog)).values(catalog_course_id=None),
+               execution_options=no_sync)
+    db.execute(delete(CatalogCourse).where(CatalogCourse.training_program_id == training_program.id),
+               execution_options=no_sync)
+    jobs = select(AuditJob.id).where(AuditJob.training_program_id == training_program.id)
+    db.execute(delete(AuditResult).where(AuditResult.job_id.in_(jobs)), execution_options=no_sync)
+    db.execute(delete(AuditJob).where(AuditJob.training_program_id == training_program.id),
+               execution_options=no_sync)
+    db.execute(update(User).where(User.default_training_program_id == training_program.id)
+               .values(default_training_program_id=None), execution_options=no_sync)
+    db.execute(insert(Tombstone).values(
+        entity_type="training_program", entity_id=training_program.id, user_id=training_program.user_id,
+        is_public=bool(training_program.is_public),
+    ))
+    db.execute(delete(TrainingProgram).where(TrainingProgram.id == training_program.id), execution_options=no_sync)
+    db.commit()
+    return counts
@@ -0,0 +1,109 @@
+"""
+"如果……会怎样"学分模拟
+
+把假设的新增、删除、修改课程叠加到用户真实课程的投影记录上，在内存中重新计算学分汇总，
+不写数据库。新增或修改后的百分制课程按被模拟培养方案的成绩标尺换算绩点。
+"""
+from typing import Dict, List, Sequence
+
+from app.core.grading import CompiledScale
+from app.db.projections import CategoryRecord, CourseRecord
+from app.models.course import GradingSystem
+from app.schemas.course import CourseCreate
+from app.schemas.dashboard import SimulatedCourseUpdate
+from app.services.credit_summary import calculate_credit_summary
+
+
+def _check_grading(course: CourseRecord) -> None:
+    # Same rules as creating or updating a real course
+    if course.grading_system == GradingSystem.PERCENTAGE:
+        if course.grade is None:
+            raise ValueError("Grade is required for percentage grading system")
+    elif course.passed is None:
+        raise ValueError("Passed status is required for pass/fail grading system")
+
+
+def _with_gpa(course: CourseRecord, scale: CompiledScale) -> CourseRecord:
+    gpa = scale.convert(course.grade) if course.grading_system == GradingSystem.PERCENTAGE else None
+    return course._replace(gpa=gpa)
+
+
+def overlay_courses(
+    courses: Sequence[CourseRecord],
+    category_ids: Sequence[str],
+    scale: CompiledScale,
+    added: Sequence[CourseCreate] = (),
+    removed: Sequence[str] = (),
+    modified: Sequence[SimulatedCourseUpdate] = (),
+) -> List[CourseRecord]:
+    """
+    The user's course records with the hypothetical changes applied.
+
+    Raises ValueError for unknown course ids, categories outside the simulated program and
+    grading fields that a real create/update would reject.
+    """
+    overlaid: Dict[str, CourseRecord] = {course.id: course for course in courses}
+    category_ids = set(category_ids)
+
+    for course_id in removed:
+        if overlaid.pop(course_id, None) is None:
+            raise ValueError(f"Course {course_id} not found")
+
+    for change in modified:
+        course = overlaid.get(change.id)
+        if course is None:
+            raise ValueError(f"Course {change.id} not found")
+        update_data = change.model_dump(exclude_unset=True, exclude={"id", "name", "catalog_course_id"})
+        if update_data.get("category_id", course.category_id) != course.category_id \
+                and update_data["category_id"] not in category_ids:
+            raise ValueError(f"Category {update_data['category_id']} is not in this training program")
+        # Switching grading system clears the other system's field, as a real update does
+        if update_data.get("grading_system") == GradingSystem.PERCENTAGE:
+            update_data.setdefault("passed", None)
+        elif update_data.get("grading_system") == GradingSystem.PASS_FAIL:
+            update_data.setdefault("grade", None)
+        course = course._replace(**update_data)
+        _check_grading(course)
+        overlaid[course.id] = _with_gpa(course, scale)
+
+    for index, course_in in enumerate(added):
+        if course_in.category_id not in category_ids:
+            raise ValueError(f"Category {course_in.category_id} is not in this training program")
+        if course_in.credits is None:
+            raise ValueError("Credits are required for simulated courses")
+        course = CourseRecord(
+            id=f"simulated-{index}",
+            category_id=course_in.category_id,
+            credits=course_in.credits,
+            grading_system=course_in.grading_system,
+            grade=course_in.grade if course_in.grading_system == GradingSystem.PERCENTAGE else None,
+            passed=course_in.passed if course_in.grading_system == GradingSystem.PASS_FAIL else None,
+            gpa=None,
+        )
+        _check_grading(course)
+        overlaid[course.id] = _with_gpa(course, scale)
+
+    return list(overlaid.values())
+
+
+def simulate_credit_summary(
+    total_credits: float,
+    categories: Sequence[CategoryRecord],
+    courses: Sequence[CourseRecord],
+    scale: CompiledScale,
+    added: Sequence[CourseCreate] = (),
+    removed: Sequence[str] = (),
+    modified: Sequence[SimulatedCourseUpdate] = (),
+) -> dict:
+    """Simulated credit summary plus the change in GPA and earned credits against the real one"""
+    baseline = calculate_credit_summary(total_credits, categories, courses)
+    simulated_courses = overlay_courses(
+        courses, [category.id for category in categories], scale, added=added, removed=removed, modified=modified,
+    )
+    summary = calculate_credit_summary(total_credits, categories, simulated_courses)
+    return {
+        "summary": summary,
+        "baseline_gpa": baseline["overall_gpa"],
+        "gpa_delta": round(summary["overall_gpa"] - baseline["overall_gpa"], 3),
+        "earned_credits_delta": summary["total_earned_credits"] - baseline["total_earned_credits"],
+    }
@@ -0,0 +1,160 @@
+"""
+增量同步
+
+同步令牌记录上一次同步时的数据库时间。客户端带令牌请求时，只返回此后创建或修改的培养方案、
+类别和课程（按 created_at / updated_at，均有索引），以及墓碑表中此后删除的记录 ID，
+负载和耗时随变化量增长，而不是随数据总量增长。
+
+比较前令牌时间先回退 SYNC_TOKEN_OVERLAP_SECONDS：时间戳在语句执行时取得、提交在后，
+重叠窗口避免漏掉令牌签发时还没提交的写入；重叠部分会重复下发，客户端按 ID 覆盖即可。
+令牌早于墓碑保留期时无法知道期间删除了什么，返回全量数据和 full_sync=True。
+取消公开的培养方案对其他用户等同于删除：写入培养方案及其类别的公开墓碑，仍然可见的记录（如所有者自己的）不下发墓碑。
+"""
+import base64
+import binascii
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, delete, func, insert, literal, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.course import Course
+from app.models.course_category import CourseCategory
+from app.models.sync import Tombstone
+from app.models.training_program import TrainingProgram
+from app.models.user import User
+
+TOKEN_VERSION = "1"
+
+# Expired tombstones are purged at most this often per process
+PURGE_INTERVAL_SECONDS = 3600
+
+_last_purge = 0.0
+_purge_lock = threading.Lock()
+
+DELETED_KEYS = {"training_program": "training_programs", "category": "categories", "course": "courses"}
+
+
+class InvalidSyncToken(ValueError):
+    pass
+
+
+def encode_token(synced_at: datetime) -> str:
+    return base64.urlsafe_b64encode(f"{TOKEN_VERSION}:{synced_at.isoformat()}".encode()).decode().rstrip("=")
+
+
+def decode_token(token: str) -> datetime:
+    try:
+        version, synced_at = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode().split(":", 1)
+        synced_at = datetime.fromisoformat(synced_at)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidSyncToken("Invalid sync token")
+    if version != TOKEN_VERSION:
+        raise InvalidSyncToken("Unsupported sync token version")
+    return synced_at
+
+
+def _changed_since(model, since: datetime):
+    # Rows never updated have no updated_at; both columns are indexed
+    return or_(model.created_at >= since, model.updated_at >= since)
+
+
+def purge_tombstones(db: Session, now: datetime) -> int:
+    cutoff = now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    result = db.execute(delete(Tombstone).where(Tombstone.deleted_at < cutoff))
+    db.commit()
+    return result.rowcount
+
+
+def _maybe_purge(db: Session, now: datetime) -> None:
+    global _last_purge
+    with _purge_lock:
+        if time.monotonic() - _last_purge < PURGE_INTERVAL_SECONDS:
+            return
+        _last_purge = time.monotonic()
+    purge_tombstones(db, now)
+
+
+def record_unpublish(db: Session, training_program: TrainingProgram) -> None:
+    """Public tombstones for a program that stops being public and its categories; the caller commits"""
+    db.execute(insert(Tombstone).values(
+        entity_type="training_program", entity_id=training_program.id, user_id=training_program.user_id,
+        is_public=True,
+    ))
+    db.execute(insert(Tombstone).from_select(["entity_type", "entity_id", "user_id", "is_public"], select(
+        literal("category"), CourseCategory.id, literal(training_program.user_id), literal(True),
+    ).where(CourseCategory.training_program_id == training_program.id)))
+
+
+def sync_changes(db: Session, user: User, token: Optional[str] = None) -> dict:
+    """
+    Everything visible to the user that changed since `token` (all of it without a token).
+
+    Visible means the user's own courses, and the user's own and public training programs with
+    their categories. Raises InvalidSyncToken for a malformed token.
+    """
+    now = db.execute(select(func.now())).scalar_one()
+    # Before loading anything: the purge commits, which would expire the loaded rows
+    _maybe_purge(db, now)
+    since = None
+    if token:
+        since = decode_token(token) - timedelta(seconds=settings.SYNC_TOKEN_OVERLAP_SECONDS)
+        if since < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+            since = None
+
+    visible = or_(TrainingProgram.user_id == user.id, TrainingProgram.is_public.is_(True))
+
+    programs_query = select(TrainingProgram).where(visible)
+    if since is not None:
+        programs_query = programs_query.where(_changed_since(TrainingProgram, since))
+    training_programs = db.execute(programs_query).scalars().all()
+
+    categories_query = select(CourseCategory).join(
+        TrainingProgram, CourseCategory.training_program_id == TrainingProgram.id,
+    ).where(visible)
+    if since is not None:
+        # A program that changed (e.g. was just published) brings its whole tree along
+        categories_query = categories_query.where(or_(
+            _changed_since(CourseCategory, since),
+            CourseCategory.training_program_id.in_([program.id for program in training_programs]),
+        ))
+    categories = db.execute(categories_query).scalars().all()
+
+    courses_query = select(Course).where(Course.user_id == user.id)
+    if since is not None:
+        courses_query = courses_query.where(_changed_since(Course, since))
+    courses = db.execute(courses_query).scalars().all()
+
+    deleted: Dict[str, List[str]] = {key: [] for key in DELETED_KEYS.values()}
+    if since is not None:
+        # Unpublished programs and their categories still exist: skip them where the user can still see them
+        visible_programs = select(TrainingProgram.id).where(visible)
+        visible_categories = select(CourseCategory.id).join(
+            TrainingProgram, CourseCategory.training_program_id == TrainingProgram.id,
+        ).where(visible)
+        rows = db.execute(
+            select(Tombstone.entity_type, Tombstone.entity_id).where(
+                Tombstone.deleted_at >= since,
+                or_(
+                    Tombstone.user_id == user.id,
+                    and_(Tombstone.is_public.is_(True), Tombstone.entity_type != "course"),
+                ),
+                or_(
+                    Tombstone.entity_type == "course",
+                    and_(Tombstone.entity_type == "training_program", Tombstone.entity_id.notin_(visible_programs)),
+                    and_(Tombstone.entity_type == "category", Tombstone.entity_id.notin_(visible_categories)),
+                ),
+            )
+        )
+        for entity_type, entity_id in rows:
+            deleted[DELETED_KEYS[entity_type]].append(entity_id)
+
+    return {
+        "sync_token": encode_token(now),
+        "full_sync": since is None,
+        "changed": {"training_programs": training_programs, "categories": categories, "courses": courses},
+        "deleted": deleted,
+    }
@@ -0,0 +1,58 @@
+"""
+课程-类别分配求解器：随机生成实例上的耗时与最优性（相对最大流上界）
+
+python -m benchmarks.bench_assignment
+"""
+import random
+import statistics
+import time
+
+from app.services.assignment import MAX_FLOW_EDGES, solve_assignment
+from benchmarks.common import report
+
+BUDGET_MS = 50.0
+INSTANCES = 20
+
+# (courses, categories, max candidate categories per course)
+SIZES = [(20, 10, 3), (100, 50, 3), (100, 50, 10), (100, 50, 50), (300, 80, 10), (1000, 100, 30)]
+
+
+def generate(rng: random.Random, courses: int, categories: int, max_candidates: int):
+    category_ids = [f"cat-{i}" for i in range(categories)]
+    required = {category_id: float(rng.choice([2, 4, 6, 8, 10])) for category_id in category_ids}
+    credits, eligible, current = {}, {}, {}
+    for i in range(courses):
+        course_id = f"course-{i}"
+        credits[course_id] = float(rng.choice([1, 2, 3, 4]))
+        eligible[course_id] = rng.sample(category_ids, rng.randint(1, max_candidates))
+        current[course_id] = eligible[course_id][0]
+    return credits, eligible, required, current
+
+
+def main():
+    rng = random.Random(0)
+    rows = {}
+    for courses, categories, max_candidates in SIZES:
+        timings, ratios = [], []
+        method = None
+        for _ in range(INSTANCES):
+            credits, eligible, required, current = generate(rng, courses, categories, max_candidates)
+            started = time.perf_counter()
+            result = solve_assignment(credits, eligible, required, current=current)
+            timings.append((time.perf_counter() - started) * 1000)
+            method = result["method"]
+            if result["upper_bound"]:
+                ratios.append(result["satisfied_credits"] / result["upper_bound"])
+        rows[f"{courses} courses x {categories} categories (<= {max_candidates} each)"] = {
+            "median_ms": statistics.median(timings),
+            "max_ms": max(timings),
+            "worst_vs_bound": min(ratios),
+            "method": method,
+        }
+        if (courses, categories) == (100, 50) and max(timings) > BUDGET_MS:
+            print(f"WARNING: 100 x 50 exceeded the {BUDGET_MS} ms budget")
+    report(f"assignment solver, {INSTANCES} instances per size (max-flow up to {MAX_FLOW_EDGES} edges)", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+删除培养方案 / 类别子树：ORM 级联（逐行载入再逐行删除）与按集合 DELETE 的对比（100,000 门课程）
+
+python -m benchmarks.bench_cascade_delete
+"""
+import random
+import time
+import uuid
+
+from benchmarks.common import bootstrap, report
+
+bootstrap("bench_cascade_delete.db")
+
+from sqlalchemy import event, insert  # noqa: E402
+
+from app.db import statements  # noqa: E402
+from app.db.base import SessionLocal, engine  # noqa: E402
+from app.models import Course, CourseCategory, TrainingProgram, User  # noqa: E402
+from app.models.course import GradingSystem  # noqa: E402
+from app.services.program_tree import delete_category_subtree, delete_training_program_tree  # noqa: E402
+
+CATEGORIES = 200
+COURSES = 100000
+STUDENTS = 2000
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def seed(owner_id, student_ids):
+    """A program with a random category tree and COURSES courses spread over it"""
+    rng = random.Random(0)
+    db = SessionLocal()
+    program = TrainingProgram(name="Public", total_credits=160, user_id=owner_id, is_public=True)
+    db.add(program)
+    db.flush()
+    category_ids = []
+    rows = []
+    for i in range(CATEGORIES):
+        category_ids.append(str(uuid.uuid4()))
+        parent_id = category_ids[rng.randrange(i)] if i % 10 else None
+        rows.append({"id": category_ids[-1], "name": f"Category {i}", "required_credits": 4,
+                     "training_program_id": program.id, "parent_id": parent_id})
+    db.execute(insert(CourseCategory), rows)
+    db.execute(insert(Course), [
+        {"id": str(uuid.uuid4()), "name": f"Course {i}", "credits": 2, "grading_system": GradingSystem.PERCENTAGE,
+         "grade": 80, "gpa": 3.4, "user_id": rng.choice(student_ids), "category_id": rng.choice(category_ids)}
+        for i in range(COURSES)
+    ])
+    db.commit()
+    ids = program.id, category_ids[0]
+    db.close()
+    return ids
+
+
+def orm_cascade(db, program_id):
+    """What delete_training_program did before: the relationship cascade loads every row"""
+    db.delete(statements.get_training_program(db, program_id))
+    db.commit()
+
+
+def set_based(db, program_id):
+    delete_training_program_tree(db, statements.get_training_program(db, program_id))
+
+
+def set_based_subtree(db, category_id):
+    return delete_category_subtree(db, statements.get_category(db, category_id))
+
+
+def count_courses():
+    db = SessionLocal()
+    count = db.query(Course).count()
+    db.close()
+    return count
+
+
+def timed(func, target_id):
+    counter = StatementCounter()
+    db = SessionLocal()
+    event.listen(engine, "before_cursor_execute", counter)
+    started = time.perf_counter()
+    func(db, target_id)
+    elapsed = (time.perf_counter() - started) * 1000
+    event.remove(engine, "before_cursor_execute", counter)
+    db.close()
+    return {"ms": elapsed, "statements": counter.count}
+
+
+def main():
+    db = SessionLocal()
+    owner = User(email="owner@example.com", hashed_password="x")
+    students = [User(email=f"student{i}@example.com", hashed_password="x") for i in range(STUDENTS)]
+    db.add_all([owner, *students])
+    db.commit()
+    owner_id, student_ids = owner.id, [student.id for student in students]
+    db.close()
+
+    rows = {}
+    for name, func in [("program: ORM cascade (before)", orm_cascade), ("program: set-based", set_based)]:
+        program_id, _ = seed(owner_id, student_ids)
+        before = count_courses()
+        rows[name] = {**timed(func, program_id), "courses_deleted": before - count_courses()}
+    # The ORM path refuses categories with subcategories, so there is no "before" for a subtree
+    _, root_id = seed(owner_id, student_ids)
+    before = count_courses()
+    rows["root category subtree: set-based"] = {**timed(set_based_subtree, root_id),
+                                                "courses_deleted": before - count_courses()}
+    report(f"delete a program with {COURSES:,} courses over {CATEGORIES} categories", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+复制培养方案：批量写入整棵类别树与逐节点创建（每个节点一次提交）的对比（300 个类别）
+
+python -m benchmarks.bench_clone_program
+"""
+import random
+import time
+
+from benchmarks.common import bootstrap, report
+
+bootstrap("bench_clone_program.db")
+
+from sqlalchemy import event  # noqa: E402
+
+from app.db import statements  # noqa: E402
+from app.db.base import SessionLocal, engine  # noqa: E402
+from app.db.projections import load_category_records  # noqa: E402
+from app.models import CourseCategory, TrainingProgram, User  # noqa: E402
+from app.services.program_tree import clone_training_program, parents_first  # noqa: E402
+
+CATEGORIES = 300
+ROUNDS = 5
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def seed():
+    rng = random.Random(0)
+    db = SessionLocal()
+    user = User(email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    program = TrainingProgram(name="Public", total_credits=160, user_id=user.id, is_public=True)
+    db.add(program)
+    db.flush()
+    categories = []
+    for i in range(CATEGORIES):
+        parent = categories[rng.randrange(len(categories))] if categories and i % 4 else None
+        category = CourseCategory(name=f"Category {i}", required_credits=rng.choice([2, 4, 8, 12]),
+                                  training_program_id=program.id, parent_id=parent.id if parent else None)
+        db.add(category)
+        db.flush()
+        categories.append(category)
+    db.commit()
+    ids = user.id, program.id
+    db.close()
+    return ids
+
+
+def clone_node_by_node(db, source, user_id):
+    """What a client did before: create the program, then one category per request and commit"""
+    program = TrainingProgram(name=source.name, total_credits=source.total_credits, user_id=user_id)
+    db.add(program)
+    db.commit()
+    id_map = {}
+    for category in parents_first(load_category_records(db, source.id)):
+        copy = CourseCategory(name=category.name, required_credits=category.required_credits,
+                              training_program_id=program.id,
+                              parent_id=id_map[category.parent_id] if category.parent_id else None)
+        db.add(copy)
+        db.commit()
+        id_map[category.id] = copy.id
+    return program
+
+
+def run(clone, user_id, program_id):
+    counter = StatementCounter()
+    timings = []
+    for _ in range(ROUNDS):
+        db = SessionLocal()
+        source = statements.get_training_program(db, program_id)
+        event.listen(engine, "before_cursor_execute", counter)
+        started = time.perf_counter()
+        copy = clone(db, source, user_id)
+        timings.append((time.perf_counter() - started) * 1000)
+        event.remove(engine, "before_cursor_execute", counter)
+        copied = db.query(CourseCategory).filter(CourseCategory.training_program_id == copy.id).count()
+        assert copied == CATEGORIES, copied
+        db.close()
+    return {"median_ms": sorted(timings)[len(timings) // 2], "statements": counter.count // ROUNDS}
+
+
+def main():
+    user_id, program_id = seed()
+    report(f"clone a {CATEGORIES}-category training program", {
+        "node by node (old client flow)": run(clone_node_by_node, user_id, program_id),
+        "bulk clone": run(clone_training_program, user_id, program_id),
+    })
+
+
+if __name__ == "__main__":
+    main()
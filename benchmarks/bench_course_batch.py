@@ -0,0 +1,144 @@
+"""
+批量编辑课程：一个学期 25 处修改逐个调用 PUT/DELETE /courses/{id} 与一次 POST /courses/batch 的对比
+
+批量请求的语句数不随操作数增长：以 SQL_N_PLUS_ONE_MODE=raise 运行，并断言两倍操作数的批量请求语句数相同
+
+python -m benchmarks.bench_course_batch
+"""
+import os
+import time
+import uuid
+
+from benchmarks.common import bootstrap, report
+
+# A statement repeated per operation fails the batch request instead of being hidden
+os.environ["SQL_N_PLUS_ONE_MODE"] = "raise"
+bootstrap("bench_course_batch.db")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.db.base import SessionLocal, engine  # noqa: E402
+from app.models import CourseCategory, TrainingProgram, User  # noqa: E402
+from main import app  # noqa: E402
+
+EDITS = 20
+ROUNDS = 5
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def seed():
+    db = SessionLocal()
+    user = User(email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    program = TrainingProgram(name="Program", total_credits=160, user_id=user.id)
+    db.add(program)
+    db.flush()
+    categories = [CourseCategory(name=f"Category {i}", required_credits=20, training_program_id=program.id)
+                  for i in range(2)]
+    db.add_all(categories)
+    db.commit()
+    ids = user.id, [category.id for category in categories]
+    db.close()
+    return ids
+
+
+def semester(client, headers, category_ids, edits=EDITS):
+    """Operations for one round: per 20 courses 6 grade edits, 6 renames, 4 moves, 4 deletes and 5 new courses"""
+    courses = [
+        client.post("/api/v1/courses/", headers=headers, json={
+            "name": f"Course {uuid.uuid4()}", "credits": 2, "grading_system": "percentage", "grade": 70,
+            "category_id": category_ids[0],
+        }).json()
+        for _ in range(edits)
+    ]
+    operations = []
+    for i, course in enumerate(courses):
+        if i % 20 < 6:
+            operations.append({"op": "update", "id": course["id"], "changes": {"grade": 80 + i % 20}})
+        elif i % 20 < 12:
+            operations.append({"op": "update", "id": course["id"], "changes": {"name": f"Renamed {uuid.uuid4()}"}})
+        elif i % 20 < 16:
+            operations.append({"op": "move", "id": course["id"], "category_id": category_ids[1]})
+        else:
+            operations.append({"op": "delete", "id": course["id"]})
+    for _ in range(edits // 4):
+        operations.append({"op": "create", "course": {
+            "name": f"New {uuid.uuid4()}", "credits": 2, "grading_system": "percentage", "grade": 75,
+            "category_id": category_ids[1],
+        }})
+    return operations
+
+
+def one_by_one(client, headers, operations):
+    requests = 0
+    for operation in operations:
+        if operation["op"] == "update":
+            response = client.put(f"/api/v1/courses/{operation['id']}", headers=headers, json=operation["changes"])
+        elif operation["op"] == "create":
+            response = client.post("/api/v1/courses/", headers=headers, json=operation["course"])
+        elif operation["op"] == "move":
+            response = client.put(f"/api/v1/courses/{operation['id']}", headers=headers,
+                                  json={"category_id": operation["category_id"]})
+        else:
+            response = client.delete(f"/api/v1/courses/{operation['id']}", headers=headers)
+        assert response.status_code == 200, response.text
+        requests += 1
+    return requests
+
+
+def batched(client, headers, operations):
+    response = client.post("/api/v1/courses/batch", headers=headers, json={"operations": operations})
+    assert response.status_code == 200, response.text
+    return 1
+
+
+def run(apply, client, headers, category_ids):
+    counter = StatementCounter()
+    timings = []
+    requests = 0
+    for _ in range(ROUNDS):
+        operations = semester(client, headers, category_ids)
+        event.listen(engine, "before_cursor_execute", counter)
+        started = time.perf_counter()
+        requests = apply(client, headers, operations)
+        timings.append((time.perf_counter() - started) * 1000)
+        event.remove(engine, "before_cursor_execute", counter)
+    return {"requests": requests, "median_ms": sorted(timings)[len(timings) // 2],
+            "statements": counter.count // ROUNDS}
+
+
+def batch_statements(client, headers, category_ids, edits):
+    counter = StatementCounter()
+    operations = semester(client, headers, category_ids, edits)
+    event.listen(engine, "before_cursor_execute", counter)
+    batched(client, headers, operations)
+    event.remove(engine, "before_cursor_execute", counter)
+    return counter.count
+
+
+def main():
+    user_id, category_ids = seed()
+    headers = {"X-API-Key": settings.API_KEY, "Authorization": f"Bearer {create_access_token(user_id)}"}
+    client = TestClient(app)
+    report(f"a {EDITS + EDITS // 4}-edit semester", {
+        "PUT/DELETE per course": run(one_by_one, client, headers, category_ids),
+        "POST /courses/batch": run(batched, client, headers, category_ids),
+    })
+    scaling = {f"{edits + edits // 4} edits": batch_statements(client, headers, category_ids, edits) for edits in (EDITS, 4 * EDITS)}
+    report("POST /courses/batch statements", {name: {"statements": count} for name, count in scaling.items()})
+    assert len(set(scaling.values())) == 1, f"batch statements grow with the batch: {scaling}"
+
+
+if __name__ == "__main__":
+    main()
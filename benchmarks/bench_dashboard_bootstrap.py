@@ -0,0 +1,88 @@
+"""
+仪表盘首屏：五个接口各请求一次与一次 GET /dashboard/bootstrap 的对比（60 门课程、40 个类别）
+
+python -m benchmarks.bench_dashboard_bootstrap
+"""
+import random
+
+from benchmarks.common import bootstrap, measure, report
+
+bootstrap("bench_dashboard_bootstrap.db")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.db.base import SessionLocal, engine  # noqa: E402
+from app.models import Course, CourseCategory, TrainingProgram, User  # noqa: E402
+from app.models.course import GradingSystem  # noqa: E402
+from main import app  # noqa: E402
+
+CATEGORIES = 40
+COURSES = 60
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def seed():
+    rng = random.Random(0)
+    db = SessionLocal()
+    user = User(email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    program = TrainingProgram(name="Program", total_credits=160, user_id=user.id)
+    db.add(program)
+    db.flush()
+    categories = []
+    for i in range(CATEGORIES):
+        parent = rng.choice(categories) if categories and i % 5 else None
+        category = CourseCategory(name=f"Category {i}", required_credits=4, training_program_id=program.id,
+                                  parent_id=parent.id if parent else None)
+        db.add(category)
+        db.flush()
+        categories.append(category)
+    db.add_all([
+        Course(name=f"Course {i}", credits=2, grading_system=GradingSystem.PERCENTAGE, grade=rng.randint(60, 100),
+               user_id=user.id, category_id=rng.choice(categories).id)
+        for i in range(COURSES)
+    ])
+    user.default_training_program_id = program.id
+    db.commit()
+    ids = user.id, program.id
+    db.close()
+    return ids
+
+
+def main():
+    user_id, program_id = seed()
+    headers = {"X-API-Key": settings.API_KEY, "Authorization": f"Bearer {create_access_token(user_id)}"}
+    client = TestClient(app)
+    paths = ["/api/v1/users/me", "/api/v1/training-programs/", f"/api/v1/course-categories/training-program/{program_id}",
+             "/api/v1/courses/", f"/api/v1/dashboard/credit-summary/{program_id}"]
+
+    def five_requests():
+        for path in paths:
+            assert client.get(path, headers=headers).status_code == 200
+
+    def one_request():
+        assert client.get("/api/v1/dashboard/bootstrap", headers=headers).status_code == 200
+
+    rows = {}
+    for name, func, requests in [("five endpoints", five_requests, len(paths)), ("bootstrap", one_request, 1)]:
+        counter = StatementCounter()
+        event.listen(engine, "before_cursor_execute", counter)
+        func()
+        event.remove(engine, "before_cursor_execute", counter)
+        rows[name] = {"requests": requests, "statements": counter.count, **measure(func, repeat=20)}
+    report("dashboard page load", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+增量同步：全量下载与按令牌增量同步（10 处修改）的对比，用户有 5,000 门课程、库中共 200,000 门课程
+
+python -m benchmarks.bench_delta_sync
+"""
+import json
+import random
+import time
+import uuid
+
+from benchmarks.common import bootstrap, measure, report
+
+bootstrap("bench_delta_sync.db")
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.db.base import SessionLocal  # noqa: E402
+from app.models import Course, CourseCategory, TrainingProgram, User  # noqa: E402
+from app.models.course import GradingSystem  # noqa: E402
+from app.schemas.sync import SyncResponse  # noqa: E402
+from app.services.sync import sync_changes  # noqa: E402
+
+USERS = 40
+COURSES_PER_USER = 5000
+CHANGES = 10
+
+
+def seed():
+    rng = random.Random(0)
+    db = SessionLocal()
+    users = [User(email=f"student{i}@example.com", hashed_password="x") for i in range(USERS)]
+    db.add_all(users)
+    db.flush()
+    program = TrainingProgram(name="Public", total_credits=160, user_id=users[0].id, is_public=True)
+    db.add(program)
+    db.flush()
+    category_ids = [str(uuid.uuid4()) for _ in range(50)]
+    db.execute(insert(CourseCategory), [
+        {"id": category_id, "name": f"Category {i}", "required_credits": 4, "training_program_id": program.id}
+        for i, category_id in enumerate(category_ids)
+    ])
+    for user in users:
+        db.execute(insert(Course), [
+            {"id": str(uuid.uuid4()), "name": f"Course {i}", "credits": 2, "grading_system": GradingSystem.PERCENTAGE,
+             "grade": 80, "gpa": 3.4, "user_id": user.id, "category_id": rng.choice(category_ids)}
+            for i in range(COURSES_PER_USER)
+        ])
+    db.commit()
+    user_id = users[1].id
+    db.close()
+    return user_id
+
+
+def synced(user_id, token=None):
+    """Sync response as the client receives it: (payload bytes, response)"""
+    db = SessionLocal()
+    user = db.get(User, user_id)
+    response = SyncResponse.model_validate(sync_changes(db, user, token), from_attributes=True)
+    db.close()
+    return len(json.dumps(response.model_dump(mode="json"))), response
+
+
+def main():
+    settings.SYNC_TOKEN_OVERLAP_SECONDS = 0
+    user_id = seed()
+    _, first = synced(user_id)
+    time.sleep(1.1)  # timestamps have second resolution on SQLite
+
+    db = SessionLocal()
+    courses = db.query(Course).filter(Course.user_id == user_id).limit(CHANGES).all()
+    for course in courses[:CHANGES - 2]:
+        course.grade = 90
+    for course in courses[CHANGES - 2:]:
+        db.delete(course)
+    db.commit()
+    db.close()
+
+    full_size, full = synced(user_id)
+    delta_size, delta = synced(user_id, first.sync_token)
+    assert len(delta.changed.courses) == CHANGES - 2 and len(delta.deleted.courses) == 2
+    report(f"sync for a user with {COURSES_PER_USER:,} courses ({USERS * COURSES_PER_USER:,} in total), "
+           f"{CHANGES} changes since the token", {
+               "full sync": {**measure(lambda: synced(user_id), repeat=5), "payload_bytes": full_size,
+                             "courses": len(full.changed.courses)},
+               "delta sync": {**measure(lambda: synced(user_id, first.sync_token), repeat=5),
+                              "payload_bytes": delta_size, "courses": len(delta.changed.courses)},
+           })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+成绩换算：原 Course.gpa 属性式逐行计算与编译后的查找表对比（100 万条成绩）
+
+python -m benchmarks.bench_grading_scales
+"""
+import random
+import time
+
+from benchmarks.common import report
+
+from app.core.grading import calculate_gpa, get_scale
+
+GRADES = 1_000_000
+
+
+def timed(func) -> dict:
+    started = time.perf_counter()
+    func()
+    elapsed = (time.perf_counter() - started) * 1000
+    return {"total_ms": elapsed, "ns_per_grade": elapsed * 1e6 / GRADES}
+
+
+def main():
+    rng = random.Random(0)
+    # Transcripts are mostly whole-number grades with the occasional half point
+    grades = [rng.randint(60, 100) if rng.random() < 0.9 else rng.randint(120, 200) / 2 for _ in range(GRADES)]
+    systems = ["percentage"] * GRADES
+
+    standard = get_scale("standard")
+    letter = get_scale("letter_4_3")
+    assert standard.convert_many(grades[:1000]) == [calculate_gpa(g) for g in grades[:1000]]
+
+    def per_row_property():
+        # What Course.gpa did for every loaded row: a branch plus the formula
+        return [calculate_gpa(g) if system == "percentage" and g is not None else None
+                for g, system in zip(grades, systems)]
+
+    report(f"grade -> GPA conversion, {GRADES:,} grades", {
+        "per-row property (standard)": timed(per_row_property),
+        "compiled convert() loop (standard)": timed(lambda: [standard.convert(g) for g in grades]),
+        "compiled convert_many (standard)": timed(lambda: standard.convert_many(grades)),
+        "compiled convert_many (letter_4_3)": timed(lambda: letter.convert_many(grades)),
+    })
+
+
+if __name__ == "__main__":
+    main()
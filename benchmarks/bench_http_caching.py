@@ -0,0 +1,101 @@
+"""
+响应压缩与条件 GET：500 个类别的类别树和 1,000 门课程的课程列表
+
+对比不压缩 / gzip / br 的传输字节数，以及完整 GET 与带 If-None-Match 重新验证（304）的耗时和语句数
+
+python -m benchmarks.bench_http_caching
+"""
+import random
+import time
+import uuid
+
+from benchmarks.common import bootstrap, report
+
+bootstrap("bench_http_caching.db")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, insert  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.db.base import SessionLocal, engine  # noqa: E402
+from app.models import Course, CourseCategory, TrainingProgram, User  # noqa: E402
+from app.models.course import GradingSystem  # noqa: E402
+from main import app  # noqa: E402
+
+CATEGORIES = 500
+COURSES = 1000
+ROUNDS = 20
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def seed():
+    rng = random.Random(0)
+    db = SessionLocal()
+    user = User(email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    program = TrainingProgram(name="Program", total_credits=160, user_id=user.id)
+    db.add(program)
+    db.flush()
+    category_ids = []
+    rows = []
+    for i in range(CATEGORIES):
+        category_ids.append(str(uuid.uuid4()))
+        parent_id = category_ids[rng.randrange(i)] if i % 10 else None
+        rows.append({"id": category_ids[-1], "name": f"Category {i}", "required_credits": 4,
+                     "training_program_id": program.id, "parent_id": parent_id})
+    db.execute(insert(CourseCategory), rows)
+    db.execute(insert(Course), [
+        {"id": str(uuid.uuid4()), "name": f"Course {i}", "credits": 2, "grading_system": GradingSystem.PERCENTAGE,
+         "grade": 80, "gpa": 3.4, "user_id": user.id, "category_id": rng.choice(category_ids)}
+        for i in range(COURSES)
+    ])
+    db.commit()
+    ids = user.id, program.id
+    db.close()
+    return ids
+
+
+def timed(client, url, headers):
+    counter = StatementCounter()
+    timings = []
+    event.listen(engine, "before_cursor_execute", counter)
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        response = client.get(url, headers=headers)
+        timings.append((time.perf_counter() - started) * 1000)
+    event.remove(engine, "before_cursor_execute", counter)
+    return {"status": response.status_code, "median_ms": sorted(timings)[len(timings) // 2],
+            "statements": counter.count // ROUNDS, "wire_bytes": int(response.headers.get("content-length", 0))}
+
+
+def main():
+    user_id, program_id = seed()
+    headers = {"X-API-Key": settings.API_KEY, "Authorization": f"Bearer {create_access_token(user_id)}"}
+    client = TestClient(app)
+    for name, url in [
+        (f"category tree ({CATEGORIES} categories)", f"/api/v1/course-categories/training-program/{program_id}"),
+        (f"course list ({COURSES} courses)", f"/api/v1/courses/?limit={COURSES}"),
+    ]:
+        rows = {}
+        for encoding in ("identity", "gzip", "br"):
+            # Undecoded body: what goes over the wire
+            with client.stream("GET", url, headers={**headers, "Accept-Encoding": encoding}) as response:
+                rows[f"GET, Accept-Encoding: {encoding}"] = {"wire_bytes": len(b"".join(response.iter_raw()))}
+        rows["full GET (gzip)"] = timed(client, url, {**headers, "Accept-Encoding": "gzip"})
+        etag = client.get(url, headers={**headers, "Accept-Encoding": "gzip"}).headers["etag"]
+        rows["revalidation, If-None-Match"] = timed(client, url, {**headers, "Accept-Encoding": "gzip",
+                                                                  "If-None-Match": etag})
+        report(name, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+幂等键：移动网络下每个 POST /courses/ 都被重试一次
+
+对比不带键与带 Idempotency-Key 时创建出的课程数，以及首次执行和重放的耗时与语句数
+
+python -m benchmarks.bench_idempotency
+"""
+import time
+import uuid
+
+from benchmarks.common import bootstrap, report
+
+bootstrap("bench_idempotency.db")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.db.base import SessionLocal, engine  # noqa: E402
+from app.models import Course, CourseCategory, TrainingProgram, User  # noqa: E402
+from main import app  # noqa: E402
+
+REQUESTS = 50
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def seed():
+    db = SessionLocal()
+    user = User(email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    program = TrainingProgram(name="Program", total_credits=160, user_id=user.id)
+    db.add(program)
+    db.flush()
+    category = CourseCategory(name="Category", required_credits=20, training_program_id=program.id)
+    db.add(category)
+    db.commit()
+    ids = user.id, category.id
+    db.close()
+    return ids
+
+
+def count_courses():
+    db = SessionLocal()
+    count = db.query(Course).count()
+    db.close()
+    return count
+
+
+def run(client, headers, category_id, keyed):
+    """Every create sent twice, as a client retrying after a lost response would"""
+    counter = StatementCounter()
+    first, retry = [], []
+    before = count_courses()
+    event.listen(engine, "before_cursor_execute", counter)
+    for i in range(REQUESTS):
+        request_headers = {**headers, "Idempotency-Key": str(uuid.uuid4())} if keyed else headers
+        course = {"name": f"Course {i}", "credits": 2, "grading_system": "percentage", "grade": 80,
+                  "category_id": category_id}
+        for timings in (first, retry):
+            started = time.perf_counter()
+            response = client.post("/api/v1/courses/", headers=request_headers, json=course)
+            timings.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, response.text
+    event.remove(engine, "before_cursor_execute", counter)
+    return {"courses_created": count_courses() - before,
+            "first_median_ms": sorted(first)[REQUESTS // 2], "retry_median_ms": sorted(retry)[REQUESTS // 2],
+            "statements_per_request": counter.count / (2 * REQUESTS)}
+
+
+def main():
+    user_id, category_id = seed()
+    headers = {"X-API-Key": settings.API_KEY, "Authorization": f"Bearer {create_access_token(user_id)}"}
+    client = TestClient(app)
+    report(f"{REQUESTS} course creations, each retried once", {
+        "no key": run(client, headers, category_id, keyed=False),
+        "Idempotency-Key": run(client, headers, category_id, keyed=True),
+    })
+
+
+if __name__ == "__main__":
+    main()
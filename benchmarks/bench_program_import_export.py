@@ -0,0 +1,126 @@
+"""
+培养方案导入/导出：一次请求导入整棵类别树与逐个调用 create_course_category（每个类别一次提交）的对比，
+以及导出整棵树（1,000 个类别）
+
+python -m benchmarks.bench_program_import_export
+"""
+import random
+import time
+
+from benchmarks.common import bootstrap, report
+
+bootstrap("bench_program_import_export.db")
+
+from sqlalchemy import event  # noqa: E402
+
+from app.db import statements  # noqa: E402
+from app.db.base import SessionLocal, engine  # noqa: E402
+from app.db.projections import load_category_records  # noqa: E402
+from app.models import CourseCategory, TrainingProgram, User  # noqa: E402
+from app.schemas.training_program import TrainingProgramDefinition  # noqa: E402
+from app.services.program_tree import export_training_program, import_training_program  # noqa: E402
+
+CATEGORIES = 1000
+ROUNDS = 5
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def build_definition() -> dict:
+    """Nested definition: a few roots, every further node under a random earlier one"""
+    rng = random.Random(0)
+    nodes = []
+    roots = []
+    for i in range(CATEGORIES):
+        node = {"name": f"Category {i}", "required_credits": rng.choice([0, 1, 2]), "subcategories": []}
+        if nodes and i % 50:
+            nodes[rng.randrange(len(nodes))]["subcategories"].append(node)
+        else:
+            roots.append(node)
+        nodes.append(node)
+    return {"name": "Imported", "total_credits": 160, "categories": roots}
+
+
+def import_node_by_node(db, definition: TrainingProgramDefinition, user_id: str):
+    """What a client did before: create the program, then one create_course_category call per node"""
+    program = TrainingProgram(**definition.model_dump(exclude={"categories"}), user_id=user_id)
+    db.add(program)
+    db.commit()
+
+    def create(node, parent_id):
+        # create_course_category re-reads the program and the parent before each insert
+        statements.get_training_program(db, program.id)
+        if parent_id:
+            db.get(CourseCategory, parent_id)
+        category = CourseCategory(name=node.name, required_credits=node.required_credits,
+                                  training_program_id=program.id, parent_id=parent_id)
+        db.add(category)
+        db.commit()
+        db.refresh(category)
+        for subcategory in node.subcategories:
+            create(subcategory, category.id)
+
+    for node in definition.categories:
+        create(node, None)
+    return program
+
+
+def bulk_import(db, definition: TrainingProgramDefinition, user_id: str):
+    return import_training_program(db, definition, user_id)[0]
+
+
+def timed(func, rounds=ROUNDS):
+    counter = StatementCounter()
+    timings = []
+    for _ in range(rounds):
+        event.listen(engine, "before_cursor_execute", counter)
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+        event.remove(engine, "before_cursor_execute", counter)
+    return {"median_ms": sorted(timings)[len(timings) // 2], "statements": counter.count // rounds}
+
+
+def main():
+    db = SessionLocal()
+    user = User(email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    definition = TrainingProgramDefinition.model_validate(build_definition())
+    imported = []
+
+    def run_import(importer):
+        def run():
+            session = SessionLocal()
+            program = importer(session, definition, user_id)
+            imported.append(program.id)
+            count = session.query(CourseCategory).filter(CourseCategory.training_program_id == program.id).count()
+            assert count == CATEGORIES, count
+            session.close()
+        return run
+
+    def run_export():
+        session = SessionLocal()
+        program = statements.get_training_program(session, imported[-1])
+        exported = export_training_program(program, load_category_records(session, program.id))
+        assert len(exported["categories"]) == len(definition.categories)
+        session.close()
+
+    rows = {
+        "import node by node (old client flow)": timed(run_import(import_node_by_node), rounds=1),
+        "bulk import": timed(run_import(bulk_import)),
+        "export": timed(run_export),
+    }
+    db.close()
+    report(f"import/export a {CATEGORIES}-category training program", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+仪表盘读路径：完整 ORM 实体与列投影记录的对比（200 门课程的用户）
+
+python -m benchmarks.bench_projections
+"""
+import random
+import tracemalloc
+
+from benchmarks.common import bootstrap, measure, report
+
+bootstrap("bench_projections.db")
+
+from app.db import statements  # noqa: E402
+from app.db.base import SessionLocal  # noqa: E402
+from app.db.projections import load_category_records, load_course_records  # noqa: E402
+from app.models import Course, CourseCategory, GradingSystem, TrainingProgram, User  # noqa: E402
+from app.services.credit_summary import calculate_credit_summary  # noqa: E402
+
+COURSES = 200
+CATEGORIES = 40
+
+
+def seed():
+    rng = random.Random(0)
+    db = SessionLocal()
+    user = User(email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    program = TrainingProgram(name="Bench", total_credits=160, user_id=user.id)
+    db.add(program)
+    db.flush()
+    categories = []
+    for i in range(CATEGORIES):
+        parent = categories[rng.randrange(len(categories))] if categories and i % 3 else None
+        category = CourseCategory(name=f"Category {i}", required_credits=rng.choice([2, 4, 8, 12]),
+                                  training_program_id=program.id, parent_id=parent.id if parent else None)
+        db.add(category)
+        db.flush()
+        categories.append(category)
+    for i in range(COURSES):
+        percentage = rng.random() < 0.8
+        db.add(Course(
+            name=f"Course {i}", credits=rng.choice([1, 2, 3, 4]),
+            grading_system=GradingSystem.PERCENTAGE if percentage else GradingSystem.PASS_FAIL,
+            grade=rng.uniform(60, 100) if percentage else None,
+            passed=None if percentage else rng.random() < 0.9,
+            user_id=user.id, category_id=rng.choice(categories).id,
+        ))
+    db.commit()
+    ids = user.id, program.id
+    db.close()
+    return ids
+
+
+def peak_memory_kib(func) -> float:
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    user_id, program_id = seed()
+
+    # Each "request" uses a fresh session, like the endpoint does
+    def load_entities():
+        db = SessionLocal()
+        statements.get_courses_by_user(db, user_id)
+        db.close()
+
+    def load_projection():
+        db = SessionLocal()
+        load_course_records(db, user_id)
+        db.close()
+
+    def summary_entities():
+        db = SessionLocal()
+        program = statements.get_training_program(db, program_id)
+        courses = statements.get_courses_by_user(db, user_id)
+        categories = db.query(CourseCategory).filter(CourseCategory.training_program_id == program_id).all()
+        calculate_credit_summary(program.total_credits, categories, courses)
+        db.close()
+
+    def summary_projection():
+        db = SessionLocal()
+        program = statements.get_training_program(db, program_id)
+        calculate_credit_summary(program.total_credits, load_category_records(db, program_id),
+                                 load_course_records(db, user_id))
+        db.close()
+
+    rows = {}
+    for name, func in [
+        ("load courses: orm entities", load_entities),
+        ("load courses: projection", load_projection),
+        ("credit summary: orm entities", summary_entities),
+        ("credit summary: projection", summary_projection),
+    ]:
+        result = measure(func, repeat=5, number=50)
+        result["peak_kib"] = peak_memory_kib(func)
+        rows[name] = result
+    report(f"dashboard read path, {COURSES} courses / {CATEGORIES} categories", rows)
+
+
+if __name__ == "__main__":
+    main()
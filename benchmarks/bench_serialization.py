@@ -0,0 +1,102 @@
+"""
+响应序列化：500 个类别节点的 credit-summary（CategoryProgressWithChildren 树）
+
+对比 FastAPI 按 response_model 校验后序列化（当前版本用 Pydantic 的 dump_json，
+旧版本用 jsonable_encoder + json.dumps）与服务层字典直接交给 ORJSONResponse，以及端到端的请求耗时
+
+python -m benchmarks.bench_serialization
+"""
+import json
+import random
+import uuid
+
+from benchmarks.common import bootstrap, measure, report
+
+bootstrap("bench_serialization.db")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.api.responses import ORJSONResponse  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.db.base import SessionLocal  # noqa: E402
+from app.db.projections import load_category_records, load_course_records  # noqa: E402
+from app.models import Course, CourseCategory, TrainingProgram, User  # noqa: E402
+from app.models.course import GradingSystem  # noqa: E402
+from app.schemas.dashboard import CreditSummary  # noqa: E402
+from app.services.credit_summary import calculate_credit_summary  # noqa: E402
+from main import app  # noqa: E402
+
+CATEGORIES = 500
+COURSES = 2000
+
+
+def seed():
+    rng = random.Random(0)
+    db = SessionLocal()
+    user = User(email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    program = TrainingProgram(name="Program", total_credits=160, user_id=user.id)
+    db.add(program)
+    db.flush()
+    category_ids = []
+    rows = []
+    for i in range(CATEGORIES):
+        category_ids.append(str(uuid.uuid4()))
+        parent_id = category_ids[rng.randrange(i)] if i % 10 else None
+        rows.append({"id": category_ids[-1], "name": f"Category {i}", "required_credits": 4,
+                     "training_program_id": program.id, "parent_id": parent_id})
+    db.execute(insert(CourseCategory), rows)
+    db.execute(insert(Course), [
+        {"id": str(uuid.uuid4()), "name": f"Course {i}", "credits": 2, "grading_system": GradingSystem.PERCENTAGE,
+         "grade": 60 + rng.random() * 40, "gpa": 1 + rng.random() * 3, "user_id": user.id,
+         "category_id": rng.choice(category_ids)}
+        for i in range(COURSES)
+    ])
+    db.commit()
+    ids = user.id, program.id
+    db.close()
+    return ids
+
+
+def main():
+    user_id, program_id = seed()
+    db = SessionLocal()
+    program = db.get(TrainingProgram, program_id)
+    summary = calculate_credit_summary(program.total_credits, load_category_records(db, program_id),
+                                       load_course_records(db, user_id))
+    db.close()
+
+    # What FastAPI does with a response_model: validate the returned value, then serialize the model
+    adapter = TypeAdapter(CreditSummary)
+    rendered = {
+        "validate + dump_json (FastAPI default)": lambda: adapter.dump_json(adapter.validate_python(summary)),
+        "validate + jsonable_encoder + json.dumps (older FastAPI)": lambda: json.dumps(
+            jsonable_encoder(adapter.validate_python(summary))).encode(),
+        "trusted dict -> ORJSONResponse": lambda: ORJSONResponse(summary).body,
+    }
+    expected = json.loads(adapter.dump_json(adapter.validate_python(summary)))
+    for render in rendered.values():
+        assert json.loads(render()) == expected
+    # Byte for byte what the validated path sends
+    assert ORJSONResponse(summary).body == adapter.dump_json(adapter.validate_python(summary))
+
+    report(f"serialize a credit summary with {CATEGORIES} categories",
+           {name: {**measure(render, repeat=7, number=20), "bytes": len(render())}
+            for name, render in rendered.items()})
+
+    client = TestClient(app)
+    headers = {"X-API-Key": settings.API_KEY, "Authorization": f"Bearer {create_access_token(user_id)}"}
+    url = f"/api/v1/dashboard/credit-summary/{program_id}"
+    assert client.get(url, headers=headers).json() == expected
+    report("GET /dashboard/credit-summary/{id} end to end", {
+        "request": measure(lambda: client.get(url, headers=headers), repeat=7, number=5),
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+生产服务器：preload_app 对启动时间和工作进程内存的影响
+
+以 gunicorn_conf.py 分别在开启和关闭 preload 时启动 gunicorn，记录所有工作进程完成应用启动的耗时，
+以及每个工作进程的 RSS、PSS（共享页按进程数分摊）和私有内存（写时复制未共享的部分），数据来自 /proc（仅 Linux）
+
+python -m benchmarks.bench_server_startup
+"""
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks.common import bootstrap, report
+
+bootstrap("bench_server_startup.db")
+
+WORKERS = 4
+ROUNDS = 3
+BOOT_TIMEOUT_SECONDS = 60
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def memory_kb(pid: int) -> dict:
+    """Rss, Pss and private memory of a process, in kB"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {"rss": fields["Rss"], "pss": fields["Pss"],
+            "private": fields["Private_Clean"] + fields["Private_Dirty"]}
+
+
+def boot(preload: bool) -> dict:
+    """Start gunicorn, wait for every worker's application startup, then measure its workers"""
+    port = free_port()
+    env = {**os.environ, "SERVER_BIND": f"127.0.0.1:{port}", "SERVER_WORKERS": str(WORKERS),
+           "SERVER_PRELOAD_APP": str(preload).lower()}
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn_conf.py", "--log-level", "info", "main:app"],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    try:
+        worker_pids, ready = [], 0
+        while ready < WORKERS:
+            line = process.stdout.readline()
+            if not line or time.perf_counter() - started > BOOT_TIMEOUT_SECONDS:
+                raise RuntimeError("gunicorn did not start")
+            if "Booting worker with pid:" in line:
+                worker_pids.append(int(line.rsplit(":", 1)[1]))
+            elif "Application startup complete" in line:
+                ready += 1
+        startup_ms = (time.perf_counter() - started) * 1000
+
+        # Not every worker is guaranteed a request; a few exercise the request path before measuring
+        request = urllib.request.Request(f"http://127.0.0.1:{port}/health", headers={"X-API-Key": os.environ["API_KEY"]})
+        for _ in range(WORKERS * 4):
+            with urllib.request.urlopen(request) as response:
+                assert response.status == 200
+        workers = [memory_kb(pid) for pid in worker_pids]
+        master = memory_kb(process.pid)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.communicate(timeout=BOOT_TIMEOUT_SECONDS)
+    return {
+        "startup_ms": startup_ms,
+        "worker_rss_mb": sum(w["rss"] for w in workers) / len(workers) / 1024,
+        "worker_pss_mb": sum(w["pss"] for w in workers) / len(workers) / 1024,
+        "worker_private_mb": sum(w["private"] for w in workers) / len(workers) / 1024,
+        "total_pss_mb": (master["pss"] + sum(w["pss"] for w in workers)) / 1024,
+    }
+
+
+def best_of(preload: bool) -> dict:
+    runs = [boot(preload) for _ in range(ROUNDS)]
+    return min(runs, key=lambda run: run["startup_ms"])
+
+
+def main():
+    report(f"gunicorn startup, {WORKERS} workers (best of {ROUNDS})", {
+        "preload_app=False": best_of(False),
+        "preload_app=True": best_of(True),
+    })
+
+
+if __name__ == "__main__":
+    main()
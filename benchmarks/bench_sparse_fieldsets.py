@@ -0,0 +1,83 @@
+"""
+稀疏字段集：课程选择器只需要 id、name、credits
+
+对比 2,000 门课程的完整列表与 fields=name,credits，以及 500 个类别的完整类别树与 fields=name 的耗时和响应大小
+
+python -m benchmarks.bench_sparse_fieldsets
+"""
+import random
+import uuid
+
+from benchmarks.common import bootstrap, measure, report
+
+bootstrap("bench_sparse_fieldsets.db")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.db.base import SessionLocal  # noqa: E402
+from app.models import Course, CourseCategory, TrainingProgram, User  # noqa: E402
+from app.models.course import GradingSystem  # noqa: E402
+from main import app  # noqa: E402
+
+CATEGORIES = 500
+COURSES = 2000
+
+
+def seed():
+    rng = random.Random(0)
+    db = SessionLocal()
+    user = User(email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    program = TrainingProgram(name="Program", total_credits=160, user_id=user.id)
+    db.add(program)
+    db.flush()
+    category_ids = []
+    rows = []
+    for i in range(CATEGORIES):
+        category_ids.append(str(uuid.uuid4()))
+        parent_id = category_ids[rng.randrange(i)] if i % 10 else None
+        rows.append({"id": category_ids[-1], "name": f"Category {i}", "required_credits": 4,
+                     "training_program_id": program.id, "parent_id": parent_id})
+    db.execute(insert(CourseCategory), rows)
+    db.execute(insert(Course), [
+        {"id": str(uuid.uuid4()), "name": f"Course {i}", "credits": 2, "grading_system": GradingSystem.PERCENTAGE,
+         "grade": 80, "gpa": 3.4, "user_id": user.id, "category_id": rng.choice(category_ids)}
+        for i in range(COURSES)
+    ])
+    db.commit()
+    ids = user.id, program.id
+    db.close()
+    return ids
+
+
+def main():
+    user_id, program_id = seed()
+    # Uncompressed, to compare the JSON itself
+    headers = {"X-API-Key": settings.API_KEY, "Authorization": f"Bearer {create_access_token(user_id)}",
+               "Accept-Encoding": "identity"}
+    client = TestClient(app)
+
+    def row(url):
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200, response.text
+        return {**measure(lambda: client.get(url, headers=headers), repeat=7, number=3),
+                "bytes": len(response.content)}
+
+    courses = f"/api/v1/courses/?limit={COURSES}"
+    report(f"course list ({COURSES:,} courses)", {
+        "full": row(courses),
+        "fields=name,credits": row(f"{courses}&fields=name,credits"),
+    })
+    tree = f"/api/v1/course-categories/training-program/{program_id}"
+    report(f"category tree ({CATEGORIES} categories)", {
+        "full": row(tree),
+        "fields=name": row(f"{tree}?fields=name"),
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+基准测试公共工具
+
+基准脚本在项目根目录下以模块方式运行，例如：python -m benchmarks.bench_statement_cache
+未配置的环境变量会使用占位值，数据库默认使用临时目录中的独立 SQLite 文件，不会影响开发数据库
+"""
+import os
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict
+
+
+def bootstrap(database_name: str = "benchmark.db") -> str:
+    """Point the app at a throwaway SQLite database; must run before any `app` import"""
+    database_path = os.path.join(tempfile.gettempdir(), database_name)
+    if os.path.exists(database_path):
+        os.remove(database_path)
+    os.environ["DATABASE_URL"] = f"sqlite:///{database_path}"
+    for key, value in {
+        "API_KEY": "benchmark",
+        "SECRET_KEY": "benchmark",
+        "SMTP_HOST": "smtp.example.com",
+        "SMTP_PORT": "465",
+        "SMTP_USER": "benchmark",
+        "SMTP_PASSWORD": "benchmark",
+        "FROM_EMAIL": "benchmark@example.com",
+        "SQL_N_PLUS_ONE_MODE": "off",
+        "SLOW_QUERY_THRESHOLD_MS": "0",
+    }.items():
+        os.environ.setdefault(key, value)
+
+    from app.db.base import Base, engine
+    import app.models  # noqa: F401  register all tables
+
+    Base.metadata.create_all(bind=engine)
+    return database_path
+
+
+def measure(func: Callable[[], object], repeat: int = 5, number: int = 1) -> Dict[str, float]:
+    """Run `func` `number` times per round for `repeat` rounds; returns per-call timings in ms"""
+    func()  # warm up caches before timing
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) * 1000 / number)
+    return {"best_ms": min(samples), "median_ms": statistics.median(samples)}
+
+
+def report(title: str, rows: Dict[str, Dict[str, float]]) -> None:
+    print(f"\n== {title} ==")
+    width = max(len(name) for name in rows)
+    for name, result in rows.items():
+        values = "  ".join(f"{key}={value:,.4f}" if isinstance(value, float) else f"{key}={value}"
+                           for key, value in result.items())
+        print(f"{name.ljust(width)}  {values}")
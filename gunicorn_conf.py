@@ -0,0 +1,47 @@
+"""
+gunicorn 生产配置
+
+gunicorn -c gunicorn_conf.py main:app（start_production.py / start.sh 即以此启动）
+各项取值见 app/core/config.py 中的 SERVER_* 设置
+"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core import server  # noqa: E402
+from app.core.config import settings  # noqa: E402
+
+bind = settings.SERVER_BIND
+backlog = settings.SERVER_BACKLOG
+workers = server.worker_count()
+# uvicorn 自动选用 uvloop 和 httptools（已安装时）
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# 主进程导入一次应用，工作进程 fork 后以写时复制共享已导入的模块
+preload_app = settings.SERVER_PRELOAD_APP
+
+# 每个工作进程处理这么多请求后重启，回收缓慢增长的内存；抖动错开各进程的重启
+max_requests = settings.SERVER_MAX_REQUESTS
+max_requests_jitter = settings.SERVER_MAX_REQUESTS_JITTER
+
+keepalive = settings.SERVER_KEEPALIVE_SECONDS
+timeout = settings.SERVER_TIMEOUT_SECONDS
+graceful_timeout = settings.SERVER_GRACEFUL_TIMEOUT_SECONDS
+
+# 生产环境中只记录错误
+loglevel = "error"
+accesslog = None
+
+
+def on_starting(arbiter):
+    print(f"生产服务器配置: {server.profile()}")
+
+
+def post_fork(arbiter, worker):
+    # preload 时主进程可能已建立数据库连接，子进程不能与其共用套接字：丢弃继承的连接池（不关闭父进程的连接）
+    if preload_app:
+        from app.db.base import engine, replica_engines
+
+        for db_engine in (engine, *replica_engines):
+            db_engine.dispose(close=False)
@@ -38,7 +38,10 @@ app = FastAPI(
         {"name": "培养方案", "description": "培养方案管理"},
         {"name": "课程类别", "description": "课程类别管理"},
         {"name": "课程", "description": "课程管理"},
+        {"name": "课程目录", "description": "培养方案共享的课程定义"},
         {"name": "仪表盘", "description": "学分和进度统计"},
+        {"name": "同步", "description": "离线客户端的增量同步"},
+        {"name": "管理", "description": "管理员运维与统计"},
     ],
 )
 
@@ -79,16 +82,62 @@ required_origins = [
 all_origins = list(set(frontend_origins + required_origins))
 print(f"CORS 最终允许的域名: {all_origins}")
 
+# 写请求的 Idempotency-Key：首次响应保存后重放给重试（在 CORS 之内，重放的响应同样带 CORS 头）
+from app.core.middleware import IdempotencyMiddleware
+
+app.add_middleware(IdempotencyMiddleware)
+
+# 读己之写的窗口随客户端传递（签名 Cookie / X-Last-Write），任何工作进程都能识别；放在幂等中间件之外，重放的响应不带旧令牌
+from app.core.middleware import ReadYourWritesMiddleware
+
+app.add_middleware(ReadYourWritesMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=all_origins,
     allow_credentials=True,
     # 限制允许的方法
     allow_methods=["GET", "POST", "PUT", "DELETE"],
-    # 限制允许的头部
-    allow_headers=["Content-Type", "Authorization", "X-API-Key"],
+    # 限制允许的头部（条件请求头用于 ETag / Last-Modified 重新验证）
+    allow_headers=["Content-Type", "Authorization", "X-API-Key", "If-None-Match", "If-Modified-Since",
+                   "Idempotency-Key", "X-Last-Write"],
+    expose_headers=["ETag", "Last-Modified", "Idempotent-Replayed", "X-Last-Write"],
+    # 浏览器缓存预检结果，不再为每个请求重复发送 OPTIONS
+    max_age=settings.CORS_MAX_AGE,
 )
 
+# 按请求统计 SQL 查询（Server-Timing 响应头 + 结构化日志）
+from app.core.middleware import CompressionMiddleware, QueryStatsMiddleware
+
+app.add_middleware(QueryStatsMiddleware)
+
+# 最外层：按 Accept-Encoding 压缩 JSON 响应（br / gzip）
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+# 开发/测试环境中，用 SQLite 备份 API 定期刷新只读副本
+from app.db.base import start_sqlite_replica_sync
+from app.services.idempotency import start_idempotency_purge
+
+
+@app.on_event("startup")
+def start_replica_sync():
+    start_sqlite_replica_sync(settings.SQLITE_REPLICA_SYNC_SECONDS)
+
+
+# 后台定期把被中断（工作进程重启、部署）的审核任务标记为失败
+from app.services.audit import start_stale_audit_check
+
+
+@app.on_event("startup")
+def start_audit_stale_check():
+    start_stale_audit_check()
+
+
+# 后台定期清除过期的幂等键
+@app.on_event("startup")
+def start_idempotency_key_purge():
+    start_idempotency_purge()
+
 # Include API router with API key verification
 app.include_router(api_router, prefix="/api/v1", dependencies=[Depends(verify_api_key)])
 
@@ -110,12 +159,19 @@ async def health_check():
     }
 
 if __name__ == "__main__":
-    # 生产环境配置，移除热重载功能
+    # 无 gunicorn 时的备用入口；生产环境使用 start_production.py（gunicorn_conf.py）
+    from app.core import server
+
+    host, _, port = settings.SERVER_BIND.rpartition(":")
     uvicorn.run(
         "main:app",
-        host="0.0.0.0",
-        port=8000,
+        host=host,
+        port=int(port),
         reload=False,
-        workers=4,  # 根据服务器CPU核心数调整
+        workers=server.worker_count(),
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        limit_max_requests=settings.SERVER_MAX_REQUESTS,
         log_level="error"  # 生产环境中只记录错误
     )
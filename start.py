@@ -81,6 +81,7 @@ def setup_db() -> None:
 def start_app():
     """Start the application"""
     import uvicorn
+    from app.core import server
     print("\nStarting the application...")
     print("API will be available at http://localhost:8000")
     print("API documentation will be available at http://localhost:8000/docs")
@@ -98,7 +99,7 @@ def start_app():
         host="0.0.0.0",
         port=8000,
         reload=False,
-        workers=4,  # 根据服务器CPU核心数调整
+        workers=server.worker_count(),  # 按 CPU 数和内存计算，见 app/core/server.py
         log_level="error"  # 生产环境中只记录错误
     )
 
@@ -1,15 +1,18 @@
 #!/usr/bin/env python3
 """
 生产环境启动脚本
+
+初始化数据库后由 gunicorn 接管进程（start.sh 和 Docker 镜像都经由这里启动），
+工作进程数、preload、回收与超时等配置见 gunicorn_conf.py
 """
 import os
 import sys
 import logging
 from logging.handlers import RotatingFileHandler
-import uvicorn
 
 # 添加当前目录到路径
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(BASE_DIR)
 
 from app.db.base import engine, Base
 from app.core.config import settings
@@ -57,14 +60,8 @@ def setup_db():
         
         db = SessionLocal()
         
-        # 检查是否有管理员用户
-        admin_emails = settings.ADMIN_EMAILS.split(",") if "," in settings.ADMIN_EMAILS else [settings.ADMIN_EMAILS]
-        
-        for admin_email in admin_emails:
-            admin_email = admin_email.strip()
-            if not admin_email:
-                continue
-                
+        # 检查是否有管理员用户（ADMIN_EMAILS 已在配置中拆分为列表）
+        for admin_email in settings.ADMIN_EMAILS:
             # 检查用户是否存在
             user = db.query(User).filter(User.email == admin_email).first()
             if not user:
@@ -90,14 +87,13 @@ def start_app():
     """
     try:
         logging.info("启动生产服务器...")
-        uvicorn.run(
-            "main:app", 
-            host="0.0.0.0", 
-            port=8000, 
-            reload=False,
-            workers=4,  # 根据服务器CPU核心数调整
-            log_level="error"  # 生产环境中只记录错误
-        )
+        # exec 替换当前进程，gunicorn 主进程直接接收容器的停止信号并平滑关闭工作进程
+        os.execv(sys.executable, [
+            sys.executable, "-m", "gunicorn",
+            "--chdir", BASE_DIR,
+            "-c", os.path.join(BASE_DIR, "gunicorn_conf.py"),
+            "main:app",
+        ])
     except Exception as e:
         logging.error(f"服务器启动失败: {str(e)}")
         raise
@@ -17,6 +17,21 @@ headers = {
     "Content-Type": "application/json"
 }
 
+# Accounts for the catalog test: the first admin (created at startup with DEFAULT_ADMIN_PASSWORD)
+# and an ordinary user, which the test needs to be given
+ADMIN_EMAIL = os.getenv("ADMIN_EMAILS", "admin@example.com").split(",")[0].strip()
+ADMIN_PASSWORD = os.getenv("DEFAULT_ADMIN_PASSWORD", "admin123")
+USER_EMAIL = os.getenv("TEST_USER_EMAIL")
+USER_PASSWORD = os.getenv("TEST_USER_PASSWORD")
+
+
+def login(email, password):
+    """Headers carrying a bearer token for the account"""
+    response = requests.post(f"{BASE_URL}/api/v1/auth/login", headers={"X-API-Key": API_KEY},
+                             data={"username": email, "password": password})
+    assert response.status_code == 200
+    return {**headers, "Authorization": f"Bearer {response.json()['access_token']}"}
+
 
 def test_health_check():
     """Test the health check endpoint"""
@@ -27,7 +42,57 @@ def test_health_check():
     assert response.json()["status"] == "ok"
 
 
+def test_non_owner_course_does_not_grow_catalog():
+    """A course filed under someone else's public program only links to existing catalog entries"""
+    if not USER_EMAIL or not USER_PASSWORD:
+        print("TEST_USER_EMAIL / TEST_USER_PASSWORD not set, skipping the catalog test")
+        return
+    admin_headers = login(ADMIN_EMAIL, ADMIN_PASSWORD)
+    user_headers = login(USER_EMAIL, USER_PASSWORD)
+
+    program = requests.post(f"{BASE_URL}/api/v1/training-programs/", headers=admin_headers,
+                            json={"name": "Catalog test program", "total_credits": 100}).json()
+    try:
+        category = requests.post(f"{BASE_URL}/api/v1/course-categories/", headers=admin_headers, json={
+            "name": "Catalog test category", "required_credits": 10, "training_program_id": program["id"],
+        }).json()
+        response = requests.post(f"{BASE_URL}/api/v1/training-programs/{program['id']}/publish",
+                                 headers=admin_headers, json={"is_public": True})
+        assert response.status_code == 200
+        existing = requests.post(f"{BASE_URL}/api/v1/catalog/", headers=admin_headers, json={
+            "name": "Existing Course", "credits": 3, "training_program_id": program["id"],
+        }).json()
+
+        # The non-owner may not add catalog entries directly, nor through their courses
+        response = requests.post(f"{BASE_URL}/api/v1/catalog/", headers=user_headers, json={
+            "name": "Sp4m Junk Course", "credits": 9, "training_program_id": program["id"],
+        })
+        assert response.status_code == 403
+        course = {"credits": 9, "grading_system": "percentage", "grade": 80, "category_id": category["id"]}
+        response = requests.post(f"{BASE_URL}/api/v1/courses/", headers=user_headers,
+                                 json={**course, "name": "Sp4m Junk Course"})
+        assert response.status_code == 200
+        assert response.json()["catalog_course_id"] is None
+        response = requests.post(f"{BASE_URL}/api/v1/courses/batch", headers=user_headers, json={
+            "operations": [{"op": "create", "course": {**course, "name": "Sp4m Junk Course 2"}}],
+        })
+        assert response.status_code == 200 and response.json()["committed"]
+
+        catalog = requests.get(f"{BASE_URL}/api/v1/catalog/training-program/{program['id']}",
+                               headers=admin_headers).json()
+        assert [entry["id"] for entry in catalog] == [existing["id"]]
+
+        # An existing entry is still linked by name
+        response = requests.post(f"{BASE_URL}/api/v1/courses/", headers=user_headers,
+                                 json={**course, "name": " existing course "})
+        assert response.json()["catalog_course_id"] == existing["id"]
+    finally:
+        requests.delete(f"{BASE_URL}/api/v1/training-programs/{program['id']}", headers=admin_headers,
+                        params={"force": "true"})
+
+
 if __name__ == "__main__":
     print("Testing API...")
     test_health_check()
+    test_non_owner_course_does_not_grow_catalog()
     print("All tests passed!")